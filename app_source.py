@@ -0,0 +1,32 @@
+"""Where the guide app lives and what it expects next to it.
+
+Shared by the scripts that run the app out of process (the static-site
+exporter and the load test) without importing either one's dependencies.
+"""
+import ast
+import os
+import shutil
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_SCRIPT = os.path.join(APP_DIR, "llm_startup_guide_app.py")
+
+# Files the app opens by path relative to its working directory
+STATIC_FILES = ["WebAppstyling.css", "how_llms_generate_text.png"]
+
+
+def read_page_titles(script=APP_SCRIPT):
+    """Read the ``page_titles`` list straight from the app source."""
+    with open(script, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Assign) and any(getattr(t, "id", None) == "page_titles" for t in node.targets):
+            return ast.literal_eval(node.value)
+    raise RuntimeError("page_titles not found in app script")
+
+
+def copy_static_files(workdir):
+    """Copy the files the app loads by relative path into ``workdir``."""
+    for name in STATIC_FILES:
+        src = os.path.join(APP_DIR, name)
+        if os.path.exists(src):
+            shutil.copy(src, workdir)
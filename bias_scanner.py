@@ -0,0 +1,172 @@
+"""Lexicon-based bias scanner for model outputs.
+
+All lexicon terms are compiled into one case-insensitive, prefix-factored
+regex, so a text is scanned in a single pass. Batches are joined into one
+buffer and scanned once, then matches are mapped back to their rows.
+
+The lexicon only lists phrasings that are themselves loaded (gendered job
+titles, "young and dynamic", "culture fit" ...). Ordinary words such as
+pronouns, "old" or "master" are too common in neutral text to flag.
+Pronouns are counted separately by ``pronoun_counts`` as information: a
+batch that only ever says "he" is worth a look, but no single "he" is.
+"""
+import html
+import re
+
+import numpy as np
+import pandas as pd
+
+BIAS_LEXICON = {
+    "Gendered": [
+        "manpower", "man-hours", "mankind", "chairman", "chairmen", "salesman", "salesmen", "businessman",
+        "businessmen", "foreman", "fireman", "policeman", "cameraman", "manmade", "man-made", "workmanship",
+        "housewife", "manly", "man up", "you guys", "male nurse", "female engineer", "female developer",
+        "lady doctor", "woman driver", "like a girl", "throws like a girl",
+    ],
+    "Age-related": [
+        "young and dynamic", "young and energetic", "young and hungry", "young blood", "youthful team",
+        "young male", "young female", "digital native", "digital natives", "recent graduates only",
+        "fresh graduate", "new grads only", "overqualified", "too old", "old-timer", "boomer", "boomers",
+        "senile", "over the hill",
+    ],
+    "Ableist": [
+        "crazy", "insane", "lame", "dumb", "retarded", "psycho", "psychotic", "crippled",
+        "handicapped", "wheelchair-bound", "confined to a wheelchair", "suffers from",
+        "able-bodied", "tone-deaf", "turn a blind eye", "falls on deaf ears",
+        "spaz", "idiot", "moron",
+    ],
+    "Exclusionary": [
+        "native english speaker", "native speaker", "culture fit", "rockstar", "rock star",
+        "ninja", "whitelist", "blacklist", "master/slave", "master-slave",
+        "normal people", "third-world", "third world", "illegal alien", "illegals",
+        "grandfathered", "clean-shaven", "work hard play hard",
+    ],
+}
+
+# Informational only: counted per batch, never flagged
+PRONOUNS = {
+    "he/him": ["he", "him", "his", "himself"],
+    "she/her": ["she", "her", "hers", "herself"],
+    "they/them": ["they", "them", "their", "theirs", "themselves", "themself"],
+}
+
+CATEGORY_COLORS = {
+    "Gendered": "#ffd6e0",
+    "Age-related": "#ffe9b3",
+    "Ableist": "#d6e4ff",
+    "Exclusionary": "#d9f2d0",
+}
+
+
+# Phrase words may be split by spaces or a hyphen, but never by a newline
+_SEPARATOR = r"(?:[^\S\n]+|-)"
+
+
+def _normalize(term):
+    # Spaces and hyphens in phrases are interchangeable, so "rock-star" == "rock star"
+    return re.sub(_SEPARATOR, " ", term.strip().lower())
+
+
+def _trie_pattern(terms):
+    """Build a prefix-factored alternation, which ``re`` scans far faster than a flat one."""
+    trie = {}
+    for term in terms:
+        node = trie
+        for unit in re.findall(r" |.", _normalize(term)):
+            node = node.setdefault(_SEPARATOR if unit == " " else re.escape(unit), {})
+        node[""] = {}
+
+    def build(node):
+        alternatives = [unit + build(child) for unit, child in sorted(node.items()) if unit]
+        if not alternatives:
+            return ""
+        body = alternatives[0] if len(alternatives) == 1 else "(?:" + "|".join(alternatives) + ")"
+        # A term ending here makes the longer continuations optional
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+
+def compile_lexicon(lexicon=BIAS_LEXICON):
+    """Compile every term into one case-insensitive regex plus a term -> category map."""
+    term_categories = {_normalize(t): category for category, terms in lexicon.items() for t in terms}
+    pattern = re.compile(r"\b" + _trie_pattern(term_categories) + r"\b", re.IGNORECASE)
+    return pattern, term_categories
+
+
+_PATTERN, _TERM_CATEGORIES = compile_lexicon()
+_PRONOUN_PATTERNS = {group: r"\b(?:" + "|".join(words) + r")\b" for group, words in PRONOUNS.items()}
+
+
+def scan_text(text, pattern=_PATTERN, term_categories=_TERM_CATEGORIES):
+    """Return ``(start, end, category, term)`` tuples for every match in ``text``."""
+    spans = []
+    for m in pattern.finditer(text or ""):
+        term = _normalize(m.group())
+        spans.append((m.start(), m.end(), term_categories[term], term))
+    return spans
+
+
+def category_counts(spans):
+    """Count matches per category, including categories with no hits."""
+    counts = dict.fromkeys(CATEGORY_COLORS, 0)
+    for _, _, category, _ in spans:
+        counts[category] = counts.get(category, 0) + 1
+    return counts
+
+
+def highlight_html(text, spans):
+    """Wrap each matched span in a coloured ``<mark>`` tag, escaping everything else."""
+    out, last = [], 0
+    for start, end, category, term in spans:
+        out.append(html.escape(text[last:start]))
+        color = CATEGORY_COLORS.get(category, "#eee")
+        out.append(
+            f"<mark style='background:{color}; padding:0 2px;' title='{html.escape(category)}'>"
+            f"{html.escape(text[start:end])}</mark>"
+        )
+        last = end
+    out.append(html.escape(text[last:]))
+    return "".join(out)
+
+
+def scan_batch(texts, pattern=_PATTERN, term_categories=_TERM_CATEGORIES):
+    """Scan many texts in one regex pass.
+
+    Returns ``(matches, counts)``: a DataFrame with one row per match
+    (``row``, ``category``, ``term``) and a per-row DataFrame of category counts.
+    """
+    texts = pd.Series(texts, dtype="object").fillna("").astype(str).reset_index(drop=True)
+    # Matches never span a newline once rows are flattened, so it safely separates rows
+    flat = texts.str.replace("\n", " ", regex=False)
+    buffer = "\n".join(flat)
+    lengths = flat.str.len().to_numpy() + 1
+    row_starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+
+    starts, terms = [], []
+    for m in pattern.finditer(buffer):
+        starts.append(m.start())
+        terms.append(m.group())
+
+    rows = np.searchsorted(row_starts, np.asarray(starts, dtype=np.int64), side="right") - 1
+    terms = pd.Series(terms, dtype="object").str.lower().str.replace(_SEPARATOR, " ", regex=True)
+    matches = pd.DataFrame({
+        "row": rows,
+        "category": pd.Categorical(terms.map(term_categories), categories=list(CATEGORY_COLORS)),
+        "term": terms,
+    })
+    n_categories = len(CATEGORY_COLORS)
+    flat_counts = np.bincount(
+        rows * n_categories + matches["category"].cat.codes.to_numpy(),
+        minlength=len(texts) * n_categories,
+    )
+    counts = pd.DataFrame(flat_counts.reshape(len(texts), n_categories), columns=list(CATEGORY_COLORS))
+    counts["Total"] = counts.sum(axis=1)
+    return matches, counts
+
+
+def pronoun_counts(texts):
+    """Pronoun uses per group across ``texts``: context for the scan, not a finding on its own."""
+    texts = pd.Series(texts, dtype="object").fillna("").astype(str)
+    return pd.Series({group: int(texts.str.count(pattern, flags=re.IGNORECASE).sum()) for group, pattern in _PRONOUN_PATTERNS.items()},
+                     name="Uses")
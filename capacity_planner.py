@@ -0,0 +1,190 @@
+"""Throughput and rate-limit capacity planning for LLM API traffic.
+
+Two views of the same workload:
+
+* ``analytic_metrics`` uses the Erlang C formula with the Allen-Cunneen
+  correction for bursty arrivals and variable latency (a G/G/c queue).
+* ``simulate_peak`` is a discrete-event simulation of the peak window with
+  ``c`` concurrent workers and provider RPM/TPM limits modelled as token
+  buckets, giving empirical p50/p95/p99 latency and throttling.
+"""
+import heapq
+import math
+
+import numpy as np
+import pandas as pd
+
+# Provider limits are per minute; buckets may burst up to this many seconds of allowance
+BURST_WINDOW_SECONDS = 10
+# The simulation steps through requests one by one in Python. Faster peaks are simulated over a shorter
+# window at the same rate, so a run handles about this many arrivals at most.
+MAX_SIM_ARRIVALS = 100_000
+# Upper bound for the planner's daily volume input (~1,160 req/s on average)
+MAX_DAILY_REQUESTS = 100_000_000
+
+
+def _erlang_c(servers, offered_load):
+    """Probability an arrival has to wait in an M/M/c queue."""
+    if offered_load >= servers:
+        return 1.0
+    # Iterative Erlang B, then convert to Erlang C (numerically stable for large c)
+    b = 1.0
+    for k in range(1, servers + 1):
+        b = offered_load * b / (k + offered_load * b)
+    rho = offered_load / servers
+    return b / (1 - rho + rho * b)
+
+
+def _lognormal_params(mean, cv):
+    sigma2 = math.log(1 + cv ** 2)
+    return math.log(mean) - sigma2 / 2, math.sqrt(sigma2)
+
+
+def _service_quantile(mean, cv, q):
+    if cv <= 0:
+        return mean
+    mu, sigma = _lognormal_params(mean, cv)
+    # Normal quantile via an inverse-erf approximation
+    z = math.sqrt(2) * _erfinv(2 * q - 1)
+    return math.exp(mu + sigma * z)
+
+
+def _erfinv(y):
+    # Winitzki's approximation, accurate to ~1e-3, plenty for planning
+    a = 0.147
+    ln = math.log(1 - y * y)
+    first = 2 / (math.pi * a) + ln / 2
+    return math.copysign(math.sqrt(math.sqrt(first ** 2 - ln / a) - first), y)
+
+
+def analytic_metrics(arrival_rate, service_time, servers, arrival_cv=1.0, service_cv=1.0):
+    """Utilisation, wait probability, mean wait and p95/p99 latency for a G/G/c queue."""
+    offered = arrival_rate * service_time
+    rho = offered / servers if servers else float("inf")
+    if rho >= 1:
+        return {"Utilisation": rho, "P(wait)": 1.0, "Mean wait (s)": float("inf"),
+                "p50 latency (s)": float("inf"), "p95 latency (s)": float("inf"), "p99 latency (s)": float("inf")}
+
+    p_wait = _erlang_c(servers, offered)
+    variability = (arrival_cv ** 2 + service_cv ** 2) / 2
+    drain_rate = servers / service_time - arrival_rate
+    mean_wait = p_wait / drain_rate * variability
+
+    def wait_quantile(q):
+        # Waits are exponential given that a wait happens: P(W > t) = P(wait) * exp(-drain * t)
+        return 0.0 if p_wait <= 1 - q else math.log(p_wait / (1 - q)) / drain_rate * variability
+
+    return {
+        "Utilisation": rho,
+        "P(wait)": p_wait,
+        "Mean wait (s)": mean_wait,
+        "p50 latency (s)": _service_quantile(service_time, service_cv, 0.5) + wait_quantile(0.5),
+        "p95 latency (s)": _service_quantile(service_time, service_cv, 0.95) + wait_quantile(0.95),
+        "p99 latency (s)": _service_quantile(service_time, service_cv, 0.99) + wait_quantile(0.99),
+    }
+
+
+def required_concurrency(arrival_rate, service_time, arrival_cv=1.0, service_cv=1.0,
+                         max_utilisation=0.8, max_p95_wait=1.0):
+    """Smallest worker count that keeps utilisation and p95 queueing delay under target."""
+    servers = max(1, math.ceil(arrival_rate * service_time / max_utilisation))
+    while True:
+        m = analytic_metrics(arrival_rate, service_time, servers, arrival_cv, service_cv)
+        p95_wait = m["p95 latency (s)"] - _service_quantile(service_time, service_cv, 0.95)
+        if m["Utilisation"] <= max_utilisation and p95_wait <= max_p95_wait:
+            return servers
+        servers += 1
+
+
+def rate_limit_capacity(tokens_per_request, rpm_limit, tpm_limit):
+    """Highest sustainable requests/second under the RPM and TPM limits, and which one binds."""
+    by_rpm = rpm_limit / 60 if rpm_limit else float("inf")
+    by_tpm = tpm_limit / 60 / tokens_per_request if tpm_limit else float("inf")
+    return (by_rpm, "RPM") if by_rpm <= by_tpm else (by_tpm, "TPM")
+
+
+def daily_profile(requests_per_day, peak_to_mean, hours=24, peak_hour=14):
+    """Hourly arrival rates (req/s) with the given daily volume and peak-to-mean ratio."""
+    phase = np.cos(2 * np.pi * (np.arange(hours) - peak_hour) / hours)
+
+    def peak_ratio(k):
+        w = np.exp(k * phase)
+        return w.max() / w.mean()
+
+    # Bisect the curve sharpness until the busiest hour hits the requested ratio
+    lo, hi = 0.0, 20.0
+    for _ in range(60):
+        mid = (lo + hi) / 2
+        lo, hi = (mid, hi) if peak_ratio(mid) < peak_to_mean else (lo, mid)
+    weights = np.exp(lo * phase)
+    weights /= weights.mean()
+    mean_rate = requests_per_day / 86400
+    return pd.DataFrame({"Hour": np.arange(hours), "Requests/s": mean_rate * weights})
+
+
+def simulate_peak(arrival_rate, service_time, servers, tokens_per_request, rpm_limit=None, tpm_limit=None,
+                  arrival_cv=1.0, service_cv=0.5, duration=600, seed=0, max_arrivals=MAX_SIM_ARRIVALS):
+    """Discrete-event simulation of ``duration`` seconds at ``arrival_rate``.
+
+    Requests are served FIFO by ``servers`` workers and may only start when
+    both the RPM and TPM token buckets have allowance left. The window is
+    shortened if it would see more than ``max_arrivals`` requests; the
+    result reports the seconds actually simulated.
+    """
+    duration = min(duration, max_arrivals / arrival_rate)
+    rng = np.random.default_rng(seed)
+    n = max(1, int(rng.poisson(arrival_rate * duration)))
+    if arrival_cv > 0:
+        # Gamma inter-arrivals: shape 1/cv^2 gives the requested burstiness
+        shape = 1 / arrival_cv ** 2
+        gaps = rng.gamma(shape, 1 / (arrival_rate * shape), n)
+    else:
+        gaps = np.full(n, 1 / arrival_rate)
+    arrivals = np.cumsum(gaps)
+    if service_cv > 0:
+        mu, sigma = _lognormal_params(service_time, service_cv)
+        services = rng.lognormal(mu, sigma, n)
+    else:
+        services = np.full(n, service_time)
+
+    buckets = []
+    if rpm_limit:
+        buckets.append([rpm_limit / 60, rpm_limit / 60 * BURST_WINDOW_SECONDS, 1.0])
+    if tpm_limit:
+        buckets.append([tpm_limit / 60, tpm_limit / 60 * BURST_WINDOW_SECONDS, float(tokens_per_request)])
+    levels = [b[1] for b in buckets]
+    last_refill = 0.0
+
+    free_at = [0.0] * servers
+    starts = np.empty(n)
+    throttled = np.zeros(n, dtype=bool)
+    for i in range(n):
+        # FIFO: nobody overtakes a request that is still waiting on the rate limiter
+        start = max(arrivals[i], free_at[0], last_refill)
+        # Wait for every bucket to hold enough allowance, then spend it
+        ready = start
+        for (rate, cap, need), level in zip(buckets, levels):
+            level = min(cap, level + rate * (start - last_refill))
+            if level < need:
+                ready = max(ready, start + (need - level) / rate)
+        if ready > start:
+            throttled[i] = True
+        for j, (rate, cap, need) in enumerate(buckets):
+            levels[j] = min(cap, levels[j] + rate * (ready - last_refill)) - need
+        last_refill = ready
+        starts[i] = ready
+        heapq.heapreplace(free_at, ready + services[i])
+
+    waits = starts - arrivals
+    latency = waits + services
+    return {
+        "Requests": n,
+        "Simulated seconds": duration,
+        "Throughput (req/s)": n / (starts + services).max(),
+        "Mean wait (s)": waits.mean(),
+        "p50 latency (s)": np.percentile(latency, 50),
+        "p95 latency (s)": np.percentile(latency, 95),
+        "p99 latency (s)": np.percentile(latency, 99),
+        "Throttled %": throttled.mean() * 100,
+        "Backlog at end": int((starts > arrivals[-1]).sum()),
+    }
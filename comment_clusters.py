@@ -0,0 +1,199 @@
+"""Incremental theme clustering of feedback comments.
+
+Comments are turned into sparse TF-IDF vectors without a fitted vocabulary:
+a ``HashingVectorizer`` gives term counts and document frequencies are kept
+as running totals, so IDF is updated online. Clusters come from
+``MiniBatchKMeans.partial_fit``. Each new submission is one small update,
+not a refit. The model state is pickled next to the feedback store so a
+restart picks up where it left off.
+
+The saved state holds no comment text: comments are tracked by hashed
+fingerprints, early comments wait as hashed term counts, and theme labels
+are looked up from the comments passed to ``summary``.
+"""
+import os
+import pickle
+import threading
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.preprocessing import normalize
+from sklearn.utils import murmurhash3_32
+
+from submission_guard import fingerprint
+
+CLUSTERS_PATH = "comment_clusters.pkl"
+N_CLUSTERS = 6
+N_FEATURES = 2 ** 16
+MIN_COMMENT_CHARS = 3
+# Bumped when the pickled layout changes; older files are rebuilt from the store
+STATE_VERSION = 2
+
+
+class CommentClusterer:
+    """Online TF-IDF + mini-batch k-means over feedback comments."""
+
+    def __init__(self, n_clusters=N_CLUSTERS, n_features=N_FEATURES):
+        self.vectorizer = HashingVectorizer(n_features=n_features, alternate_sign=False, norm=None,
+                                            stop_words="english", ngram_range=(1, 2))
+        self._lock = threading.Lock()
+        self._reset_state(n_clusters)
+
+    def _reset_state(self, n_clusters):
+        self.n_clusters = n_clusters
+        self.doc_freq = np.zeros(self.vectorizer.n_features, dtype=np.int32)
+        self.n_docs = 0
+        self.model = MiniBatchKMeans(n_clusters=n_clusters, random_state=0, n_init=3)
+        self.fitted = False
+        self.seen = set()       # fingerprints of comments already folded in
+        self.waiting = None     # hashed term counts held back until there are enough to initialise
+
+    def reset(self, n_clusters):
+        """Start over with ``n_clusters`` themes; the next ``add_feedback`` refits from the store."""
+        with self._lock:
+            self._reset_state(n_clusters)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_lock"]
+        state["version"] = STATE_VERSION
+        return state
+
+    def __setstate__(self, state):
+        if state.pop("version", None) != STATE_VERSION:
+            raise ValueError("saved clusterer is from an older version")
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def _term_index(self, comments):
+        """Hashed feature index -> a term from ``comments`` that maps to it, for labelling."""
+        terms = {}
+        analyzer = self.vectorizer.build_analyzer()
+        for comment in comments:
+            for term in analyzer(comment):
+                terms.setdefault(abs(murmurhash3_32(term, seed=0)) % self.vectorizer.n_features, term)
+        return terms
+
+    def _tfidf(self, counts):
+        idf = np.log((1 + self.n_docs) / (1 + self.doc_freq)) + 1
+        # float32 keeps the dense cluster centres (and the saved state) small
+        return normalize(counts.multiply(idf).tocsr()).astype(np.float32)
+
+    def vectorize(self, comments):
+        """TF-IDF vectors for ``comments`` using the current running IDF."""
+        return self._tfidf(self.vectorizer.transform(comments))
+
+    def add(self, comments, names=None):
+        """Fold new comments into the IDF and the clusters; already-seen ones are skipped.
+
+        Returns the number of comments added.
+        """
+        names = names if names is not None else [""] * len(comments)
+        with self._lock:
+            fresh = []
+            for name, comment in zip(names, comments):
+                comment = str(comment or "").strip()
+                key = fingerprint(name, comment)
+                if len(comment) < MIN_COMMENT_CHARS or key in self.seen:
+                    continue
+                self.seen.add(key)
+                fresh.append(comment)
+            if not fresh:
+                return 0
+
+            counts = self.vectorizer.transform(fresh)
+            self.doc_freq += np.bincount(counts.indices, minlength=len(self.doc_freq))
+            self.n_docs += len(fresh)
+
+            # k-means needs at least k points for its first batch
+            batch = sp.vstack([self.waiting, counts]).tocsr() if self.waiting is not None else counts
+            if batch.shape[0] < self.n_clusters:
+                self.waiting = batch
+                return len(fresh)
+            self.model.partial_fit(self._tfidf(batch))
+            self.fitted, self.waiting = True, None
+            return len(fresh)
+
+    def add_feedback(self, feedback):
+        """Bring the clusters in line with the feedback store (a DataFrame of its rows).
+
+        New comments are folded in. If comments the model has seen are gone
+        from the store (cleared, or expired by retention), it is refit from
+        the rows that remain. Returns True if the state changed.
+        """
+        if "Feedback" not in feedback:
+            return False
+        comments = feedback["Feedback"].fillna("").astype(str).str.strip().tolist()
+        names = feedback["Name"].fillna("").tolist()
+        present = {fingerprint(name, comment) for name, comment in zip(names, comments)}
+        with self._lock:
+            stale = not self.seen <= present
+        if stale:
+            self.reset(self.n_clusters)
+        return self.add(comments, names) > 0 or stale
+
+    def assign(self, comments):
+        """Cluster index for each comment (-1 for blanks or before the model is initialised)."""
+        labels = np.full(len(comments), -1)
+        texts = [str(c or "").strip() for c in comments]
+        keep = [i for i, t in enumerate(texts) if len(t) >= MIN_COMMENT_CHARS]
+        if self.fitted and keep:
+            with self._lock:
+                labels[keep] = self.model.predict(self.vectorize([texts[i] for i in keep]))
+        return labels
+
+    def top_terms(self, cluster, terms, n=6):
+        """Highest-weighted terms of a cluster centre, named through a ``_term_index`` map."""
+        order = np.argsort(self.model.cluster_centers_[cluster])[::-1]
+        return [terms[i] for i in order[:n * 3] if i in terms][:n]
+
+    def summary(self, comments, n_terms=6, n_examples=3):
+        """One row per theme: size, top terms and the comments nearest its centre."""
+        if not self.fitted:
+            return pd.DataFrame(columns=["Theme", "Comments", "Top terms", "Representative comments"])
+        texts = pd.Series([str(c or "").strip() for c in comments])
+        texts = texts[texts.str.len() >= MIN_COMMENT_CHARS].drop_duplicates()
+        with self._lock:
+            distances = self.model.transform(self.vectorize(texts.tolist()))
+        labels = distances.argmin(axis=1)
+        terms = self._term_index(texts)
+        rows = []
+        for cluster in range(self.n_clusters):
+            members = np.flatnonzero(labels == cluster)
+            nearest = members[np.argsort(distances[members, cluster])[:n_examples]]
+            rows.append({
+                "Theme": cluster + 1,
+                "Comments": len(members),
+                "Top terms": ", ".join(self.top_terms(cluster, terms, n_terms)),
+                "Representative comments": [texts.iloc[i] for i in nearest],
+            })
+        return pd.DataFrame(rows).sort_values("Comments", ascending=False, ignore_index=True)
+
+
+def load_clusterer(path=CLUSTERS_PATH):
+    """Restore the saved clusterer (with whatever theme count it was saved at), or start a fresh one."""
+    if os.path.exists(path):
+        try:
+            with open(path, "rb") as f:
+                return pickle.load(f)
+        except Exception:
+            pass  # unreadable or from an older version: rebuild from the feedback store
+    return CommentClusterer()
+
+
+def save_clusterer(clusterer, path=CLUSTERS_PATH):
+    """Atomically persist the clusterer state."""
+    tmp = os.path.join(os.path.dirname(path) or ".", f".{os.path.basename(path)}.tmp")
+    with clusterer._lock, open(tmp, "wb") as f:
+        pickle.dump(clusterer, f)
+    os.replace(tmp, path)
+
+
+def clear_clusterer(clusterer, path=CLUSTERS_PATH):
+    """Forget every comment: reset the shared clusterer and delete its saved state."""
+    clusterer.reset(clusterer.n_clusters)
+    if os.path.exists(path):
+        os.remove(path)
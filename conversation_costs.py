@@ -0,0 +1,119 @@
+"""Cost of multi-turn chat under different context policies.
+
+A chatbot resends its history on every turn, so input tokens grow with the
+conversation and cost grows roughly quadratically. ``simulate_conversations``
+draws thousands of conversations at once as ``(conversations, turns)``
+arrays of message sizes. Each policy below is a handful of cumulative-sum
+operations over those arrays:
+
+* ``full``: the whole history every turn.
+* ``window``: only the last ``window`` exchanges.
+* ``summarize``: every ``summary_every`` turns the history is replaced by a
+  summary of ``summary_tokens`` (the summarization calls are billed too).
+* ``cache``: full history, but the prefix already sent on the previous turn
+  is billed at the provider's cached-input rate.
+"""
+import numpy as np
+import pandas as pd
+
+POLICIES = ["full", "window", "summarize", "cache"]
+POLICY_LABELS = {
+    "full": "Full history",
+    "window": "Sliding window",
+    "summarize": "Periodic summarization",
+    "cache": "Prompt caching",
+}
+
+
+def _lognormal(rng, mean, cv, size):
+    sigma2 = np.log(1 + cv ** 2)
+    return np.maximum(1, rng.lognormal(np.log(mean) - sigma2 / 2, np.sqrt(sigma2), size)).round()
+
+
+def simulate_conversations(n_conversations=5000, mean_turns=10, max_turns=60, user_tokens=60, reply_tokens=250,
+                           size_cv=0.6, seed=0):
+    """Draw message sizes and lengths for ``n_conversations`` chats.
+
+    Returns ``(user, reply, active)`` arrays of shape ``(n_conversations, max_turns)``;
+    ``active`` marks turns that happen (lengths are geometric with the given mean).
+    """
+    rng = np.random.default_rng(seed)
+    shape = (n_conversations, max_turns)
+    lengths = np.minimum(rng.geometric(1 / max(mean_turns, 1), n_conversations), max_turns)
+    active = np.arange(max_turns) < lengths[:, None]
+    user = _lognormal(rng, user_tokens, size_cv, shape) * active
+    reply = _lognormal(rng, reply_tokens, size_cv, shape) * active
+    return user, reply, active
+
+
+def _shift(a, k):
+    """``a`` shifted right by ``k`` turns, zero-filled."""
+    out = np.zeros_like(a)
+    if k < a.shape[1]:
+        out[:, k:] = a[:, :a.shape[1] - k]
+    return out
+
+
+def context_tokens(user, reply, active, policy, system_tokens=300, window=4, summary_every=8, summary_tokens=300):
+    """Input tokens per turn, and any extra (input, output) tokens spent on summarization."""
+    exchange = user + reply
+    history = np.cumsum(exchange, axis=1) - exchange  # everything before this turn
+    extra_in = np.zeros_like(user)
+    extra_out = np.zeros_like(user)
+
+    if policy in ("full", "cache"):
+        kept = history
+    elif policy == "window":
+        kept = history - _shift(history, window)
+    elif policy == "summarize":
+        turn = np.arange(user.shape[1])
+        block_start = (turn // summary_every) * summary_every
+        # The latest summary (once one exists) plus everything said since it was written
+        kept = history - history[:, block_start] + np.where(turn >= summary_every, summary_tokens, 0)
+        # Each block boundary adds a call that reads the previous summary and the block, and writes a new one
+        boundary = (turn > 0) & (turn % summary_every == 0)
+        block = history - _shift(history, summary_every)
+        previous = np.where(turn >= 2 * summary_every, summary_tokens, 0)
+        extra_in = np.where(boundary, block + previous, 0) * active
+        extra_out = np.where(boundary, summary_tokens, 0) * active
+    else:
+        raise ValueError(f"Unknown policy: {policy}")
+
+    return (system_tokens + kept + user) * active, extra_in, extra_out
+
+
+def turn_costs(user, reply, active, policy, price_per_1k, cached_price_ratio=0.5, cache_min_tokens=1024, **params):
+    """Per-turn ``(context tokens, cost in USD)`` arrays for one policy."""
+    context, extra_in, extra_out = context_tokens(user, reply, active, policy, **params)
+    billed_input = context.astype(np.float64)
+    if policy == "cache":
+        # The previous request's input is a cached prefix once it is long enough to be cached
+        prefix = _shift(context, 1)
+        cached = np.where(prefix >= cache_min_tokens, prefix, 0)
+        billed_input = context - cached + cached * cached_price_ratio
+    cost = (billed_input + reply + extra_in + extra_out) / 1000 * price_per_1k
+    return context, cost * active
+
+
+def compare_policies(user, reply, active, price_per_1k, context_limit=8192, policies=POLICIES, **params):
+    """Summary per policy and a per-turn profile (mean context, mean cost) for charting."""
+    summary, profile = [], {}
+    n_conversations = user.shape[0]
+    for policy in policies:
+        context, cost = turn_costs(user, reply, active, policy, price_per_1k, **params)
+        turns_active = active.sum(axis=0)
+        label = POLICY_LABELS[policy]
+        summary.append({
+            "Policy": label,
+            "Cost per conversation ($)": cost.sum() / n_conversations,
+            "Cost per turn ($)": cost.sum() / active.sum(),
+            "Mean context (tokens)": context[active].mean(),
+            "Max context (tokens)": int(context.max()),
+            "Turns over context limit %": (context[active] > context_limit).mean() * 100,
+        })
+        with np.errstate(invalid="ignore", divide="ignore"):
+            profile[(label, "context")] = context.sum(axis=0) / turns_active
+            profile[(label, "cost")] = cost.sum(axis=0) / turns_active
+    profile = pd.DataFrame(profile, index=pd.RangeIndex(1, user.shape[1] + 1, name="Turn"))
+    profile = profile[active.sum(axis=0) > 0]
+    return pd.DataFrame(summary).set_index("Policy"), profile
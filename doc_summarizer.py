@@ -0,0 +1,265 @@
+"""Map-reduce summarization of documents longer than a context window.
+
+The pipeline has three stages:
+
+1. **Chunk**: the document is read from a stream in fixed-size blocks and
+   split into sentences. Sentences are packed into chunks of at most
+   ``chunk_tokens`` tokens, and each chunk repeats the last
+   ``overlap_tokens`` of the previous one. Only the chunk being built is
+   held in memory.
+2. **Map**: each chunk is summarized as soon as it is ready, on a thread
+   pool with a bounded number of chunks in flight.
+3. **Reduce**: partial summaries are packed into groups that fit the
+   chunk budget and summarized again, level by level, until one remains.
+
+Backends are pluggable. A backend has ``summarize(texts, max_tokens)``
+returning one string per text, ``count_tokens(texts)`` in the units its
+input limit is measured in, and ``max_input_tokens(summary_tokens)``: the
+most text one call can take, or None for no limit. Chunks and reduce groups
+are sized with the backend's own counts and capped at that limit, so no
+input is silently cut off by a model's context window.
+``ExtractiveBackend`` needs no model. ``LocalModelBackend`` sends prompts to
+the shared ``InferenceWorker``, so concurrent map calls share its batches.
+Tokens are also counted with ``token_costs`` for every call, so the report
+can price the run at API rates.
+"""
+import re
+import time
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+import token_costs
+
+CHUNK_TOKENS = 1000
+OVERLAP_TOKENS = 100
+SUMMARY_TOKENS = 150
+MAP_WORKERS = 4
+BLOCK_CHARS = 64 * 1024
+# A backend whose context leaves less text room than this per call is refused
+MIN_INPUT_TOKENS = 64
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+|\n\s*\n")
+_WORD = re.compile(r"[a-z][a-z'-]+")
+_STOP_WORDS = frozenset("""
+a an and are as at be but by for from has have he her his i if in into is it its of on or our she so that the
+their them they this to was we were will with you your not can all also more than then there these those which
+""".split())
+
+
+class ExtractiveBackend:
+    """Picks each text's highest-scoring sentences (by in-text word frequency), in their original order."""
+
+    name = "Extractive (no model)"
+    count_tokens = staticmethod(token_costs.count_tokens_many)
+
+    def max_input_tokens(self, summary_tokens):
+        return None
+
+    def summarize(self, texts, max_tokens):
+        return [self._summarize(text, max_tokens) for text in texts]
+
+    @staticmethod
+    def _summarize(text, max_tokens):
+        # Overlapping chunks repeat sentences; keep the first copy of each
+        sentences = list(dict.fromkeys(s.strip() for s in _SENTENCE_END.split(text) if s.strip()))
+        words = [[w for w in _WORD.findall(s.lower()) if w not in _STOP_WORDS] for s in sentences]
+        freq = Counter(w for ws in words for w in ws)
+        scores = [sum(freq[w] for w in ws) / (len(ws) + 1) for ws in words]
+        lengths = token_costs.count_tokens_many(sentences)
+        chosen, used = set(), 0
+        for i in sorted(range(len(sentences)), key=lambda i: -scores[i]):
+            if used + lengths[i] <= max_tokens:
+                chosen.add(i)
+                used += lengths[i]
+        return " ".join(sentences[i] for i in sorted(chosen))
+
+
+class LocalModelBackend:
+    """Summaries generated by the local ``InferenceWorker`` model."""
+
+    name = "Local model worker"
+    prompt = "Summarize the following text.\n\n{text}\n\nSummary:"
+
+    def __init__(self, worker, timeout=120):
+        self.worker = worker
+        self.timeout = timeout
+
+    def count_tokens(self, texts):
+        return self.worker.count_tokens(texts)
+
+    def max_input_tokens(self, summary_tokens):
+        """Text that fits the model's context next to the prompt template and a ``summary_tokens`` reply.
+
+        A reduce call joins at least two summaries, so the limit must hold two.
+        """
+        context = self.worker.context_length
+        room = context - self.count_tokens([self.prompt.format(text="")])[0] - summary_tokens
+        if room < max(MIN_INPUT_TOKENS, 2 * summary_tokens + 2):
+            raise ValueError(f"The local model's {context}-token context has no room for the text to summarize "
+                             f"with {summary_tokens}-token summaries; lower the summary length.")
+        return room
+
+    def summarize(self, texts, max_tokens):
+        results = self.worker.generate_many(
+            [{"prompt": self.prompt.format(text=t), "temperature": 0.3, "max_new_tokens": max_tokens}
+             for t in texts], timeout=self.timeout)
+        return [r["text"].strip() for r in results]
+
+
+def read_sentences(stream, block_chars=BLOCK_CHARS):
+    """Yield sentences from a text stream, reading ``block_chars`` at a time."""
+    tail = ""
+    while True:
+        block = stream.read(block_chars)
+        if not block:
+            break
+        parts = _SENTENCE_END.split(tail + block)
+        # The last part may continue in the next block
+        tail = parts.pop()
+        yield from (p.strip() for p in parts if p and p.strip())
+    if tail.strip():
+        yield tail.strip()
+
+
+def _split_long(sentence, max_tokens, count=token_costs.count_tokens_many):
+    """Break a sentence longer than ``max_tokens`` into word runs that fit."""
+    words = sentence.split()
+    piece, size = [], 0
+    for word, n in zip(words, count([" " + w for w in words])):
+        if piece and size + n > max_tokens:
+            yield " ".join(piece), size
+            piece, size = [], 0
+        piece.append(word)
+        size += n
+    if piece:
+        yield " ".join(piece), size
+
+
+def stream_chunks(sentences, chunk_tokens=CHUNK_TOKENS, overlap_tokens=OVERLAP_TOKENS,
+                  count=token_costs.count_tokens_many):
+    """Pack sentences into chunks of at most ``chunk_tokens`` that overlap by up to ``overlap_tokens``.
+
+    ``count`` maps a list of texts to token counts; sizes are in its units.
+    """
+    window, size, fresh = deque(), 0, False
+
+    for sentence in sentences:
+        # Counted with the space that joins it to the chunk
+        n = count([" " + sentence])[0]
+        pieces = _split_long(sentence, chunk_tokens, count) if n > chunk_tokens else [(sentence, n)]
+        for piece, n in pieces:
+            if fresh and size + n > chunk_tokens:
+                yield " ".join(p for p, _ in window)
+                # Carry the tail forward as overlap, leaving room for the new piece
+                while window and (size > overlap_tokens or size + n > chunk_tokens):
+                    size -= window.popleft()[1]
+                fresh = False
+            window.append((piece, n))
+            size += n
+            fresh = True
+    if fresh:
+        yield " ".join(p for p, _ in window)
+
+
+def _pack(texts, budget, count=token_costs.count_tokens_many):
+    """Group consecutive texts up to ``budget`` tokens, at least two per group so every level shrinks.
+
+    A last text left on its own joins the previous group only if it still fits.
+    """
+    groups, sizes, current, size = [], [], [], 0
+    for text, n in zip(texts, count(["\n\n" + t for t in texts])):
+        if len(current) >= 2 and size + n > budget:
+            groups.append(current)
+            sizes.append(size)
+            current, size = [], 0
+        current.append(text)
+        size += n
+    if len(current) == 1 and groups and sizes[-1] + size <= budget:
+        groups[-1].append(current[0])
+    elif current:
+        groups.append(current)
+    return ["\n\n".join(g) for g in groups]
+
+
+def summarize_document(stream, backend, chunk_tokens=CHUNK_TOKENS, overlap_tokens=OVERLAP_TOKENS,
+                       summary_tokens=SUMMARY_TOKENS, workers=MAP_WORKERS, progress=None):
+    """Summarize a text stream; returns ``(summary, stages)``.
+
+    ``stages`` has one row per stage (chunk, map, each reduce level) with calls,
+    input/output tokens and wall-clock seconds. ``progress`` is called with a
+    short status string as the run advances. ``chunk_tokens`` is capped at
+    the backend's ``max_input_tokens``.
+    """
+    stages = []
+    limit = backend.max_input_tokens(summary_tokens)
+    if limit is not None:
+        chunk_tokens = min(chunk_tokens, limit)
+
+    def call(texts_in, texts_out):
+        return (sum(token_costs.count_tokens_many(texts_in)), sum(token_costs.count_tokens_many(texts_out)))
+
+    def run(text):
+        summary = backend.summarize([text], summary_tokens)[0]
+        return summary, call([text], [summary])
+
+    chunk_seconds, chunk_count, document_tokens = 0.0, 0, 0
+    summaries, map_in, map_out = [], 0, 0
+    started = time.perf_counter()
+    with ThreadPoolExecutor(workers) as pool:
+        in_flight = deque()
+
+        def collect(future):
+            nonlocal map_in, map_out
+            summary, (tokens_in, tokens_out) = future.result()
+            summaries.append(summary)
+            map_in, map_out = map_in + tokens_in, map_out + tokens_out
+
+        chunks = stream_chunks(read_sentences(stream), chunk_tokens, overlap_tokens, backend.count_tokens)
+        while True:
+            tick = time.perf_counter()
+            chunk = next(chunks, None)
+            chunk_seconds += time.perf_counter() - tick
+            if chunk is None:
+                break
+            chunk_count += 1
+            document_tokens += token_costs.count_tokens(chunk)
+            in_flight.append(pool.submit(run, chunk))
+            # Bounded look-ahead: at most two chunks per worker are held in memory
+            while len(in_flight) >= 2 * workers:
+                collect(in_flight.popleft())
+            if progress:
+                progress(f"Chunked {chunk_count} • summarized {len(summaries)}")
+        while in_flight:
+            collect(in_flight.popleft())
+        map_seconds = time.perf_counter() - started
+
+        stages.append({"Stage": "Chunk", "Calls": chunk_count, "Input tokens": document_tokens,
+                       "Output tokens": 0, "Seconds": chunk_seconds})
+        stages.append({"Stage": "Map", "Calls": chunk_count, "Input tokens": map_in, "Output tokens": map_out,
+                       "Seconds": map_seconds - chunk_seconds})
+
+        level = 0
+        while len(summaries) > 1:
+            level += 1
+            groups = _pack(summaries, chunk_tokens, backend.count_tokens)
+            if progress:
+                progress(f"Reduce level {level}: {len(summaries)} summaries in {len(groups)} groups")
+            tick = time.perf_counter()
+            results = list(pool.map(run, groups))
+            summaries = [summary for summary, _ in results]
+            stages.append({"Stage": f"Reduce {level}", "Calls": len(groups),
+                           "Input tokens": sum(t[0] for _, t in results),
+                           "Output tokens": sum(t[1] for _, t in results),
+                           "Seconds": time.perf_counter() - tick})
+
+    return (summaries[0] if summaries else ""), pd.DataFrame(stages)
+
+
+def price_stages(stages, price_per_1k):
+    """Add a cost column (same per-1K price for input and output, as in the cost estimator)."""
+    stages = stages.copy()
+    billed = stages["Stage"] != "Chunk"
+    stages["Cost ($)"] = ((stages["Input tokens"] + stages["Output tokens"]) / 1000 * price_per_1k).where(billed, 0.0)
+    return stages
@@ -0,0 +1,331 @@
+"""Export the read-only parts of the guide as a static HTML site.
+
+Every section and sub-topic is rendered by running the real app script
+headlessly (Streamlit's AppTest), then its element tree is converted to
+plain HTML. Interactive widgets are replaced with a link to the live app,
+so a file server or CDN can serve the reading traffic and only the tools
+and the Feedback page need the Streamlit server.
+
+Usage:
+    python export_static_site.py --out site --app-url https://guide.example.com
+"""
+import argparse
+import html
+import os
+import re
+import shutil
+import tempfile
+from contextlib import contextmanager
+from urllib.parse import quote
+
+import markdown
+from streamlit.testing.v1 import AppTest
+from streamlit.testing.v1 import app_test as _app_test
+from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+
+from app_source import APP_DIR, APP_SCRIPT, copy_static_files, read_page_titles
+import usage_analytics
+
+CSS_FILE = "WebAppstyling.css"
+
+# Pages that are entirely interactive and stay on the Streamlit server
+LIVE_ONLY_PAGES = {"Feedback"}
+
+SUBTOPIC_LABEL = "Sub-topic"
+EXPAND_COLLAPSE_BUTTONS = {"➕", "➖"}
+WIDGET_TYPES = {
+    "button", "checkbox", "color_picker", "date_input", "download_button", "file_uploader", "multiselect",
+    "number_input", "radio", "select_slider", "selectbox", "slider", "text_area", "text_input", "time_input",
+    "toggle", "chat_input", "form",
+}
+ALERT_TYPES = {"success", "info", "warning", "error", "exception"}
+# Output shown right after a widget was computed from its default value, so it belongs to the tool
+RESULT_TYPES = ALERT_TYPES | {"metric", "dataframe", "table", "caption"}
+
+SITE_CSS = """
+body { margin: 0; font-family: "Source Sans Pro", system-ui, sans-serif; }
+.layout { display: flex; min-height: 100vh; }
+nav.sidebar { width: 250px; flex-shrink: 0; background: #f0f2f6; padding: 1.5rem 1rem; }
+nav.sidebar h2 { font-size: 1.2em; margin-top: 0; }
+nav.sidebar ul { list-style: none; margin: 0; padding: 0; }
+nav.sidebar li a { display: block; padding: 0.4rem 0.6rem; border-radius: 6px; color: #333; text-decoration: none; }
+nav.sidebar li a.active { background: #ff4b4b; color: #fff; }
+nav.sidebar li a.live::after { content: " \\2197"; }
+main { flex: 1; max-width: 1100px; padding: 2rem 3rem; }
+.subtopics { margin: 0 0 1.5rem; padding: 0; list-style: none; display: flex; flex-wrap: wrap; gap: 0.4rem; }
+.subtopics a { padding: 0.2rem 0.7rem; border: 1px solid #ddd; border-radius: 999px; color: #333; text-decoration: none; font-size: 0.9em; }
+.subtopics a.active { border-color: #ff4b4b; color: #ff4b4b; }
+details { border: 1px solid #e6e6e6; border-radius: 8px; padding: 0.6rem 1rem; margin-bottom: 0.8rem; }
+details > summary { cursor: pointer; font-weight: 600; }
+.columns { display: flex; gap: 1.5rem; }
+.columns > .column { flex: 1; min-width: 0; }
+.alert { padding: 0.8rem 1rem; border-radius: 8px; margin: 0.6rem 0; }
+.alert p { margin: 0; }
+.alert-success { background: #e8f7ee; } .alert-info { background: #e7f0fb; }
+.alert-warning { background: #fff8e1; } .alert-error, .alert-exception { background: #fdecea; }
+.caption { color: #777; font-size: 0.9em; }
+.live-tool { border: 1px dashed #ff4b4b; border-radius: 8px; padding: 0.8rem 1rem; margin: 0.6rem 0; }
+figure img { max-width: 100%; }
+iframe.video { width: 100%; aspect-ratio: 16 / 9; border: 0; }
+table { border-collapse: collapse; } th, td { border: 1px solid #ddd; padding: 0.3rem 0.6rem; text-align: left; }
+"""
+
+
+def slugify(text):
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-") or "page"
+
+
+class _CapturingMediaStorage(MemoryMediaFileStorage):
+    """Keeps a handle on the in-memory media store so exported images can be written out."""
+
+    instances = []
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        _CapturingMediaStorage.instances.append(self)
+
+
+@contextmanager
+def _capture_media():
+    original = _app_test.MemoryMediaFileStorage
+    _app_test.MemoryMediaFileStorage = _CapturingMediaStorage
+    try:
+        yield
+    finally:
+        _app_test.MemoryMediaFileStorage = original
+
+
+def _md(text, inline=False):
+    rendered = markdown.markdown(text or "", extensions=["tables", "fenced_code", "sane_lists"])
+    if inline:
+        rendered = re.sub(r"^<p>(.*)</p>$", r"\1", rendered.strip(), flags=re.S)
+    return rendered
+
+
+class HtmlRenderer:
+    """Convert an AppTest element tree into HTML fragments."""
+
+    def __init__(self, page, app_url, assets_prefix, assets_dir):
+        self.page = page
+        self.app_url = app_url
+        self.assets_prefix = assets_prefix
+        self.assets_dir = assets_dir
+
+    def live_link(self):
+        return f"{self.app_url.rstrip('/')}/?page={quote(self.page)}"
+
+    def render(self, node):
+        parts, pending_widget = [], False
+        for child in node.children.values():
+            if pending_widget and getattr(child, "type", "") in RESULT_TYPES:
+                continue
+            fragment = self.render_node(child)
+            if fragment is None:
+                # Collapse runs of widgets into a single "open in app" callout
+                if not pending_widget:
+                    parts.append(
+                        f"<div class='live-tool'>🔧 This part is interactive. "
+                        f"<a href='{html.escape(self.live_link())}'>Open it in the live app</a>.</div>"
+                    )
+                pending_widget = True
+                continue
+            if fragment:
+                parts.append(fragment)
+                pending_widget = False
+        return "\n".join(parts)
+
+    def render_node(self, node):
+        """Return HTML, ``""`` to skip the node, or None for an interactive widget."""
+        kind = getattr(node, "type", "")
+        if kind == "selectbox" and node.label == SUBTOPIC_LABEL:
+            return ""
+        if kind == "button" and node.label in EXPAND_COLLAPSE_BUTTONS:
+            return ""
+        if kind in WIDGET_TYPES:
+            return None
+        if kind == "markdown":
+            if node.value.lstrip().startswith("<style>"):
+                return ""
+            return _md(node.value)
+        if kind == "title":
+            return f"<h1>{html.escape(node.value)}</h1>"
+        if kind == "header":
+            return f"<h2>{html.escape(node.value)}</h2>"
+        if kind == "subheader":
+            return f"<h3>{html.escape(node.value)}</h3>"
+        if kind == "caption":
+            return f"<p class='caption'>{_md(node.value, inline=True)}</p>"
+        if kind == "text":
+            return f"<pre class='text'>{html.escape(node.value)}</pre>"
+        if kind == "code":
+            return f"<pre><code>{html.escape(node.value)}</code></pre>"
+        if kind in ALERT_TYPES:
+            return f"<div class='alert alert-{kind}'>{_md(str(node.value))}</div>"
+        if kind == "metric":
+            return f"<div class='metric'><span class='caption'>{html.escape(node.label)}</span><h3>{html.escape(node.value)}</h3></div>"
+        if kind == "image":
+            return self.render_image(node)
+        if kind == "video":
+            url = getattr(node.proto, "url", "")
+            return f"<iframe class='video' src='{html.escape(url)}' allowfullscreen></iframe>" if url else ""
+        if kind == "expander":
+            body = self.render(node)
+            return f"<details open><summary>{_md(node.label, inline=True)}</summary>\n{body}\n</details>"
+        if kind == "flex_container" and all(getattr(c, "type", "") == "column" for c in node.children.values()):
+            columns = [self.render(c) for c in node.children.values()]
+            if not any(c.strip() for c in columns):
+                return ""
+            return "<div class='columns'>" + "".join(f"<div class='column'>{c}</div>" for c in columns) + "</div>"
+        if kind in ("dataframe", "table"):
+            return node.value.to_html(classes="dataframe", border=0)
+        if hasattr(node, "children") and node.children:
+            return self.render(node)
+        # Anything else (custom components, charts, empty blocks) needs the live app
+        return None if kind in ("component_instance", "arrow_vega_lite_chart", "plotly_chart") else ""
+
+    def render_image(self, node):
+        figures = []
+        for url, caption in zip(node.value, node.captions):
+            file_id = url.rsplit("/", 1)[-1].split(".")[0]
+            for storage in _CapturingMediaStorage.instances:
+                try:
+                    media = storage.get_file(file_id)
+                except Exception:
+                    continue
+                name = os.path.basename(url)
+                with open(os.path.join(self.assets_dir, name), "wb") as f:
+                    f.write(media.content)
+                figures.append(
+                    f"<figure><img src='{self.assets_prefix}{name}' alt='{html.escape(caption)}'>"
+                    f"<figcaption class='caption'>{html.escape(caption)}</figcaption></figure>"
+                )
+                break
+        return "\n".join(figures)
+
+
+def _page_path(page, subtopic=None):
+    if subtopic is None or subtopic == "All":
+        return "index.html" if page == "Home" else f"{slugify(page)}/index.html"
+    return f"{slugify(page)}/{slugify(subtopic)}.html"
+
+
+def _layout(title, body, nav, subnav, root):
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>{html.escape(title)} · LLM Guide for Startups</title>
+<link rel="stylesheet" href="{root}assets/site.css">
+<link rel="stylesheet" href="{root}assets/{CSS_FILE}">
+</head>
+<body>
+<div class="layout">
+<nav class="sidebar"><h2>Sections</h2><ul>{nav}</ul></nav>
+<main>
+{subnav}
+{body}
+</main>
+</div>
+</body>
+</html>
+"""
+
+
+def _run_page(page, subtopic=None):
+    at = AppTest.from_file(APP_SCRIPT, default_timeout=120)
+    at.query_params["page"] = page
+    at.run()
+    if subtopic is not None:
+        picker = next(s for s in at.selectbox if s.label == SUBTOPIC_LABEL)
+        picker.set_value(subtopic).run()
+    if at.exception:
+        raise RuntimeError(f"{page} / {subtopic}: {at.exception[0].value}")
+    return at
+
+
+def export_site(out_dir, app_url):
+    """Render every static page and sub-topic into ``out_dir``. Returns the files written."""
+    page_titles = read_page_titles()
+    assets_dir = os.path.join(out_dir, "assets")
+    os.makedirs(assets_dir, exist_ok=True)
+    with open(os.path.join(assets_dir, "site.css"), "w", encoding="utf-8") as f:
+        f.write(SITE_CSS)
+    if os.path.exists(os.path.join(APP_DIR, CSS_FILE)):
+        shutil.copy(os.path.join(APP_DIR, CSS_FILE), os.path.join(assets_dir, CSS_FILE))
+
+    written = []
+    cwd = os.getcwd()
+    tracking = os.environ.get(usage_analytics.TRACKING_ENV_VAR)
+    # Rendering every page is not real traffic; keep it out of the usage counters
+    os.environ[usage_analytics.TRACKING_ENV_VAR] = "off"
+    # The app's stores write next to its working directory; a scratch one with copies of the static
+    # files keeps the export from creating or changing any real feedback, review or analytics data
+    workdir = tempfile.TemporaryDirectory(prefix="guide-export-")
+    copy_static_files(workdir.name)
+    os.chdir(workdir.name)
+    try:
+        with _capture_media():
+            for page in page_titles:
+                if page in LIVE_ONLY_PAGES:
+                    continue
+                at = _run_page(page)
+                picker = next((s for s in at.selectbox if s.label == SUBTOPIC_LABEL), None)
+                subtopics = list(picker.options) if picker else ["All"]
+                for subtopic in subtopics:
+                    if subtopic != "All":
+                        at = _run_page(page, subtopic)
+                    written.append(_write_page(out_dir, page, subtopic, subtopics, page_titles, app_url, at))
+    finally:
+        os.chdir(cwd)
+        workdir.cleanup()
+        if tracking is None:
+            os.environ.pop(usage_analytics.TRACKING_ENV_VAR, None)
+        else:
+            os.environ[usage_analytics.TRACKING_ENV_VAR] = tracking
+    return written
+
+
+def _write_page(out_dir, page, subtopic, subtopics, page_titles, app_url, at):
+    rel_path = _page_path(page, subtopic)
+    root = "../" * rel_path.count("/")
+
+    nav = []
+    for title in page_titles:
+        if title in LIVE_ONLY_PAGES:
+            href, css = f"{app_url.rstrip('/')}/?page={quote(title)}", "live"
+        else:
+            href, css = root + _page_path(title), "active" if title == page else ""
+        nav.append(f"<li><a class='{css}' href='{html.escape(href)}'>{html.escape(title)}</a></li>")
+
+    subnav = ""
+    if len(subtopics) > 1:
+        links = [
+            f"<li><a class='{'active' if s == subtopic else ''}' href='{root}{_page_path(page, s)}'>{html.escape(s)}</a></li>"
+            for s in subtopics
+        ]
+        subnav = f"<ul class='subtopics'>{''.join(links)}</ul>"
+
+    renderer = HtmlRenderer(page, app_url, root + "assets/", os.path.join(out_dir, "assets"))
+    body = renderer.render(at.main)
+    title = page if subtopic in (None, "All") else f"{subtopic} · {page}"
+
+    path = os.path.join(out_dir, rel_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(_layout(title, body, "".join(nav), subnav, root))
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--out", default="site", help="Output directory (default: site)")
+    parser.add_argument("--app-url", default="http://localhost:8501",
+                        help="Base URL of the live Streamlit app, used for interactive tools and Feedback")
+    args = parser.parse_args()
+    written = export_site(os.path.abspath(args.out), args.app_url)
+    print(f"Wrote {len(written)} pages to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
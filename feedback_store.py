@@ -0,0 +1,227 @@
+"""Time-partitioned Parquet storage for feedback submissions.
+
+Each submission is written as a small Parquet segment under a daily
+``date=YYYY-MM-DD`` partition. A background compactor merges small segments
+into one file per partition and expires partitions older than the retention
+window, so reads only touch the columns and days they ask for.
+"""
+import logging
+import os
+import shutil
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+SEGMENTS_DIR = "feedback_segments"
+LEGACY_CSV_PATH = "feedback.csv"
+
+# Compaction kicks in once a partition holds this many segments
+COMPACT_MIN_SEGMENTS = 8
+COMPACT_INTERVAL_SECONDS = 300
+RETENTION_DAYS = int(os.environ.get("FEEDBACK_RETENTION_DAYS", "365"))
+
+# Options offered by the feedback form (stored topics are not limited to these)
+SUGGESTED_TOPICS = ["LLM APIs", "Customer Support", "Tool Comparisons", "No-code Prototyping"]
+
+FEEDBACK_COLUMNS = [
+    "Submitted", "Name", "Email", "Rating", "Feedback", "Suggested topic", "Attachment name"
+]
+
+# Compact on-disk schema: small ints, timestamps and dictionary-encoded topics. Topics are free
+# text, so the dictionary index is wide enough for any number of distinct values.
+FEEDBACK_SCHEMA = pa.schema([
+    ("Submitted", pa.timestamp("s")),
+    ("Name", pa.string()),
+    ("Email", pa.string()),
+    ("Rating", pa.int8()),
+    ("Feedback", pa.string()),
+    ("Suggested topic", pa.dictionary(pa.int32(), pa.string())),
+    ("Attachment name", pa.string()),
+])
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.RLock()
+_compactor = None
+
+
+def _partition_dir(day, base_dir=SEGMENTS_DIR):
+    return os.path.join(base_dir, f"date={day:%Y-%m-%d}")
+
+
+def _segment_files(partition):
+    return sorted(
+        os.path.join(partition, f) for f in os.listdir(partition)
+        if f.endswith(".parquet") and not f.startswith((".", "_"))
+    )
+
+
+def _partitions(base_dir=SEGMENTS_DIR):
+    """Return ``(date, path)`` pairs for every partition, oldest first."""
+    if not os.path.isdir(base_dir):
+        return []
+    parts = []
+    for name in os.listdir(base_dir):
+        if not name.startswith("date="):
+            continue
+        try:
+            day = datetime.strptime(name[len("date="):], "%Y-%m-%d").date()
+        except ValueError:
+            continue
+        parts.append((day, os.path.join(base_dir, name)))
+    return sorted(parts)
+
+
+def _to_table(df):
+    df = df.reindex(columns=FEEDBACK_COLUMNS)
+    df["Submitted"] = pd.to_datetime(df["Submitted"]).dt.floor("s")
+    df["Rating"] = pd.to_numeric(df["Rating"], errors="coerce").fillna(0).astype("int8")
+    for col in ("Name", "Email", "Feedback", "Attachment name"):
+        df[col] = df[col].astype("string")
+    # Categories come from the data, so a topic added to the form is stored rather than nulled
+    df["Suggested topic"] = df["Suggested topic"].astype("string").astype("category")
+    return pa.Table.from_pandas(df, schema=FEEDBACK_SCHEMA, preserve_index=False)
+
+
+def _write_atomic(table, partition):
+    os.makedirs(partition, exist_ok=True)
+    name = f"part-{int(time.time() * 1000)}-{uuid.uuid4().hex[:8]}.parquet"
+    # Dot-prefixed temp files are ignored by dataset discovery until renamed
+    tmp_path = os.path.join(partition, f".{name}.tmp")
+    pq.write_table(table, tmp_path, compression="zstd")
+    final_path = os.path.join(partition, name)
+    os.replace(tmp_path, final_path)
+    return final_path
+
+
+def append_feedback(entry, base_dir=SEGMENTS_DIR):
+    """Write one feedback entry as a new segment in today's partition."""
+    entry = dict(entry)
+    submitted = entry.get("Submitted") or datetime.now()
+    entry["Submitted"] = submitted
+    table = _to_table(pd.DataFrame([entry]))
+    with _lock:
+        return _write_atomic(table, _partition_dir(pd.Timestamp(submitted).date(), base_dir))
+
+
+def read_feedback(columns=None, start=None, end=None, base_dir=SEGMENTS_DIR):
+    """Read feedback as a DataFrame, pruning to ``columns`` and the ``start``..``end`` days."""
+    columns = list(columns) if columns else list(FEEDBACK_COLUMNS)
+    with _lock:
+        files = [
+            f for day, part in _partitions(base_dir)
+            if (start is None or day >= start) and (end is None or day <= end)
+            for f in _segment_files(part)
+        ]
+        if not files:
+            return pd.DataFrame(columns=columns)
+        table = ds.dataset(files, format="parquet", schema=FEEDBACK_SCHEMA).to_table(columns=columns)
+    df = table.to_pandas()
+    if "Submitted" in df.columns:
+        df = df.sort_values("Submitted", kind="stable").reset_index(drop=True)
+    return df
+
+
+def import_legacy_csv(path=LEGACY_CSV_PATH, base_dir=SEGMENTS_DIR):
+    """Move a pre-segment ``feedback.csv`` into the Parquet store; call once at startup."""
+    if not os.path.exists(path):
+        return 0
+    with _lock:
+        if not os.path.exists(path):
+            return 0
+        df = pd.read_csv(path)
+        if "Submitted" not in df.columns:
+            df["Submitted"] = datetime.fromtimestamp(os.path.getmtime(path))
+        df["Submitted"] = pd.to_datetime(df["Submitted"])
+        for day, group in df.groupby(df["Submitted"].dt.date):
+            _write_atomic(_to_table(group), _partition_dir(day, base_dir))
+        os.replace(path, path + ".imported")
+        return len(df)
+
+
+def compact_partition(partition, min_segments=COMPACT_MIN_SEGMENTS):
+    """Merge the small segments of one partition into a single file."""
+    with _lock:
+        files = _segment_files(partition)
+        if len(files) < max(min_segments, 2):
+            return 0
+        table = pq.read_table(files, schema=FEEDBACK_SCHEMA)
+        table = table.sort_by("Submitted")
+        _write_atomic(table, partition)
+        for f in files:
+            os.remove(f)
+        return len(files)
+
+
+def expire_partitions(retention_days=RETENTION_DAYS, base_dir=SEGMENTS_DIR, today=None):
+    """Delete partitions older than the retention window. Returns the days removed."""
+    cutoff = (today or datetime.now().date()) - timedelta(days=retention_days)
+    removed = []
+    with _lock:
+        for day, part in _partitions(base_dir):
+            if day < cutoff:
+                shutil.rmtree(part, ignore_errors=True)
+                removed.append(day)
+    return removed
+
+
+def run_maintenance(retention_days=RETENTION_DAYS, base_dir=SEGMENTS_DIR):
+    """Expire old partitions, then compact whatever is left."""
+    expired = expire_partitions(retention_days, base_dir)
+    merged = sum(compact_partition(part) for _, part in _partitions(base_dir))
+    return {"expired_partitions": len(expired), "merged_segments": merged}
+
+
+def storage_stats(base_dir=SEGMENTS_DIR):
+    """Summarise partitions, segment counts and bytes on disk."""
+    rows = []
+    for day, part in _partitions(base_dir):
+        files = _segment_files(part)
+        rows.append({
+            "Partition": day.isoformat(),
+            "Segments": len(files),
+            "Bytes": sum(os.path.getsize(f) for f in files),
+        })
+    return pd.DataFrame(rows, columns=["Partition", "Segments", "Bytes"])
+
+
+def clear_feedback(base_dir=SEGMENTS_DIR):
+    """Remove every stored segment. Returns True if anything was deleted."""
+    with _lock:
+        if not os.path.isdir(base_dir):
+            return False
+        shutil.rmtree(base_dir)
+        return True
+
+
+class _Compactor(threading.Thread):
+    def __init__(self, interval, retention_days, base_dir):
+        super().__init__(name="feedback-compactor", daemon=True)
+        self.interval = interval
+        self.retention_days = retention_days
+        self.base_dir = base_dir
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            try:
+                run_maintenance(self.retention_days, self.base_dir)
+            except Exception:
+                # A failed pass is retried on the next tick
+                logger.exception("Feedback maintenance failed; retrying in %s seconds", self.interval)
+
+
+def start_compactor(interval=COMPACT_INTERVAL_SECONDS, retention_days=RETENTION_DAYS, base_dir=SEGMENTS_DIR):
+    """Start the background compactor once per process."""
+    global _compactor
+    with _lock:
+        if _compactor is None or not _compactor.is_alive():
+            _compactor = _Compactor(interval, retention_days, base_dir)
+            _compactor.start()
+        return _compactor
@@ -0,0 +1,167 @@
+"""Reference-grounding checker for generated text using MinHash/LSH.
+
+Reference documents are split into sentences, shingled into character
+n-grams and summarised as MinHash signatures. Banded LSH keys find candidate
+reference sentences for each generated sentence, and the fraction of equal
+signature slots estimates how strongly the reference supports it. All
+hashing and scoring is done on NumPy arrays, so large batches stay fast.
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+SHINGLE_SIZE = 5
+NUM_PERM = 128
+LSH_BANDS = 32  # 32 bands x 4 rows: pairs above ~0.4 similarity almost always collide
+
+SUPPORTED_THRESHOLD = 0.5
+PARTIAL_THRESHOLD = 0.2
+
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+|\n+")
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+_MAX_ROWS_PER_CHUNK = 65536
+_HASH_MULT = np.uint64(0x100000001B3)
+_FIGURE = re.compile(r"\d[\d,.]*\d|\d")
+
+
+def split_sentences(text):
+    """Split text into non-empty sentences on terminal punctuation and newlines."""
+    return [s.strip() for s in _SENTENCE_SPLIT.split(text or "") if len(s.strip()) > 1]
+
+
+def _normalize(sentence):
+    return _NON_WORD.sub(" ", sentence.lower()).strip()
+
+
+def _shingle_hashes(sentence, k=SHINGLE_SIZE):
+    """Hash every character k-gram of the normalised sentence to a uint64."""
+    data = np.frombuffer(_normalize(sentence).encode("utf-8"), dtype=np.uint8).astype(np.uint64)
+    if len(data) < k:
+        data = np.pad(data, (0, k - len(data)), constant_values=32)
+    windows = np.lib.stride_tricks.sliding_window_view(data, k)
+    hashes = np.zeros(len(windows), dtype=np.uint64)
+    for col in range(k):
+        hashes = hashes * _HASH_MULT + windows[:, col]
+    return np.unique(hashes)
+
+
+class ReferenceIndex:
+    """MinHash signatures and LSH band keys for a reference corpus."""
+
+    def __init__(self, num_perm=NUM_PERM, bands=LSH_BANDS, seed=7):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        # Multiply-shift hash family: odd 64-bit multipliers, top 32 bits kept
+        self._a = rng.integers(1, 2**63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 2**63, size=num_perm, dtype=np.uint64)
+        self._band_mult = rng.integers(1, 2**63, size=self.rows, dtype=np.uint64) | np.uint64(1)
+        self.sentences = []
+        self.sources = []
+        self.signatures = np.empty((0, num_perm), dtype=np.uint32)
+        self.band_keys = pd.DataFrame(columns=["band", "key", "ref"])
+
+    def signatures_for(self, sentences):
+        """Return a ``(len(sentences), num_perm)`` MinHash signature matrix."""
+        out = np.empty((len(sentences), self.num_perm), dtype=np.uint32)
+        shingles = [_shingle_hashes(s) for s in sentences]
+        start = 0
+        while start < len(shingles):
+            # Chunk so the (shingles x permutations) matrix stays bounded
+            end, rows = start, 0
+            while end < len(shingles) and (rows == 0 or rows + len(shingles[end]) <= _MAX_ROWS_PER_CHUNK):
+                rows += len(shingles[end])
+                end += 1
+            block = np.concatenate(shingles[start:end])
+            permuted = ((block[:, None] * self._a + self._b) >> np.uint64(32)).astype(np.uint32)
+            offsets = np.cumsum([0] + [len(s) for s in shingles[start:end - 1]])
+            out[start:end] = np.minimum.reduceat(permuted, offsets, axis=0)
+            start = end
+        return out
+
+    def _band_keys(self, signatures):
+        banded = signatures.reshape(len(signatures), self.bands, self.rows).astype(np.uint64)
+        return (banded * self._band_mult).sum(axis=2)
+
+    def fit(self, documents):
+        """Index ``{source_name: text}`` documents sentence by sentence."""
+        for source, text in documents.items():
+            for sentence in split_sentences(text):
+                self.sentences.append(sentence)
+                self.sources.append(source)
+        self.signatures = self.signatures_for(self.sentences)
+        keys = self._band_keys(self.signatures)
+        self.band_keys = pd.DataFrame({
+            "band": np.tile(np.arange(self.bands), len(self.sentences)),
+            "key": keys.ravel(),
+            "ref": np.repeat(np.arange(len(self.sentences)), self.bands),
+        })
+        return self
+
+    def score_sentences(self, sentences):
+        """Return the best support score and matching reference for each sentence."""
+        result = pd.DataFrame({
+            "Sentence": list(sentences),
+            "Support": np.zeros(len(sentences)),
+            "Best reference": "",
+            "Source": "",
+        })
+        if not len(sentences) or not self.sentences:
+            return result
+
+        signatures = self.signatures_for(list(sentences))
+        keys = self._band_keys(signatures)
+        queries = pd.DataFrame({
+            "band": np.tile(np.arange(self.bands), len(sentences)),
+            "key": keys.ravel(),
+            "query": np.repeat(np.arange(len(sentences)), self.bands),
+        })
+        pairs = queries.merge(self.band_keys, on=["band", "key"])[["query", "ref"]].drop_duplicates()
+        if pairs.empty:
+            return result
+
+        q, r = pairs["query"].to_numpy(), pairs["ref"].to_numpy()
+        pairs = pairs.assign(score=(signatures[q] == self.signatures[r]).mean(axis=1))
+        best = pairs.loc[pairs.groupby("query")["score"].idxmax()]
+
+        result.loc[best["query"], "Support"] = best["score"].to_numpy()
+        result.loc[best["query"], "Best reference"] = [self.sentences[i] for i in best["ref"]]
+        result.loc[best["query"], "Source"] = [self.sources[i] for i in best["ref"]]
+        return result
+
+
+def support_label(score):
+    if score >= SUPPORTED_THRESHOLD:
+        return "Supported"
+    if score >= PARTIAL_THRESHOLD:
+        return "Partially supported"
+    return "Unsupported"
+
+
+def build_index(documents, **kwargs):
+    """Build a reference index from ``{source_name: text}``."""
+    return ReferenceIndex(**kwargs).fit(documents)
+
+
+def score_outputs(index, outputs):
+    """Score every sentence of every output; returns one row per sentence."""
+    rows = [(i, s) for i, text in enumerate(outputs) for s in split_sentences(text)]
+    if not rows:
+        return pd.DataFrame(columns=["Output", "Sentence", "Support", "Verdict", "Best reference", "Source",
+                                     "Unmatched figures"])
+    output_ids, sentences = zip(*rows)
+    scored = index.score_sentences(sentences)
+    scored.insert(0, "Output", output_ids)
+    scored.insert(3, "Verdict", scored["Support"].map(support_label))
+
+    # Near-identical wording with a different number is a classic hallucination
+    sentence_figures = scored["Sentence"].str.findall(_FIGURE).map(set)
+    reference_figures = scored["Best reference"].str.findall(_FIGURE).map(set)
+    scored["Unmatched figures"] = [", ".join(sorted(s - r)) for s, r in zip(sentence_figures, reference_figures)]
+    mismatch = (scored["Verdict"] != "Unsupported") & (scored["Unmatched figures"] != "")
+    scored.loc[mismatch, "Verdict"] = "Check figures"
+    return scored
@@ -0,0 +1,359 @@
+"""Local causal-LM inference in a separate process with dynamic batching.
+
+Streamlit runs each session's script in a server thread, so generating text
+inline would hold up the server. ``InferenceWorker`` instead starts one
+worker process that hosts a small ``transformers`` model on CPU. Requests
+from all sessions are sent to it over a pipe. The worker gathers whatever
+arrives within a short wait window (up to ``max_batch``) and decodes the
+whole batch in one forward pass per token, with per-request temperature,
+top-p, length and seed. Results come back on the same pipe and resolve each
+caller's future.
+
+By default the model is a tiny randomly initialised GPT-2 with a byte-level
+vocabulary, so it runs offline with no downloads. Its text is noise, but
+sampling behaves exactly as it would with real weights. Pass ``model_path``
+(or set ``LOCAL_LM_PATH``) to load a locally stored checkpoint instead.
+"""
+import argparse
+import itertools
+import os
+import queue
+import secrets
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from multiprocessing.connection import Client, Listener
+
+MAX_BATCH = 16
+MAX_WAIT_MS = 20
+MAX_NEW_TOKENS = 64
+
+# Byte-level vocabulary: ids 0-255 are raw bytes, 256 ends a sequence
+BYTE_VOCAB = 257
+BYTE_EOS = 256
+
+DEMO_CONFIG = {"n_embd": 128, "n_layer": 4, "n_head": 4, "n_positions": 512}
+
+
+def configured_model_path():
+    """The checkpoint set with ``LOCAL_LM_PATH``, or None for the random demo model."""
+    return os.environ.get("LOCAL_LM_PATH") or None
+
+
+class ByteTokenizer:
+    """UTF-8 bytes as token ids; needs no vocabulary files."""
+
+    eos_token_id = BYTE_EOS
+    pad_token_id = BYTE_EOS
+    # Keep the random demo model's output readable: printable ASCII only
+    suppress_ids = [i for i in range(256) if not 32 <= i < 127]
+
+    def encode(self, text):
+        return list(text.encode("utf-8"))
+
+    def decode(self, ids):
+        return bytes(i for i in ids if i < 256).decode("utf-8", errors="replace")
+
+
+class _HFTokenizer:
+    """Adapter giving a ``transformers`` tokenizer the same small interface."""
+
+    def __init__(self, tokenizer):
+        self.tok = tokenizer
+        self.eos_token_id = tokenizer.eos_token_id
+        self.pad_token_id = tokenizer.pad_token_id if tokenizer.pad_token_id is not None else tokenizer.eos_token_id
+        self.suppress_ids = []
+
+    def encode(self, text):
+        return self.tok.encode(text, add_special_tokens=False)
+
+    def decode(self, ids):
+        return self.tok.decode(ids, skip_special_tokens=True)
+
+
+def load_tokenizer(model_path=None):
+    """The checkpoint's tokenizer, or the byte tokenizer of the demo model."""
+    if model_path:
+        from transformers import AutoTokenizer
+        return _HFTokenizer(AutoTokenizer.from_pretrained(model_path, local_files_only=True))
+    return ByteTokenizer()
+
+
+def load_model(model_path=None, seed=0):
+    """Return ``(model, tokenizer)``: a local checkpoint, or the random byte-level demo model."""
+    import torch
+    from transformers import AutoModelForCausalLM, GPT2Config, GPT2LMHeadModel
+
+    if model_path:
+        model = AutoModelForCausalLM.from_pretrained(model_path, local_files_only=True)
+    else:
+        torch.manual_seed(seed)
+        config = GPT2Config(vocab_size=BYTE_VOCAB, bos_token_id=BYTE_EOS, eos_token_id=BYTE_EOS, **DEMO_CONFIG)
+        model = GPT2LMHeadModel(config)
+    return model.eval(), load_tokenizer(model_path)
+
+
+def context_length(model):
+    """Prompt plus generated tokens the model can attend to."""
+    return getattr(model.config, "n_positions", None) or model.config.max_position_embeddings
+
+
+def _sample(logits, temperatures, top_ps, generators):
+    """Pick one token per row; temperature 0 means greedy."""
+    import torch
+
+    greedy = logits.argmax(dim=-1)
+    scaled = logits / temperatures.clamp(min=1e-5).unsqueeze(1)
+    probs = torch.softmax(scaled, dim=-1)
+    # Nucleus filtering: keep the smallest set of tokens whose mass reaches top_p
+    sorted_probs, order = probs.sort(dim=-1, descending=True)
+    outside = sorted_probs.cumsum(dim=-1) - sorted_probs > top_ps.unsqueeze(1)
+    sorted_probs = sorted_probs.masked_fill(outside, 0.0)
+    choices = torch.stack([torch.multinomial(sorted_probs[i], 1, generator=g)[0] for i, g in enumerate(generators)])
+    sampled = order.gather(1, choices.unsqueeze(1)).squeeze(1)
+    return torch.where(temperatures > 0, sampled, greedy)
+
+
+def generate_batch(model, tokenizer, requests):
+    """Decode a batch of requests together and return one result dict per request."""
+    import torch
+
+    prompts = [tokenizer.encode(r["prompt"]) or [tokenizer.eos_token_id] for r in requests]
+    limits = torch.tensor([r.get("max_new_tokens", MAX_NEW_TOKENS) for r in requests])
+    max_positions = context_length(model)
+    prompts = [p[-(max_positions - int(limits.max())):] for p in prompts]
+    width = max(len(p) for p in prompts)
+
+    # Left-pad so every row's next token sits in the last column
+    pad = tokenizer.pad_token_id
+    input_ids = torch.tensor([[pad] * (width - len(p)) + p for p in prompts])
+    attention = torch.tensor([[0] * (width - len(p)) + [1] * len(p) for p in prompts])
+    temperatures = torch.tensor([float(r.get("temperature", 1.0)) for r in requests])
+    top_ps = torch.tensor([float(r.get("top_p", 1.0)) for r in requests])
+    generators = [torch.Generator().manual_seed(int(r.get("seed", 0))) for r in requests]
+
+    outputs = [[] for _ in requests]
+    done = torch.zeros(len(requests), dtype=torch.bool)
+    past, step_ids = None, input_ids
+    with torch.inference_mode():
+        for step in range(int(limits.max())):
+            positions = (attention.cumsum(dim=1) - 1).clamp(min=0)[:, -step_ids.shape[1]:]
+            out = model(input_ids=step_ids, attention_mask=attention, position_ids=positions,
+                        past_key_values=past, use_cache=True)
+            past = out.past_key_values
+            logits = out.logits[:, -1, :].float()
+            logits[:, tokenizer.suppress_ids] = float("-inf")
+            next_ids = _sample(logits, temperatures, top_ps, generators)
+            for i in (~done).nonzero().flatten().tolist():
+                if next_ids[i] == tokenizer.eos_token_id:
+                    done[i] = True
+                else:
+                    outputs[i].append(int(next_ids[i]))
+            done |= torch.tensor([len(o) for o in outputs]) >= limits
+            if done.all():
+                break
+            # Finished rows keep decoding padding so the batch stays rectangular
+            step_ids = torch.where(done, torch.tensor(pad), next_ids).unsqueeze(1)
+            attention = torch.cat([attention, (~done).long().unsqueeze(1)], dim=1)
+
+    return [{"text": tokenizer.decode(ids), "tokens": len(ids), "ids": ids} for ids in outputs]
+
+
+def _serve(address, authkey, model_path, max_batch, max_wait_ms):
+    """Worker process main loop: batch requests off the pipe, send results back."""
+    conn = Client(address, authkey=authkey)
+    requests = queue.Queue()
+
+    def read_requests():
+        while True:
+            try:
+                item = conn.recv()
+            except (EOFError, OSError):
+                item = None
+            requests.put(item)
+            if item is None:
+                break
+
+    threading.Thread(target=read_requests, daemon=True).start()
+    model, tokenizer = load_model(model_path)
+    conn.send(("ready", {"context_length": context_length(model)}))
+    while True:
+        first = requests.get()
+        if first is None:
+            break
+        batch = [first]
+        deadline = time.monotonic() + max_wait_ms / 1000
+        stopping = False
+        while len(batch) < max_batch:
+            try:
+                item = requests.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            if item is None:
+                stopping = True  # finish this batch, then stop
+                break
+            batch.append(item)
+
+        started = time.monotonic()
+        try:
+            outputs = generate_batch(model, tokenizer, [r for _, r, _ in batch])
+        except Exception as e:
+            outputs = [{"error": f"{type(e).__name__}: {e}"}] * len(batch)
+        compute_ms = (time.monotonic() - started) * 1000
+        for (request_id, _, submitted), output in zip(batch, outputs):
+            if "error" not in output:
+                output.update({"batch size": len(batch), "compute ms": compute_ms,
+                               "queue ms": (started - submitted) * 1000})
+            conn.send((request_id, output))
+        if stopping:
+            break
+    conn.close()
+
+
+class InferenceWorker:
+    """Client side of the worker process; safe to share between Streamlit sessions."""
+
+    def __init__(self, model_path=None, max_batch=MAX_BATCH, max_wait_ms=MAX_WAIT_MS):
+        self.model_path = model_path or configured_model_path()
+        self.max_batch = max_batch
+        self.max_wait_ms = max_wait_ms
+        self._ids = itertools.count()
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._send_lock = threading.Lock()
+        self._process = None
+        self._conn = None
+        self._tokenizer = None
+        self.context_length = None
+
+    def start(self, timeout=120):
+        # A plain subprocess rather than multiprocessing: Streamlit replaces __main__
+        # with the app script, which spawn-based children would re-run on import
+        authkey = secrets.token_bytes(16)
+        with Listener(("127.0.0.1", 0), authkey=authkey) as listener:
+            env = dict(os.environ, INFERENCE_WORKER_AUTHKEY=authkey.hex())
+            self._process = subprocess.Popen(
+                [sys.executable, os.path.abspath(__file__), "--serve", str(listener.address[1]),
+                 "--model-path", self.model_path or "", "--max-batch", str(self.max_batch),
+                 "--max-wait-ms", str(self.max_wait_ms)],
+                env=env, stdout=subprocess.DEVNULL,
+            )
+            accepted = []
+            accept = threading.Thread(target=lambda: accepted.append(listener.accept()), daemon=True)
+            accept.start()
+            accept.join(timeout)
+        if not accepted:
+            self.close()
+            raise RuntimeError("Inference worker did not connect")
+        self._conn = accepted[0]
+        status, info = self._conn.recv() if self._conn.poll(timeout) else (None, None)
+        if status != "ready":
+            self.close()
+            raise RuntimeError("Inference worker failed to start")
+        self.context_length = info["context_length"]
+        threading.Thread(target=self._collect, daemon=True).start()
+        return self
+
+    def _collect(self):
+        while True:
+            try:
+                request_id, output = self._conn.recv()
+            except (EOFError, OSError):
+                break
+            with self._lock:
+                future = self._pending.pop(request_id, None)
+            if future is None:
+                continue
+            if "error" in output:
+                future.set_exception(RuntimeError(output["error"]))
+            else:
+                future.set_result(output)
+        # Worker gone: fail anything still waiting instead of leaving callers hanging
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for future in pending.values():
+            future.set_exception(RuntimeError("Inference worker stopped"))
+
+    def is_alive(self):
+        return self._process is not None and self._process.poll() is None
+
+    def submit(self, prompt, temperature=1.0, top_p=1.0, max_new_tokens=MAX_NEW_TOKENS, seed=0):
+        """Queue one generation and return a Future for its result dict."""
+        if not self.is_alive():
+            raise RuntimeError("Inference worker is not running")
+        request_id, future = next(self._ids), Future()
+        with self._lock:
+            self._pending[request_id] = future
+        request = {"prompt": prompt, "temperature": temperature, "top_p": top_p,
+                   "max_new_tokens": max_new_tokens, "seed": seed}
+        with self._send_lock:
+            self._conn.send((request_id, request, time.monotonic()))
+        return future
+
+    def generate(self, prompt, timeout=60, **params):
+        return self.submit(prompt, **params).result(timeout=timeout)
+
+    def count_tokens(self, texts):
+        """Token counts in the served model's own vocabulary, e.g. to fit prompts to ``context_length``."""
+        if self._tokenizer is None:
+            self._tokenizer = load_tokenizer(self.model_path)
+        return [len(self._tokenizer.encode(t)) for t in texts]
+
+    def generate_many(self, requests, timeout=120):
+        """Submit a list of request dicts at once so they can share batches."""
+        futures = [self.submit(**r) for r in requests]
+        return [f.result(timeout=timeout) for f in futures]
+
+    def close(self):
+        if self._conn is not None and self.is_alive():
+            with self._send_lock:
+                self._conn.send(None)
+        if self._process is not None:
+            try:
+                self._process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+
+
+def benchmark(concurrency=(1, 4, 16), requests_per_client=8, max_new_tokens=32):
+    """Tokens/second with batching off (max_batch=1) and on, at each client concurrency."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    rows = []
+    for max_batch in (1, MAX_BATCH):
+        worker = InferenceWorker(max_batch=max_batch).start()
+        for clients in concurrency:
+            def client(c):
+                return [worker.generate("Explain temperature.", temperature=0.8, seed=c * 100 + i,
+                                        max_new_tokens=max_new_tokens) for i in range(requests_per_client)]
+            started = time.monotonic()
+            with ThreadPoolExecutor(clients) as pool:
+                results = [r for rs in pool.map(client, range(clients)) for r in rs]
+            elapsed = time.monotonic() - started
+            rows.append({"max_batch": max_batch, "clients": clients,
+                         "tokens/s": sum(r["tokens"] for r in results) / elapsed,
+                         "mean batch": sum(r["batch size"] for r in results) / len(results)})
+        worker.close()
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the dynamic-batching inference worker.")
+    parser.add_argument("--serve", type=int, metavar="PORT", help=argparse.SUPPRESS)
+    parser.add_argument("--model-path", default="", help=argparse.SUPPRESS)
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH, help=argparse.SUPPRESS)
+    parser.add_argument("--max-wait-ms", type=float, default=MAX_WAIT_MS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.serve:
+        authkey = bytes.fromhex(os.environ.pop("INFERENCE_WORKER_AUTHKEY"))
+        _serve(("127.0.0.1", args.serve), authkey, args.model_path or None, args.max_batch, args.max_wait_ms)
+        return
+    for row in benchmark():
+        print("max_batch={max_batch:>2}  clients={clients:>2}  {tokens/s:8.1f} tokens/s  "
+              "mean batch {mean batch:.1f}".format(**row))
+
+
+if __name__ == "__main__":
+    main()
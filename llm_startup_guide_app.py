@@ -4,7 +4,27 @@ from datetime import datetime
 import pandas as pd
 import re
 import os
+import io
 import requests
+import feedback_store
+import review_store
+import bias_scanner
+import hallucination_checker
+import prompt_linter
+import prompt_compressor
+import token_costs
+import routing_simulator
+import capacity_planner
+import submission_guard
+import inference_worker
+import usage_analytics
+import comment_clusters
+import conversation_costs
+import usage_ingest
+import pii_masking
+import sampling_sweep
+import doc_summarizer
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 
 # --- App Config ---
 st.set_page_config(page_title="LLM Guide for Startups", layout="wide")
@@ -17,21 +37,27 @@ if os.path.exists(css_path):
 else:
     st.warning("CSS file not found. Styling will be minimal.")
 
-# --- File Path for Feedback ---
-FEEDBACK_PATH = "feedback.csv"
+# --- Feedback Storage (time-partitioned Parquet segments) ---
+FEEDBACK_DIR = feedback_store.SEGMENTS_DIR
+
+@st.cache_resource
+def start_feedback_compactor():
+    """Import any legacy feedback.csv and start the background segment compactor once per server process."""
+    feedback_store.import_legacy_csv()
+    return feedback_store.start_compactor()
+
+start_feedback_compactor()
 
 # --- Load Feedback ---
 @st.cache_data(ttl=3600)
-def load_feedback(path=FEEDBACK_PATH):
-    """Load feedback from CSV if available, else return empty list."""
-    if os.path.exists(path):
-        try:
-            df = pd.read_csv(path)
-            return df.to_dict("records")
-        except Exception as e:
-            st.error(f"Error loading feedback: {str(e)}")
-            return []
-    return []
+def load_feedback(path=FEEDBACK_DIR):
+    """Load feedback from the segment store if available, else return empty list."""
+    try:
+        df = feedback_store.read_feedback(base_dir=path)
+        return df.to_dict("records")
+    except Exception as e:
+        st.error(f"Error loading feedback: {str(e)}")
+        return []
 
 if 'current_page_index' not in st.session_state:
     st.session_state['current_page_index'] = 0  # Used for navigation, optional
@@ -76,18 +102,132 @@ def reset_expansion_state():
 def is_valid_email(email):
     return re.match(r"^[\w\.-]+@[\w\.-]+\.\w+$", email)
 
-def store_feedback(entry, path=FEEDBACK_PATH):
-    """Append new entry to CSV, creating file if it doesn't exist."""
+def store_feedback(entry, path=FEEDBACK_DIR):
+    """Write the entry as a new segment; existing segments are never rewritten."""
     try:
-        new_entry_df = pd.DataFrame([entry])
-        if os.path.exists(path):
-            existing_df = pd.read_csv(path)
-            combined_df = pd.concat([existing_df, new_entry_df], ignore_index=True)
-        else:
-            combined_df = new_entry_df  # New file
-        combined_df.to_csv(path, index=False)
+        feedback_store.append_feedback(entry, base_dir=path)
+        load_feedback.clear()
+        return True
     except Exception as e:
         st.error(f"Error saving feedback: {str(e)}")
+        return False
+
+@st.cache_resource
+def get_submission_guard():
+    """Rate limits and duplicate filter shared by every session in this server process."""
+    return submission_guard.SubmissionGuard()
+
+def get_client_id():
+    """Client address for rate limiting; X-Forwarded-For only counts behind TRUSTED_PROXY_HOPS proxies."""
+    forwarded = st.context.headers.get("X-Forwarded-For", "")
+    return submission_guard.client_address(forwarded, st.context.ip_address) or "local"
+
+def get_session_id():
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx else "local"
+
+def save_ethical_review(review):
+    """Persist a submitted ethical review to the local review store."""
+    try:
+        return review_store.save_review(review)
+    except Exception as e:
+        st.error(f"Error saving review: {str(e)}")
+
+@st.cache_resource(validate=lambda worker: worker.is_alive(), on_release=lambda worker: worker.close())
+def get_inference_worker():
+    """Start the local model worker process once; every session shares its batches.
+
+    If the process dies (OOM, killed) the cached client fails validation and a new worker is started.
+    """
+    return inference_worker.InferenceWorker().start()
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def run_sampling_sweep(prompt, temperatures, top_ps, seeds, max_new_tokens):
+    """Generate the whole grid on the shared worker; seeded, so a repeat sweep is served from cache."""
+    samples = sampling_sweep.run_sweep(get_inference_worker(), prompt, temperatures, top_ps, seeds, max_new_tokens)
+    return samples.drop(columns="ids"), sampling_sweep.sweep_metrics(samples)
+
+@st.cache_resource
+def get_usage_counters():
+    """Per-process usage counters, flushed to disk by a background timer."""
+    return usage_analytics.UsageCounters().start()
+
+def track_event(kind, name, value):
+    """Count a page, sub-topic or quiz choice when it changes, not on every rerun."""
+    if not usage_analytics.tracking_enabled():
+        return
+    last_seen = st.session_state.setdefault("analytics_last_seen", {})
+    if last_seen.get((kind, name)) != value:
+        last_seen[(kind, name)] = value
+        get_usage_counters().record(kind, name, value)
+
+def track_quiz(question, answer):
+    if not answer.startswith("-- Select"):
+        track_event("quiz", question, answer)
+
+@st.cache_resource
+def get_comment_clusterer():
+    """Restore the incremental comment clusterer once per process; submissions and the admin view share it."""
+    return comment_clusters.load_clusterer()
+
+@st.cache_resource
+def get_pii_masker():
+    """Shared masked-row cache, so page views only mask new submissions."""
+    return pii_masking.PiiMasker()
+
+@st.cache_resource(max_entries=4)
+def get_reference_index(documents):
+    """Build the MinHash/LSH index once per distinct set of reference documents."""
+    return hallucination_checker.build_index(dict(documents))
+
+@st.cache_data(max_entries=4)
+def lint_prompt_library(prompts):
+    """Lint an uploaded prompt library once; large files are spread over a process pool."""
+    return prompt_linter.lint_prompts(prompts)
+
+@st.cache_data(max_entries=4)
+def load_scan_outputs(name, data):
+    """Parse an uploaded file of model outputs once: a CSV as is, or one output per line of text."""
+    if name.endswith(".csv"):
+        return pd.read_csv(io.BytesIO(data))
+    return pd.DataFrame({"Output": data.decode("utf-8", errors="replace").splitlines()})
+
+@st.cache_data(max_entries=4)
+def scan_outputs(name, data, column):
+    """Bias-scan one column of an uploaded file; reruns with the same file and column reuse the result."""
+    texts = load_scan_outputs(name, data)[column].reset_index(drop=True)
+    started = datetime.now()
+    matches, counts = bias_scanner.scan_batch(texts)
+    elapsed = (datetime.now() - started).total_seconds()
+    return texts, matches, counts, bias_scanner.pronoun_counts(texts), elapsed
+
+@st.cache_data(max_entries=32)
+def simulate_capacity(peak_rate, latency, servers, tokens, rpm_limit, tpm_limit, burstiness, latency_cv):
+    """Run the peak-hour simulation once per distinct set of planner inputs."""
+    return capacity_planner.simulate_peak(peak_rate, latency, servers, tokens, rpm_limit, tpm_limit,
+                                          burstiness, latency_cv)
+
+def get_cost_estimate():
+    """Volumes last set in the token cost estimator, or its defaults."""
+    return st.session_state.get("cost_estimate", {
+        "tokens": 500, "requests": 1000, "model": "GPT-3.5 ($0.002 / 1K tokens)"
+    })
+
+@st.cache_data(max_entries=2)
+def load_routing_log(name, data, keywords):
+    """Parse an uploaded request log and compute its routing features once."""
+    if name.endswith(".parquet"):
+        log = pd.read_parquet(io.BytesIO(data))
+    elif name.endswith(".jsonl"):
+        log = pd.read_json(io.BytesIO(data), lines=True)
+    else:
+        log = pd.read_csv(io.BytesIO(data))
+    return routing_simulator.prepare_log(log, keywords)
+
+@st.cache_data(max_entries=2)
+def load_usage_export(name, data):
+    """Aggregate an uploaded provider usage export chunk by chunk."""
+    return usage_ingest.ingest(io.BytesIO(data), name=name)
 
 # --- Sidebar Navigation ---
 page_titles = [
@@ -95,6 +235,9 @@ page_titles = [
     "API Cost Optimization", "Ethics & Bias", "FAQs", "Glossary", "Feedback"
 ]
 
+# Links like ?page=Feedback (e.g. from the static export) open on that section
+requested_page = st.query_params.get("page")
+
 with st.sidebar:
     current_page = option_menu(
         menu_title="Sections",
@@ -103,8 +246,10 @@ with st.sidebar:
             "house", "pencil", "sliders", "exclamation-circle", "cash-coin", "shield-check",
             "question-circle", "book","envelope"
         ],
-        menu_icon="cast"
+        menu_icon="cast",
+        default_index=page_titles.index(requested_page) if requested_page in page_titles else 0
     )
+track_event("page", "Sections", current_page)
 
 # --- Home Page ---
 if current_page == "Home":
@@ -129,6 +274,7 @@ if current_page == "Home":
                 "Let's Get Started!",
             ]
         )
+        track_event("subtopic", current_page, home_subtopic)
         
     home_sections = {
     "Introduction to Large Language Models": (
@@ -221,6 +367,7 @@ if current_page == "Home":
                     st.markdown("#### Quiz: How Well Do You Understand LLMs?")
                     q1 = st.radio("True or False: LLMs search the internet to answer questions.",
                                   ["-- Select --", "True", "False"], key="llm_q1")
+                    track_quiz("True or False: LLMs search the internet to answer questions.", q1)
                     if q1 == "False":
                         st.success("Correct! LLMs generate responses from prior training, not live web access.")
                     elif q1 == "True":
@@ -264,10 +411,12 @@ elif current_page == "Prompt Engineering":
                 "Common Pitfalls",
                 "Prompt Engineering vs Prompt Tuning",
                 "Startup Use Cases",
-                "Prompt Learning Resources"
+                "Prompt Linter",
+                "Prompt Learning Resources",
                 "Quiz",
             ]
         )
+        track_event("subtopic", current_page, subtopic)
 
     if subtopic in ("All", "Introduction to Prompt Engineering"):
         with expander_section("What is Prompt and Prompt Engineering?"):
@@ -373,6 +522,46 @@ elif current_page == "Prompt Engineering":
             """)
   
 
+    if subtopic in ("All", "Prompt Linter"):
+        with expander_section("Prompt Linter: Check Prompts Against These Rules"):
+            st.markdown("""
+            Score a prompt against the best practices and pitfalls above: role, delimiters, output format,
+            clarity, focus and context. Upload a prompt library to lint thousands of prompts at once.
+            """)
+            lint_mode = st.radio("Mode", ["Single prompt", "Bulk upload"], horizontal=True, key="lint_mode")
+
+            if lint_mode == "Single prompt":
+                lint_input = st.text_area("Your prompt", placeholder="e.g. Tell me about our product", key="lint_prompt")
+                if lint_input.strip():
+                    result = prompt_linter.lint_prompt(lint_input)
+                    st.metric("Prompt score", f"{result['Score']} / 100")
+                    for rule, (weight, hint) in prompt_linter.RULES.items():
+                        if result[rule]:
+                            st.success(f"**{rule}** ({weight} pts)")
+                    for suggestion in filter(None, result["Suggestions"].split("\n")):
+                        st.warning(suggestion)
+            else:
+                lint_file = st.file_uploader("Prompt file (CSV, or TXT with one prompt per line)",
+                                             type=["csv", "txt"], key="lint_file")
+                if lint_file is not None:
+                    if lint_file.name.endswith(".csv"):
+                        prompts_df = pd.read_csv(lint_file)
+                        prompt_col = st.selectbox("Prompt column", prompts_df.columns, key="lint_column")
+                        prompts = prompts_df[prompt_col].dropna().astype(str).tolist()
+                    else:
+                        prompts = [line for line in lint_file.getvalue().decode("utf-8", errors="replace").splitlines()
+                                   if line.strip()]
+
+                    report = lint_prompt_library(tuple(prompts))
+                    col1, col2, col3 = st.columns(3)
+                    col1.metric("Prompts", f"{len(report):,}")
+                    col2.metric("Average score", f"{report['Score'].mean():.0f}")
+                    col3.metric("Below 50", f"{(report['Score'] < 50).sum():,}")
+                    st.bar_chart((~report[list(prompt_linter.RULES)]).sum().rename("Prompts failing"))
+                    st.dataframe(report.sort_values("Score"), use_container_width=True)
+                    st.download_button("📥 Download Lint Report (CSV)", report.to_csv(index=False),
+                                       file_name="prompt_lint_report.csv", mime="text/csv")
+
     if subtopic in ("All", "Prompt Learning Resources"):
         with expander_section("Learn More: Prompt Engineering Resources"):
             st.markdown("""
@@ -392,6 +581,7 @@ elif current_page == "Prompt Engineering":
                 "Clear instructions with role, format, and topic",
                 "Anything, the AI will figure it out"
             ])
+            track_quiz("1. What makes a good prompt?", q1)
             if q1 != "-- Select an answer --":
                 if q1 == "Clear instructions with role, format, and topic":
                     st.success("Correct!")
@@ -404,6 +594,7 @@ elif current_page == "Prompt Engineering":
                 "Write a 2-line ad copy for a wearable fitness tracker targeting new moms in a friendly tone",
                 "Make something catchy"
             ])
+            track_quiz("2. Which is a strong ad prompt?", q2)
             if q2 != "-- Select an answer --":
                 if "fitness tracker" in q2:
                     st.success("Spot on!")
@@ -415,6 +606,7 @@ elif current_page == "Prompt Engineering":
                 "True",
                 "False"
             ])
+            track_quiz("3. True or False: AI always knows your intent.", q3)
             if q3 != "-- Select an answer --":
                 if q3 == "False":
                     st.success("Correct!")
@@ -437,9 +629,10 @@ elif current_page == "Temperature & Sampling":
             "Sub-topic",
             [
                 "All", "What is Temperature?","What is Sampling?", "Adjust the Temperature",
-                 "Match Temp to Task", "Summary Table", "Common Misconceptions", "Final Takeaway"
+                 "Match Temp to Task", "Summary Table", "Sampling Sweep", "Common Misconceptions", "Final Takeaway"
             ]
         )
+        track_event("subtopic", current_page, subtopic)
     if subtopic in ("All", "What is Temperature?"):
         with expander_section("What is Temperature in Language Models?"):
             st.markdown("""
@@ -477,7 +670,32 @@ elif current_page == "Temperature & Sampling":
             else:
                 st.warning("High Temperature (Creative & Risky)")
                 st.markdown("> Money? Managed. Chaos? Cancelled. Our app is your freedom button.")
-    
+
+            st.markdown("#### Try It on a Local Model")
+            local_model = inference_worker.configured_model_path()
+            if local_model:
+                st.caption(f"Samples come from the `{os.path.basename(local_model.rstrip('/'))}` checkpoint running on "
+                           "this server in its own process — watch how the variety changes with temperature and top-p.")
+            else:
+                st.caption("Samples come from a tiny model running on this server in its own process. "
+                           "Its weights are random, so the text is noise — watch how the variety changes with temperature and top-p.")
+            demo_prompt = st.text_input("Prompt", "Our app helps freelancers", key="temp_demo_prompt")
+            demo_top_p = st.slider("Top-p", 0.1, 1.0, 1.0, step=0.05, key="temp_demo_top_p")
+            if st.button("Generate 3 samples", key="temp_demo_generate"):
+                try:
+                    with st.spinner("Generating..."):
+                        samples = get_inference_worker().generate_many([
+                            {"prompt": demo_prompt, "temperature": temp, "top_p": demo_top_p,
+                             "max_new_tokens": 48, "seed": seed}
+                            for seed in range(3)
+                        ])
+                    for sample in samples:
+                        st.code(sample["text"], language=None)
+                    st.caption(f"Served in a batch of {samples[0]['batch size']} • "
+                               f"{samples[0]['queue ms'] + samples[0]['compute ms']:.0f} ms")
+                except Exception as e:
+                    st.error(f"Error running local model: {str(e)}")
+
     if subtopic in ("All", "Match Temp to Task"):
             with expander_section("Match Temperature to a Task"):
                 st.markdown("""
@@ -499,6 +717,57 @@ elif current_page == "Temperature & Sampling":
             | 0.8 – 1.0   | Creative, surprising| Marketing, brainstorming, social    |
             """)
 
+    if subtopic in ("All", "Sampling Sweep"):
+        with expander_section("Sampling Sweep: Measure the Trade-off Yourself"):
+            st.write("""
+            The tables above are rules of thumb. Run one prompt across a grid of temperatures, top-p values and seeds
+            on the local model and measure how varied and how repetitive the samples get.
+            """)
+            col1, col2 = st.columns(2)
+            with col1:
+                sweep_temps = st.multiselect("Temperatures", [0.1, 0.2, 0.3, 0.5, 0.7, 0.8, 1.0, 1.2, 1.3, 1.5],
+                                             default=list(sampling_sweep.DEFAULT_TEMPERATURES), key="sweep_temps")
+                sweep_top_ps = st.multiselect("Top-p values", [0.3, 0.5, 0.7, 0.8, 0.9, 0.95, 1.0],
+                                              default=list(sampling_sweep.DEFAULT_TOP_PS), key="sweep_top_ps")
+            with col2:
+                sweep_prompt = st.text_input("Prompt", "Our app helps freelancers", key="sweep_prompt")
+                sweep_seeds = st.slider("Samples (seeds) per setting", 2, 8, sampling_sweep.DEFAULT_SEEDS,
+                                        key="sweep_seeds")
+                sweep_tokens = st.slider("Max new tokens", 16, 96, 48, step=8, key="sweep_tokens")
+            st.caption(f"{len(sweep_temps) * len(sweep_top_ps) * sweep_seeds} generations, sent to the worker together "
+                       "so they share batches.")
+
+            if st.button("Run sweep", key="sweep_run") and sweep_temps and sweep_top_ps:
+                st.session_state["sweep_params"] = (sweep_prompt, tuple(sorted(sweep_temps)),
+                                                    tuple(sorted(sweep_top_ps)), sweep_seeds, sweep_tokens)
+            if "sweep_params" in st.session_state:
+                try:
+                    started = datetime.now()
+                    with st.spinner("Sampling..."):
+                        samples, metrics = run_sampling_sweep(*st.session_state["sweep_params"])
+                    elapsed = (datetime.now() - started).total_seconds()
+                    st.caption(f"{len(samples)} samples scored in {elapsed:.1f}s.")
+
+                    metric = st.selectbox("Metric to chart", sampling_sweep.METRICS, index=1, key="sweep_metric")
+                    chart = metrics.pivot(index="temperature", columns="top_p", values=metric)
+                    chart.columns = [f"top-p {p:g}" for p in chart.columns]
+                    st.line_chart(chart)
+                    st.caption("distinct-n: share of unique n-grams across samples (variety) • self-BLEU: overlap "
+                               "between samples (sameness) • repetition: share of repeated 2-grams within a sample.")
+
+                    consistent = metrics.loc[metrics["self-BLEU"].idxmax()]
+                    varied = metrics.loc[metrics["distinct-2"].idxmax()]
+                    col1, col2 = st.columns(2)
+                    col1.metric("Most consistent", f"T={consistent['temperature']:g}, top-p={consistent['top_p']:g}",
+                                f"self-BLEU {consistent['self-BLEU']:.2f}", delta_color="off")
+                    col2.metric("Most varied", f"T={varied['temperature']:g}, top-p={varied['top_p']:g}",
+                                f"distinct-2 {varied['distinct-2']:.2f}", delta_color="off")
+                    st.dataframe(metrics.style.format(precision=3), use_container_width=True, hide_index=True)
+                    with st.expander("Samples"):
+                        st.dataframe(samples, use_container_width=True, hide_index=True)
+                except Exception as e:
+                    st.error(f"Error running sampling sweep: {str(e)}")
+
     if subtopic in ("All", "Common Misconceptions"):
         with expander_section("Common Misconceptions"):
             st.markdown("""
@@ -542,9 +811,11 @@ elif current_page == "Hallucinations":
                 "Startup Example",
                 "Why It Happens",
                 "How to Minimize",
+                "Check Outputs Against Your Docs",
                 "Spot the Hallucination (Quiz)"
             ]
         )
+        track_event("subtopic", current_page, halluc_subtopic)
 
     # --- Section Display Logic ---
     if halluc_subtopic in ("All", "What Are Hallucinations?"):
@@ -614,6 +885,56 @@ elif current_page == "Hallucinations":
               _Example prompt: “If unsure, say ‘I’m not sure’ rather than guessing.”_
             """)
 
+    if halluc_subtopic in ("All", "Check Outputs Against Your Docs"):
+        with expander_section("Check Outputs Against Your Docs"):
+            st.write("""
+            Upload the documents your answers should be grounded in (docs, FAQ, product specs), then paste or upload
+            generated text. Each sentence is scored by how closely a reference sentence supports it.
+            """)
+            reference_files = st.file_uploader("Reference documents (TXT or MD)", type=["txt", "md"],
+                                               accept_multiple_files=True, key="halluc_reference_files")
+            reference_text = st.text_area("...or paste reference text", key="halluc_reference_text")
+
+            documents = {f.name: f.getvalue().decode("utf-8", errors="replace") for f in reference_files or []}
+            if reference_text.strip():
+                documents["Pasted text"] = reference_text
+
+            if documents:
+                index = get_reference_index(tuple(sorted(documents.items())))
+                st.caption(f"Reference index: {len(index.sentences):,} sentences from {len(documents)} source(s).")
+
+                generated_mode = st.radio("Generated text", ["Paste", "Batch upload"], horizontal=True,
+                                          key="halluc_output_mode")
+                if generated_mode == "Paste":
+                    generated = [st.text_area("Generated text to check", key="halluc_generated_text")]
+                else:
+                    outputs_file = st.file_uploader("Outputs (CSV, or TXT with one output per line)",
+                                                    type=["csv", "txt"], key="halluc_outputs_file")
+                    generated = []
+                    if outputs_file is not None:
+                        if outputs_file.name.endswith(".csv"):
+                            outputs_df = pd.read_csv(outputs_file)
+                            output_col = st.selectbox("Column to check", outputs_df.columns, key="halluc_output_col")
+                            generated = outputs_df[output_col].fillna("").astype(str).tolist()
+                        else:
+                            generated = outputs_file.getvalue().decode("utf-8", errors="replace").splitlines()
+
+                if any(text.strip() for text in generated):
+                    scored = hallucination_checker.score_outputs(index, generated)
+                    verdicts = scored["Verdict"].value_counts()
+                    col1, col2, col3 = st.columns(3)
+                    col1.metric("Sentences checked", f"{len(scored):,}")
+                    col2.metric("Unsupported", f"{verdicts.get('Unsupported', 0):,}")
+                    col3.metric("Check figures", f"{verdicts.get('Check figures', 0):,}")
+                    flagged_first = scored.sort_values("Support", kind="stable")
+                    st.dataframe(flagged_first.head(1000), use_container_width=True)
+                    st.download_button("📥 Download Sentence Scores (CSV)", scored.to_csv(index=False),
+                                       file_name="hallucination_scores.csv", mime="text/csv")
+            else:
+                st.info("Add at least one reference document to build the index.")
+            st.caption("Scores measure wording overlap with your references, not truth. "
+                       "Unsupported sentences need a human check.")
+
     if halluc_subtopic in ("All", "Spot the Hallucination (Quiz)"):
         with expander_section("Quick Check: Can You Spot the Hallucination?"):
             q1 = st.radio("Which of the following is most likely a hallucination?",
@@ -621,6 +942,7 @@ elif current_page == "Hallucinations":
                          "Python was invented by Guido van Rossum.",
                          "OpenAI was acquired by Netflix in 2021."],
                         key="hallucination_q1")
+            track_quiz("Which of the following is most likely a hallucination?", q1)
             if q1 != "-- Select an answer --":
                 if q1 == "OpenAI was acquired by Netflix in 2021.":
                     st.success("Correct! That never happened — it’s a confident hallucination.")
@@ -649,9 +971,16 @@ elif current_page == "API Cost Optimization":
                 "What Drives Cost",
                 "Optimization Strategies",
                 "Estimate Token Cost",
+                "Actual Spend vs. Estimate",
+                "Conversation Cost Modeller",
+                "Prompt Compressor",
+                "Model Routing Simulator",
+                "Capacity Planner",
+                "Long Document Summarizer",
                 "Final Note"
             ]
         )
+        track_event("subtopic", current_page, cost_subtopic)
 
     # --- Conditional Rendering of Sections ---
     if cost_subtopic in ("All", "What Is API Cost?"):
@@ -715,16 +1044,372 @@ elif current_page == "API Cost Optimization":
 
     if cost_subtopic in ("All", "Estimate Token Cost"):
         with expander_section("Estimate Token Cost"):
-            tokens = st.slider("How many tokens per request?", min_value=100, max_value=2000, step=100, value=500)
-            requests = st.slider("How many requests per day?", min_value=1, max_value=5000, step=50, value=1000)
-            model = st.radio("Select model:", ["GPT-3.5 ($0.002 / 1K tokens)", "GPT-4 ($0.06 / 1K tokens)"])
-
-            cost_per_1k = 0.002 if "3.5" in model else 0.06
+            estimate = get_cost_estimate()
+            model_options = ["GPT-3.5 ($0.002 / 1K tokens)", "GPT-4 ($0.06 / 1K tokens)"]
+            tokens = st.slider("How many tokens per request?", min_value=100, max_value=2000, step=100,
+                               value=estimate["tokens"])
+            requests = st.slider("How many requests per day?", min_value=1, max_value=5000, step=50,
+                                 value=estimate["requests"])
+            model = st.radio("Select model:", model_options, index=model_options.index(estimate["model"]))
+
+            cost_per_1k = token_costs.model_price(model)
             daily_cost = (tokens * requests / 1000) * cost_per_1k
             monthly_cost = daily_cost * 30
 
+            # Remembered so the other cost tools project at the same volumes
+            st.session_state["cost_estimate"] = {"tokens": tokens, "requests": requests, "model": model}
+
             st.success(f"Estimated Monthly Cost: **${monthly_cost:,.2f}**")
 
+    if cost_subtopic in ("All", "Actual Spend vs. Estimate"):
+        with expander_section("Actual Spend vs. Estimate: Check Your Provider's Usage Export"):
+            st.write("""
+            Estimates drift. Upload the usage export from your provider's billing page to see what you actually spent
+            by model, day and feature, next to the estimate above. The file is read in chunks, so large exports are
+            summarized without loading them whole.
+            """)
+            usage_file = st.file_uploader("Usage export (CSV or JSONL, optionally .gz) with a timestamp, model and "
+                                          "either a cost or token count columns",
+                                          type=["csv", "jsonl", "json", "gz"], key="spend_usage_file")
+            st.caption("Exports larger than the upload limit can be summarized locally with "
+                       "`python usage_ingest.py export.csv --out summary.csv`; upload the summary instead.")
+
+            if usage_file is not None:
+                try:
+                    usage, stats = load_usage_export(usage_file.name, usage_file.getvalue())
+                except Exception as e:
+                    st.error(f"Error reading usage export: {str(e)}")
+                    usage = None
+                if usage is not None and usage.empty:
+                    st.warning("No usable rows found in the export.")
+                elif usage is not None:
+                    st.caption(f"Read {stats['rows']:,} rows in {stats['chunks']} chunk(s) into "
+                               f"{len(usage):,} day/model/feature totals.")
+                    if stats["skipped rows"]:
+                        st.warning(f"{stats['skipped rows']:,} rows had unreadable timestamps and were skipped.")
+                    if stats["unpriced models"]:
+                        st.warning(f"No known price for {', '.join(sorted(stats['unpriced models']))}; "
+                                   "their spend is counted as $0. Include a cost column to price them.")
+
+                    estimate = get_cost_estimate()
+                    comparison = usage_ingest.compare_to_estimate(
+                        usage, estimate["tokens"], estimate["requests"], token_costs.model_price(estimate["model"]))
+                    comparison["Difference %"] = (comparison["Actual"] / comparison["Estimated"] - 1) * 100
+                    actual_month = comparison.loc["Spend per month ($)", "Actual"]
+                    estimated_month = comparison.loc["Spend per month ($)", "Estimated"]
+                    col1, col2 = st.columns(2)
+                    col1.metric("Estimated monthly spend", f"${estimated_month:,.2f}")
+                    col2.metric("Actual monthly run rate", f"${actual_month:,.2f}",
+                                f"{actual_month - estimated_month:+,.2f}", delta_color="inverse")
+                    st.dataframe(comparison.style.format("{:,.2f}"), use_container_width=True)
+
+                    st.markdown("**Spend per day**")
+                    st.bar_chart(usage.pivot_table(index="Day", columns="Model", values="Spend ($)", aggfunc="sum"))
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        st.markdown("**By model**")
+                        st.dataframe(usage.groupby("Model")[["Requests", "Input tokens", "Output tokens", "Spend ($)"]]
+                                     .sum().sort_values("Spend ($)", ascending=False), use_container_width=True)
+                    with col2:
+                        st.markdown("**By feature**")
+                        st.dataframe(usage.groupby("Feature")[["Requests", "Spend ($)"]].sum()
+                                     .sort_values("Spend ($)", ascending=False), use_container_width=True)
+                    st.download_button("📥 Download Spend Summary (CSV)", usage.to_csv(index=False),
+                                       file_name="usage_summary.csv", mime="text/csv")
+
+    if cost_subtopic in ("All", "Conversation Cost Modeller"):
+        with expander_section("Conversation Cost Modeller: What Does a Chat Really Cost?"):
+            st.write("""
+            Chatbots resend the conversation history on every turn, so the input grows with each message and the cost
+            of a long chat grows roughly with the square of its length. Simulate thousands of conversations and compare
+            ways of keeping the context in check.
+            """)
+            estimate = get_cost_estimate()
+            price = token_costs.model_price(estimate["model"])
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                conversations_per_day = st.number_input("Conversations per day", min_value=1,
+                                                        value=max(1, estimate["requests"] // 10), step=50, key="conv_per_day")
+                mean_turns = st.slider("Average turns per conversation", 1, 40, 10, key="conv_turns")
+                system_tokens = st.number_input("System prompt tokens", min_value=0, value=300, step=50, key="conv_system")
+            with col2:
+                user_tokens = st.number_input("Average user message tokens", min_value=1, value=60, step=10, key="conv_user")
+                reply_tokens = st.number_input("Average reply tokens", min_value=1, value=250, step=25, key="conv_reply")
+                context_limit = st.number_input("Model context window (tokens)", min_value=1024, value=8192, step=1024,
+                                                key="conv_limit")
+            with col3:
+                window = st.slider("Sliding window: exchanges kept", 1, 20, 4, key="conv_window")
+                summary_every = st.slider("Summarize every N turns", 2, 20, 8, key="conv_summary_every")
+                summary_tokens = st.number_input("Summary length (tokens)", min_value=50, value=300, step=50,
+                                                 key="conv_summary_tokens")
+                cached_ratio = st.slider("Cached input price (share of normal)", 0.0, 1.0, 0.5, step=0.05,
+                                         key="conv_cached_ratio")
+
+            user, reply, active = conversation_costs.simulate_conversations(
+                5000, mean_turns=mean_turns, user_tokens=user_tokens, reply_tokens=reply_tokens)
+            summary, profile = conversation_costs.compare_policies(
+                user, reply, active, price, context_limit=context_limit, system_tokens=system_tokens, window=window,
+                summary_every=summary_every, summary_tokens=summary_tokens, cached_price_ratio=cached_ratio)
+            summary["Monthly cost ($)"] = (summary["Cost per conversation ($)"] * conversations_per_day
+                                           * token_costs.DAYS_PER_MONTH)
+
+            full, best = summary.loc["Full history"], summary["Monthly cost ($)"].idxmin()
+            col1, col2 = st.columns(2)
+            col1.metric("Full history, per month", f"${full['Monthly cost ($)']:,.2f}")
+            col2.metric(f"{best}, per month", f"${summary.loc[best, 'Monthly cost ($)']:,.2f}",
+                        f"-{1 - summary.loc[best, 'Monthly cost ($)'] / full['Monthly cost ($)']:.0%}",
+                        delta_color="inverse")
+            if full["Turns over context limit %"] > 0:
+                st.warning(f"With full history, {full['Turns over context limit %']:.1f}% of turns exceed the "
+                           f"{context_limit:,}-token context window and would fail or be truncated.")
+
+            st.markdown("**Average context sent per turn (tokens)**")
+            st.line_chart(profile.xs("context", axis=1, level=1))
+            st.dataframe(summary.style.format({
+                "Cost per conversation ($)": "${:,.4f}", "Cost per turn ($)": "${:,.5f}",
+                "Mean context (tokens)": "{:,.0f}", "Max context (tokens)": "{:,}",
+                "Turns over context limit %": "{:.1f}", "Monthly cost ($)": "${:,.2f}",
+            }), use_container_width=True)
+            st.caption(f"5,000 simulated conversations at {estimate['model']}. Summarization includes the cost of the "
+                       "summarization calls; caching assumes prefixes of 1,024+ tokens are cached.")
+
+    if cost_subtopic in ("All", "Prompt Compressor"):
+        with expander_section("Prompt Compressor: Measure What Shorter Prompts Save"):
+            estimate = get_cost_estimate()
+            st.write(f"""
+            Removes redundant whitespace, repeated boilerplate, duplicated few-shot examples and wordy phrasing,
+            then projects savings at your estimator settings: **{estimate['requests']:,} requests/day** on
+            **{estimate['model'].split(' (')[0]}**.
+            """)
+            if not token_costs.tokens_are_exact():
+                st.caption("Token counts are estimated: the tiktoken cl100k_base encoding is not available on this server.")
+
+            max_examples = st.number_input("Keep at most this many few-shot examples (0 = keep all)",
+                                           min_value=0, max_value=20, value=0, key="compress_max_examples")
+            compress_mode = st.radio("Mode", ["Single prompt", "Prompt file"], horizontal=True, key="compress_mode")
+
+            if compress_mode == "Single prompt":
+                compress_input = st.text_area("Prompt to compress", height=200, key="compress_prompt")
+                if compress_input.strip():
+                    result = prompt_compressor.compress_prompt(compress_input, max_examples=max_examples or None)
+                    col1, col2, col3 = st.columns(3)
+                    col1.metric("Tokens before", f"{result['Tokens before']:,}")
+                    col2.metric("Tokens after", f"{result['Tokens after']:,}", delta=-result["Tokens saved"],
+                                delta_color="inverse")
+                    col3.metric("Monthly savings", f"${prompt_compressor.monthly_savings(result['Tokens saved'], estimate['requests'], estimate['model']):,.2f}")
+                    st.code(result["Compressed"], language="text")
+            else:
+                compress_file = st.file_uploader("Prompt file (CSV, or TXT with one prompt per line)",
+                                                 type=["csv", "txt"], key="compress_file")
+                if compress_file is not None:
+                    if compress_file.name.endswith(".csv"):
+                        prompts_df = pd.read_csv(compress_file)
+                        prompt_col = st.selectbox("Prompt column", prompts_df.columns, key="compress_column")
+                        prompts = prompts_df[prompt_col].dropna().astype(str).tolist()
+                    else:
+                        prompts = [line for line in compress_file.getvalue().decode("utf-8", errors="replace").splitlines()
+                                   if line.strip()]
+                    report = prompt_compressor.compress_prompts(prompts, max_examples=max_examples or None)
+                    avg_saved = report["Tokens saved"].mean()
+                    col1, col2, col3 = st.columns(3)
+                    col1.metric("Tokens before", f"{report['Tokens before'].sum():,}")
+                    col2.metric("Tokens after", f"{report['Tokens after'].sum():,}")
+                    col3.metric("Monthly savings (avg prompt)",
+                                f"${prompt_compressor.monthly_savings(avg_saved, estimate['requests'], estimate['model']):,.2f}")
+                    st.dataframe(report.sort_values("Tokens saved", ascending=False), use_container_width=True)
+                    st.download_button("📥 Download Compressed Prompts (CSV)", report.to_csv(index=False),
+                                       file_name="compressed_prompts.csv", mime="text/csv")
+
+    if cost_subtopic in ("All", "Model Routing Simulator"):
+        with expander_section("Model Routing Simulator: Replay Your Logs Through a Tiering Policy"):
+            st.write("""
+            "Use cheaper models for simpler tasks" — but which tasks, and how much does it save? Replay a request log
+            through routing policies that send each request to a model tier by length, keywords or a complexity score.
+            """)
+            log_file = st.file_uploader("Request log (CSV, JSONL or Parquet with a `prompt` and/or "
+                                        "`input_tokens`/`output_tokens` columns)",
+                                        type=["csv", "jsonl", "parquet"], key="routing_log_file")
+            keywords = st.text_input("Keywords that need the top tier (comma-separated)",
+                                     value=", ".join(routing_simulator.DEFAULT_KEYWORDS), key="routing_keywords")
+            keyword_list = tuple(k.strip() for k in keywords.split(",") if k.strip())
+
+            features = None
+            if log_file is not None:
+                try:
+                    features = load_routing_log(log_file.name, log_file.getvalue(), keyword_list)
+                except Exception as e:
+                    st.error(f"Error reading request log: {str(e)}")
+            else:
+                synthetic_rows = st.select_slider("No log uploaded — simulate a synthetic log of",
+                                                  options=[10_000, 100_000, 1_000_000], value=100_000,
+                                                  format_func=lambda n: f"{n:,} requests", key="routing_rows")
+                features = routing_simulator.synthetic_log(synthetic_rows)
+
+            if features is not None:
+                st.markdown("**Model tiers** (cheapest first; edit prices and latency to match your providers)")
+                tiers = st.data_editor(routing_simulator.DEFAULT_TIERS, num_rows="dynamic", hide_index=True,
+                                       key="routing_tiers").dropna()
+
+                if len(tiers) >= 2:
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        length_cut = st.slider("Length policy: prompts with at least this many tokens use the top tier",
+                                               50, 4000, 800, step=50, key="routing_length_cut")
+                    with col2:
+                        complexity_cut = st.slider("Complexity policy: scores at or above this use the top tier",
+                                                   0.0, 1.0, 0.6, step=0.05, key="routing_complexity_cut")
+
+                    top = len(tiers) - 1
+                    # Middle tiers (if any) get evenly spaced thresholds below the top cut-off
+                    middle = [(i + 1) / len(tiers) for i in range(top - 1)]
+                    policies = {f"All {tiers['Tier'].iloc[0]}": {"kind": "fixed", "tier": 0},
+                                f"All {tiers['Tier'].iloc[top]}": {"kind": "fixed", "tier": top},
+                                "Length": {"kind": "length", "thresholds": [length_cut * m for m in middle] + [length_cut]},
+                                "Keyword": {"kind": "keyword"},
+                                "Complexity": {"kind": "complexity",
+                                               "thresholds": [complexity_cut * m for m in middle] + [complexity_cut]}}
+
+                    started = datetime.now()
+                    comparison = routing_simulator.compare_policies(features, policies, tiers.reset_index(drop=True))
+                    elapsed = (datetime.now() - started).total_seconds()
+
+                    st.caption(f"Replayed {len(features):,} requests through {len(policies)} policies in {elapsed:.2f}s.")
+                    st.dataframe(comparison.style.format("{:,.2f}"), use_container_width=True)
+                    st.bar_chart(comparison["Total cost ($)"])
+                else:
+                    st.info("Add at least two tiers to compare routing policies.")
+
+    if cost_subtopic in ("All", "Capacity Planner"):
+        with expander_section("Capacity Planner: Can We Serve the Load?"):
+            st.write("""
+            Requests per day tells you the bill, not whether you can serve the traffic. Enter your load and provider limits
+            to see the concurrency you need, queueing delay at peak, and the hours where you will hit rate limits.
+            """)
+            estimate = get_cost_estimate()
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                daily_requests = st.number_input("Requests per day", min_value=1,
+                                                 max_value=capacity_planner.MAX_DAILY_REQUESTS,
+                                                 value=min(estimate["requests"], capacity_planner.MAX_DAILY_REQUESTS),
+                                                 step=1000, key="cap_daily_requests")
+                peak_factor = st.slider("Peak hour vs. average", 1.0, 6.0, 2.5, step=0.5, key="cap_peak_factor",
+                                        help="How much busier the busiest hour is than the daily average.")
+                burstiness = st.slider("Burstiness (arrival CV)", 0.5, 3.0, 1.0, step=0.25, key="cap_burstiness",
+                                       help="1.0 = random (Poisson) arrivals; higher = traffic comes in clumps.")
+            with col2:
+                cap_tokens = st.number_input("Tokens per request", min_value=1, value=estimate["tokens"],
+                                             step=100, key="cap_tokens")
+                latency = st.number_input("Mean API latency (s)", min_value=0.1, value=3.0, step=0.5, key="cap_latency")
+                latency_cv = st.slider("Latency variability (CV)", 0.0, 2.0, 0.5, step=0.1, key="cap_latency_cv")
+            with col3:
+                rpm_limit = st.number_input("Provider RPM limit (0 = none)", min_value=0, value=3500, step=500,
+                                            key="cap_rpm")
+                tpm_limit = st.number_input("Provider TPM limit (0 = none)", min_value=0, value=90000, step=10000,
+                                            key="cap_tpm")
+                max_p95_wait = st.number_input("Max acceptable p95 queueing delay (s)", min_value=0.0, value=1.0,
+                                               step=0.5, key="cap_max_wait")
+
+            profile = capacity_planner.daily_profile(daily_requests, peak_factor)
+            peak_rate = profile["Requests/s"].max()
+            limit_rate, binding = capacity_planner.rate_limit_capacity(cap_tokens, rpm_limit, tpm_limit)
+            servers = capacity_planner.required_concurrency(peak_rate, latency, burstiness, latency_cv,
+                                                            max_p95_wait=max_p95_wait)
+
+            col1, col2, col3 = st.columns(3)
+            col1.metric("Peak arrival rate", f"{peak_rate:,.2f} req/s")
+            col2.metric("Concurrency needed at peak", f"{servers:,}")
+            col3.metric(f"Rate-limit ceiling ({binding})",
+                        "unlimited" if limit_rate == float("inf") else f"{limit_rate:,.2f} req/s")
+
+            over_limit = profile[profile["Requests/s"] > limit_rate]
+            if over_limit.empty:
+                st.success(f"Peak traffic uses {peak_rate / limit_rate:.0%} of your {binding} limit."
+                           if limit_rate != float("inf") else "No rate limits set.")
+            else:
+                hours = ", ".join(f"{h:02d}:00" for h in over_limit["Hour"])
+                st.error(f"Traffic exceeds the {binding} limit during {len(over_limit)} hour(s): {hours}. "
+                         "Requests will queue behind the limiter and latency grows without bound.")
+
+            chart = profile.set_index("Hour")
+            if limit_rate != float("inf"):
+                chart[f"{binding} limit"] = limit_rate
+            st.line_chart(chart)
+
+            analytic = capacity_planner.analytic_metrics(peak_rate, latency, servers, burstiness, latency_cv)
+            simulated = simulate_capacity(peak_rate, latency, servers, cap_tokens, rpm_limit, tpm_limit,
+                                          burstiness, latency_cv)
+            st.markdown(f"**Peak hour with {servers} concurrent workers** — queueing model vs. "
+                        f"a {simulated['Simulated seconds']:,.0f}-second discrete-event simulation "
+                        f"that also enforces the rate limits:")
+            shared = ["Mean wait (s)", "p50 latency (s)", "p95 latency (s)", "p99 latency (s)"]
+            st.dataframe(pd.DataFrame({
+                "Queueing model (no limits)": [analytic[k] for k in shared] + [analytic["Utilisation"] * 100, None],
+                "Simulation (with limits)": [simulated[k] for k in shared] + [None, simulated["Throttled %"]],
+            }, index=shared + ["Utilisation %", "Throttled %"]).style.format("{:,.2f}", na_rep="—"),
+                use_container_width=True)
+
+    if cost_subtopic in ("All", "Long Document Summarizer"):
+        with expander_section("Long Document Summarizer: Map-Reduce Past the Context Window"):
+            st.write("""
+            "Summarize this email thread" stops working once the text is longer than the model's context window.
+            The usual fix is map-reduce: split the document into overlapping chunks that fit, summarize the chunks in
+            parallel, then summarize the summaries until one is left. Upload a long document to see what each stage
+            costs in time and tokens.
+            """)
+            doc_file = st.file_uploader("Long document (plain text or Markdown)", type=["txt", "md"],
+                                        key="longdoc_file")
+            col1, col2 = st.columns(2)
+            with col1:
+                chunk_tokens = st.slider("Chunk size (tokens)", 200, 4000, doc_summarizer.CHUNK_TOKENS, step=100,
+                                         key="longdoc_chunk")
+                overlap_tokens = st.slider("Overlap between chunks (tokens)", 0, 500, doc_summarizer.OVERLAP_TOKENS,
+                                           step=25, key="longdoc_overlap")
+            with col2:
+                summary_tokens = st.slider("Summary length per call (tokens)", 50, 500, doc_summarizer.SUMMARY_TOKENS,
+                                           step=25, key="longdoc_summary")
+                backend_name = st.radio("Summarizer", [doc_summarizer.ExtractiveBackend.name,
+                                                       doc_summarizer.LocalModelBackend.name], key="longdoc_backend",
+                                        help=None if inference_worker.configured_model_path() else
+                                        "The demo model has random weights, so its summaries are noise, "
+                                        "but its timings show how batching a real model behaves.")
+
+            if doc_file is not None and st.button("Summarize document", key="longdoc_run"):
+                try:
+                    if backend_name == doc_summarizer.LocalModelBackend.name:
+                        backend = doc_summarizer.LocalModelBackend(get_inference_worker())
+                        max_input = backend.max_input_tokens(summary_tokens)
+                        if max_input < chunk_tokens:
+                            st.caption(f"Chunks are capped at {max_input:,} of the local model's own tokens so each "
+                                       f"prompt and its summary fit its {backend.worker.context_length:,}-token context.")
+                    else:
+                        backend = doc_summarizer.ExtractiveBackend()
+                    status = st.empty()
+                    # Decode the upload in place (Streamlit already holds it in memory) rather than copying it
+                    doc_file.seek(0)
+                    text_stream = io.TextIOWrapper(doc_file, encoding="utf-8", errors="replace")
+                    try:
+                        summary, stages = doc_summarizer.summarize_document(
+                            text_stream, backend, chunk_tokens=chunk_tokens, overlap_tokens=overlap_tokens,
+                            summary_tokens=summary_tokens, progress=status.caption)
+                    finally:
+                        text_stream.detach()
+                    status.empty()
+
+                    estimate = get_cost_estimate()
+                    stages = doc_summarizer.price_stages(stages, token_costs.model_price(estimate["model"]))
+                    col1, col2, col3 = st.columns(3)
+                    col1.metric("Chunks", f"{stages.loc[0, 'Calls']:,}")
+                    col2.metric("Total time", f"{stages['Seconds'].sum():.2f}s")
+                    col3.metric(f"Cost at {estimate['model'].split(' (')[0]} prices", f"${stages['Cost ($)'].sum():,.4f}")
+                    st.markdown("**Summary**")
+                    st.write(summary or "_(empty)_")
+                    st.dataframe(stages.set_index("Stage").style.format(
+                        {"Input tokens": "{:,}", "Output tokens": "{:,}", "Seconds": "{:.3f}", "Cost ($)": "{:.4f}"}),
+                        use_container_width=True)
+                    st.bar_chart(stages.set_index("Stage")["Seconds"])
+                except Exception as e:
+                    st.error(f"Error summarizing document: {str(e)}")
+
     st.markdown("Use logs and dashboards to track usage and refine prompts. Optimizing your AI usage = extending your runway.")
     reset_expansion_state()
     
@@ -752,6 +1437,7 @@ elif current_page == "Ethics & Bias":
             "Ethical Review Template"
             ]
         )
+        track_event("subtopic", current_page, ethics_subtopic)
 
     # --- Conditional Sections ---
     if ethics_subtopic in ("All", "Why Ethics and Fairness Matter"):
@@ -856,6 +1542,53 @@ elif current_page == "Ethics & Bias":
             st.warning(f"Model Output: “{biased_outputs[example_prompt]}”")
             st.markdown("**Reflection:** Are assumptions being made? Who is being stereotyped or excluded?")
 
+            # --- Lexicon Scanner ---
+            st.markdown("#### Scan Your Own Model Outputs")
+            st.caption("Flags gendered, age-related, ableist and exclusionary phrasings. "
+                       "A match is a prompt for review, not proof of bias. Pronouns are counted for context only.")
+            scan_mode = st.radio("Scan mode", ["Single text", "Batch upload"], horizontal=True, key="bias_scan_mode")
+
+            if scan_mode == "Single text":
+                scan_input = st.text_area("Paste a model output", value=biased_outputs[example_prompt], key="bias_scan_text")
+                spans = bias_scanner.scan_text(scan_input)
+                if spans:
+                    st.markdown(bias_scanner.highlight_html(scan_input, spans), unsafe_allow_html=True)
+                    st.dataframe(pd.DataFrame([bias_scanner.category_counts(spans)], index=["Matches"]),
+                                 use_container_width=True)
+                else:
+                    st.success("No lexicon terms found.")
+                pronouns = bias_scanner.pronoun_counts([scan_input])
+                if pronouns.sum():
+                    st.caption("Pronouns (informational): " + ", ".join(f"{k} {v}" for k, v in pronouns.items()))
+            else:
+                scan_file = st.file_uploader("Upload outputs (CSV, or TXT with one output per line)",
+                                             type=["csv", "txt"], key="bias_scan_file")
+                if scan_file is not None:
+                    outputs_df = load_scan_outputs(scan_file.name, scan_file.getvalue())
+                    text_col = "Output"
+                    if scan_file.name.endswith(".csv"):
+                        text_col = st.selectbox("Column to scan", outputs_df.columns, key="bias_scan_column")
+
+                    scan_texts, matches, counts, pronouns, elapsed = scan_outputs(scan_file.name, scan_file.getvalue(),
+                                                                                  text_col)
+                    flagged = counts[counts["Total"] > 0]
+
+                    st.success(f"Scanned {len(counts):,} outputs in {elapsed:.2f}s — "
+                               f"{len(flagged):,} contain at least one flagged term.")
+                    st.bar_chart(counts.drop(columns="Total").sum())
+                    st.markdown("**Most frequent terms**")
+                    st.dataframe(matches.groupby(["category", "term"], observed=True).size()
+                                 .sort_values(ascending=False).head(20).rename("Matches").reset_index(),
+                                 use_container_width=True)
+                    st.markdown("**Pronoun usage** (informational: a heavy skew may reflect a default gender)")
+                    st.dataframe(pronouns.to_frame().T, use_container_width=True, hide_index=True)
+
+                    report = flagged.join(scan_texts.rename("Output"))
+                    st.markdown("**Flagged outputs**")
+                    st.dataframe(report.head(500), use_container_width=True)
+                    st.download_button("📥 Download Flagged Outputs (CSV)", report.to_csv(index_label="Row"),
+                                       file_name="bias_scan_report.csv", mime="text/csv")
+
     if ethics_subtopic in ("All", "Bias Reflection Quiz"):
         with expander_section("Try This"):
             bias_prompt = st.radio("Which of these might reflect bias?", [
@@ -864,6 +1597,7 @@ elif current_page == "Ethics & Bias":
                 "Summarize a product spec for a software tool", 
                 "Generate a welcome message for a task management app"
             ])
+            track_quiz("Which of these might reflect bias?", bias_prompt)
             if bias_prompt == "Write a bio for a doctor: 'Dr. Smith is a brilliant young man...'":
                 st.success(" Correct. This assumes the doctor's gender, which may reflect bias.")
             else:
@@ -916,17 +1650,74 @@ elif current_page == "Ethics & Bias":
                 submitted = st.form_submit_button("Submit Review")
     
                 if submitted:
-                    st.success("Review submitted. Please copy or document your answers for records.")
-                    st.markdown("### 📄 Review Summary")
-                    st.write(f"**Feature Name:** {feature_name}")
-                    st.write(f"**Purpose:** {purpose}")
-                    st.write(f"**Potential Risks:** {risks}")
-                    st.write(f"**Bias Testing Completed:** {bias_tested}")
-                    st.write(f"**Human Review In Place:** {human_review}")
-                    st.write(f"**Disclosure to Users:** {disclosure}")
-                    st.write(f"**Final Risk Assessment:** {risk_level}")
+                    if not feature_name.strip():
+                        st.warning("Please enter a feature name so the review can be found later.")
+                    else:
+                        save_ethical_review({
+                            "feature_name": feature_name,
+                            "purpose": purpose,
+                            "risks": risks,
+                            "bias_tested": bias_tested,
+                            "human_review": human_review,
+                            "disclosure": disclosure,
+                            "risk_level": risk_level,
+                        })
+                        st.success("Review submitted and saved to the team review log.")
+                        st.markdown("### 📄 Review Summary")
+                        st.write(f"**Feature Name:** {feature_name}")
+                        st.write(f"**Purpose:** {purpose}")
+                        st.write(f"**Potential Risks:** {risks}")
+                        st.write(f"**Bias Testing Completed:** {bias_tested}")
+                        st.write(f"**Human Review In Place:** {human_review}")
+                        st.write(f"**Disclosure to Users:** {disclosure}")
+                        st.write(f"**Final Risk Assessment:** {risk_level}")
     
-            st.caption("Note: This form is not stored. Copy your review for team documentation or export manually.")
+            st.caption("Note: Submitted reviews are saved locally and can be searched and exported below.")
+
+            # --- Saved Reviews Browser ---
+            st.markdown("### 🗂️ Saved Reviews")
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                review_feature = st.text_input("Feature name starts with", key="review_filter_feature")
+            with col2:
+                review_risks = st.multiselect("Risk level", review_store.RISK_LEVELS, key="review_filter_risk")
+            with col3:
+                review_dates = st.date_input("Submitted between", value=(), key="review_filter_dates")
+
+            review_filters = {
+                "feature": review_feature or None,
+                "risk_levels": review_risks or None,
+                "start": review_dates[0] if len(review_dates) > 0 else None,
+                "end": review_dates[1] if len(review_dates) > 1 else None,
+            }
+            total_reviews = review_store.count_reviews(**review_filters)
+
+            if total_reviews:
+                page_size = 25
+                page_count = (total_reviews + page_size - 1) // page_size
+                # Narrower filters can leave the remembered page past the end
+                if st.session_state.get("review_page", 1) > page_count:
+                    st.session_state["review_page"] = page_count
+                review_page = st.number_input(f"Page (of {page_count})", min_value=1, max_value=page_count,
+                                              step=1, key="review_page")
+                reviews_df = pd.DataFrame(review_store.list_reviews(page=review_page, page_size=page_size,
+                                                                    **review_filters))
+                st.caption(f"{total_reviews} matching reviews")
+                st.dataframe(reviews_df.set_index("id"), use_container_width=True)
+
+                # Exports are generated only when clicked. Rows are read from the store in batches and
+                # spooled to a temp file; Streamlit then serves the finished file from memory.
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.download_button("📥 Export JSONL",
+                                       lambda: review_store.spool_export(review_store.export_jsonl(**review_filters)),
+                                       file_name="ethical_reviews.jsonl", mime="application/jsonl")
+                with col2:
+                    st.download_button("📥 Export CSV",
+                                       lambda: review_store.spool_export(review_store.export_csv(**review_filters)),
+                                       file_name="ethical_reviews.csv", mime="text/csv")
+            else:
+                st.info("No saved reviews match these filters yet.")
         st.markdown("Fairness in AI isn't just about compliance — it's about creating a startup culture users can trust.")
     reset_expansion_state()
     
@@ -1021,7 +1812,7 @@ elif current_page == "Feedback":
         rating = st.slider(" How helpful was this guide?", 1, 5, 3)
         feedback = st.text_area("Your Comments (optional)", placeholder="What worked well? What could be improved?")
         suggestion = st.selectbox("What topics should we cover next?", 
-                                  ["None", "LLM APIs", "Customer Support", "Tool Comparisons", "No-code Prototyping"])
+                                  ["None"] + feedback_store.SUGGESTED_TOPICS)
         attachment = st.file_uploader("📎 Optional File Upload", type=["png", "jpg", "pdf", "txt", "docx"])
 
         required_filled = bool(name.strip())
@@ -1030,10 +1821,16 @@ elif current_page == "Feedback":
         submitted = st.form_submit_button("Submit Feedback")
 
         if submitted:
-            if not required_filled:
+            guard = get_submission_guard()
+            allowed, retry_after = guard.allow(get_session_id(), get_client_id())
+            if not allowed:
+                st.warning(f"You're submitting feedback very quickly. Please wait about {int(retry_after) + 1} seconds and try again.")
+            elif not required_filled:
                 st.warning("Please enter your name to submit the form.")
             elif not email_valid:
                 st.error("Invalid email format. Please check and try again.")
+            elif guard.is_duplicate(name, feedback):
+                st.info("We've already received this feedback — thank you! No need to send it again.")
             else:
                 entry = {
                     "Name": name.strip(),
@@ -1043,11 +1840,16 @@ elif current_page == "Feedback":
                     "Suggested topic": None if suggestion == "None" else suggestion,
                     "Attachment name": attachment.name if attachment else None
                 }
-                store_feedback(entry)
-                st.success(f" Thank you, {name.strip()}! We truly appreciate your insights and will use your feedback to make this guide even better.")
+                if store_feedback(entry):
+                    st.success(f" Thank you, {name.strip()}! We truly appreciate your insights and will use your feedback to make this guide even better.")
                 
-                # Refresh entries in session state
-                st.session_state['feedback_entries'] = load_feedback()
+                    # Refresh entries in session state
+                    st.session_state['feedback_entries'] = load_feedback()
+                    # Fold the comment into the themes incrementally (no refit)
+                    get_comment_clusterer().add([entry["Feedback"]], [entry["Name"]])
+                else:
+                    # Let the user retry the same text once the write works again
+                    guard.forget(name, feedback)
 
     # --- Load Feedback into Session If Not Present ---
     if 'feedback_entries' not in st.session_state:
@@ -1063,6 +1865,8 @@ elif current_page == "Feedback":
     
         df.index += 1
         df.index.name = "No."
+        # Names, emails and phone numbers are redacted for everyone viewing the page
+        df = get_pii_masker().mask(df)
         st.markdown("### All Submitted Feedback")
         st.dataframe(df, use_container_width=True)
     else:
@@ -1076,23 +1880,97 @@ elif current_page == "Feedback":
         confirm_clear = st.checkbox("I confirm this action is irreversible.")
         ADMIN_PASSPHRASE = st.secrets["ADMIN_PASSPHRASE"]
     
-        # Download CSV if entries exist
+        # Download CSV if entries exist (reads only the chosen columns and days)
         if st.session_state.get("feedback_entries"):
-            export_df = pd.DataFrame(st.session_state["feedback_entries"])
+            export_cols = st.multiselect("Columns to export", feedback_store.FEEDBACK_COLUMNS,
+                                         default=feedback_store.FEEDBACK_COLUMNS)
+            export_range = st.date_input("Submitted between", value=())
+            start, end = (export_range + (None, None))[:2] if export_range else (None, None)
+            export_cols = export_cols or feedback_store.FEEDBACK_COLUMNS
+            mask_export = st.checkbox("Mask personal data (names, emails, phone numbers)", value=True,
+                                      key="export_mask_pii")
+            if mask_export or admin_key_input != ADMIN_PASSPHRASE:
+                if not mask_export:
+                    st.caption("Enter the admin passphrase to export unmasked data.")
+                # Names are read even when not exported, so they can still be masked inside the comments
+                export_df = feedback_store.read_feedback(columns=list(dict.fromkeys(export_cols + ["Name"])),
+                                                         start=start, end=end)
+                export_df = get_pii_masker().mask(export_df, keep=export_cols)
+            else:
+                export_df = feedback_store.read_feedback(columns=export_cols, start=start, end=end)
             csv_data = export_df.to_csv(index=False).encode("utf-8")
             st.download_button("📥 Download Feedback CSV", csv_data, file_name="feedback_backup.csv", mime="text/csv")
+
+        # Segment storage overview and manual maintenance
+        stats = feedback_store.storage_stats()
+        if not stats.empty:
+            st.markdown(f"**Storage:** {stats['Segments'].sum()} segments across {len(stats)} daily partitions "
+                        f"({stats['Bytes'].sum() / 1024:,.1f} KB). Partitions older than "
+                        f"{feedback_store.RETENTION_DAYS} days are expired automatically.")
+            if st.button("🧹 Compact Segments Now"):
+                if admin_key_input == ADMIN_PASSPHRASE:
+                    result = feedback_store.run_maintenance()
+                    st.success(f"Merged {result['merged_segments']} segments, expired {result['expired_partitions']} partitions.")
+                else:
+                    st.error("Invalid passphrase.")
     
+        # Usage analytics (in-memory counters flushed to disk every minute)
+        if admin_key_input == ADMIN_PASSPHRASE:
+            st.markdown("### Usage Analytics")
+            window = st.selectbox("Period", ["Last 7 days", "Last 30 days", "All time"], key="analytics_period")
+            counts = get_usage_counters().counts(days={"Last 7 days": 7, "Last 30 days": 30}.get(window))
+            if counts.empty:
+                st.info("No usage recorded yet.")
+            else:
+                views = usage_analytics.page_views(counts)
+                st.markdown("**Most-visited pages**")
+                st.bar_chart(views.set_index("Page")["Views"])
+                st.markdown("**Most-visited sub-topics**")
+                st.dataframe(usage_analytics.subtopic_views(counts).head(20), use_container_width=True, hide_index=True)
+                quiz = usage_analytics.quiz_answers(counts)
+                if not quiz.empty:
+                    st.markdown("**Quiz answers**")
+                    for question, answers in quiz.groupby("Question", sort=False):
+                        st.caption(question)
+                        st.dataframe(answers.drop(columns="Question"), use_container_width=True, hide_index=True)
+
+        # Comment themes (incremental TF-IDF clustering)
+        if admin_key_input == ADMIN_PASSPHRASE and st.session_state.get("feedback_entries"):
+            st.markdown("### Comment Themes")
+            clusterer = get_comment_clusterer()
+            n_themes = st.number_input("Number of themes", min_value=2, max_value=20,
+                                       value=clusterer.n_clusters, key="theme_count")
+            try:
+                if int(n_themes) != clusterer.n_clusters:
+                    # A new theme count is a deliberate full refit of the one shared clusterer
+                    clusterer.reset(int(n_themes))
+                comments = feedback_store.read_feedback(columns=["Name", "Feedback"])
+                # Catch up on anything submitted before this process started (refitting if retention
+                # dropped comments it had seen), then keep the state
+                if clusterer.add_feedback(comments):
+                    comment_clusters.save_clusterer(clusterer)
+                themes = clusterer.summary(comments["Feedback"].tolist())
+                if themes.empty:
+                    st.info(f"Themes appear once there are at least {int(n_themes)} comments.")
+                for _, theme in themes.iterrows():
+                    st.markdown(f"**Theme {theme['Theme']}** · {theme['Comments']} comments · _{theme['Top terms']}_")
+                    st.markdown("\n".join(f"> {c}  " for c in theme["Representative comments"]))
+            except Exception as e:
+                st.error(f"Error clustering comments: {str(e)}")
+
         # Delete all feedback
         if st.button("🗑️ Clear All Feedback"):
             if admin_key_input == ADMIN_PASSPHRASE and confirm_clear:
                 try:
-                    # Delete the file if it exists
-                    if os.path.exists(FEEDBACK_PATH):
-                        os.remove(FEEDBACK_PATH)
-                        st.success("feedback.csv file deleted from disk.")
+                    # Delete every segment if any exist
+                    if feedback_store.clear_feedback():
+                        st.success("Feedback segments deleted from disk.")
                     else:
-                        st.info("feedback.csv file not found. Nothing to delete.")
+                        st.info("No feedback segments found. Nothing to delete.")
     
+                    # Forget the comment themes too, in memory and on disk
+                    comment_clusters.clear_clusterer(get_comment_clusterer())
+
                     # Clear session + cached data
                     st.session_state["feedback_entries"] = []
                     st.cache_data.clear()  # Clear any cached CSV load
@@ -0,0 +1,327 @@
+"""Concurrent-session load test for the Streamlit app.
+
+Starts ``llm_startup_guide_app.py`` in a local Streamlit server (in a
+scratch working directory, so test feedback never reaches the real store)
+and drives it with N simulated browser sessions over the same websocket
+protocol the frontend uses. Sessions navigate through ``page_titles``, move
+sliders, and submit the feedback form, with random think time between
+actions.
+
+Reports throughput and p50/p95/p99 rerun latency per concurrency level,
+plus server memory and CPU sampled once a second.
+
+Usage:
+    python load_test.py --sessions 1,5,10,25 --duration 60
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import secrets
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import psutil
+import requests
+import websockets
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+from app_source import APP_SCRIPT, copy_static_files, read_page_titles
+
+# Relative weights of the actions a simulated user takes
+ACTION_WEIGHTS = {"navigate": 0.6, "slider": 0.25, "feedback": 0.15}
+
+SAMPLE_COMMENTS = [
+    "Really helpful overview of prompt engineering.",
+    "The cost estimator saved us a lot of guesswork.",
+    "Would love more examples on hallucination checks.",
+    "Clear and practical, thanks!",
+]
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(port, workdir):
+    """Launch the app headless on ``port`` and wait until it answers health checks."""
+    copy_static_files(workdir)
+    # The Feedback page reads the admin passphrase from secrets; give the scratch server its own
+    os.makedirs(os.path.join(workdir, ".streamlit"), exist_ok=True)
+    with open(os.path.join(workdir, ".streamlit", "secrets.toml"), "w") as f:
+        f.write(f'ADMIN_PASSPHRASE = "{secrets.token_hex(16)}"\n')
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", APP_SCRIPT, "--server.headless", "true",
+         "--server.port", str(port), "--server.address", "127.0.0.1",
+         "--browser.gatherUsageStats", "false"],
+        cwd=workdir, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            if requests.get(f"http://127.0.0.1:{port}/_stcore/health", timeout=1).ok:
+                return proc
+        except requests.RequestException:
+            pass
+        if proc.poll() is not None:
+            break
+        time.sleep(0.5)
+    proc.kill()
+    raise RuntimeError("Streamlit server did not start")
+
+
+class ResourceMonitor(threading.Thread):
+    """Samples RSS and CPU of the server process (and its children) once a second."""
+
+    def __init__(self, pid, interval=1.0):
+        super().__init__(daemon=True)
+        self.process = psutil.Process(pid)
+        self.interval = interval
+        self.samples = []
+        self.label = None
+        self._halt = threading.Event()
+
+    def _processes(self):
+        return [self.process] + self.process.children(recursive=True)
+
+    def run(self):
+        start = time.time()
+        for p in self._processes():
+            p.cpu_percent(None)
+        while not self._halt.wait(self.interval):
+            try:
+                procs = self._processes()
+                rss = sum(p.memory_info().rss for p in procs)
+                cpu = sum(p.cpu_percent(None) for p in procs)
+            except psutil.NoSuchProcess:
+                break
+            self.samples.append({"Elapsed (s)": round(time.time() - start, 1), "Sessions": self.label,
+                                 "RSS (MB)": rss / 2 ** 20, "CPU %": cpu})
+
+    def stop(self):
+        self._halt.set()
+
+
+class Session:
+    """One simulated browser tab: holds widget state and replays it on every rerun."""
+
+    def __init__(self, url, page_titles, rng):
+        self.url = url
+        self.page_titles = page_titles
+        self.rng = rng
+        self.widgets = {}   # label -> (kind, proto) from the last run
+        self.states = {}    # widget id -> WidgetState sent on the next rerun
+        self.records = []
+        self.ws = None
+
+    async def __aenter__(self):
+        self.ws = await websockets.connect(self.url, subprotocols=["streamlit"], max_size=None)
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.ws.close()
+
+    async def rerun(self, action, triggers=()):
+        msg = BackMsg()
+        client_state = msg.rerun_script
+        client_state.SetInParent()
+        for state in list(self.states.values()) + list(triggers):
+            client_state.widget_states.widgets.add().CopyFrom(state)
+
+        started = time.perf_counter()
+        await self.ws.send(msg.SerializeToString())
+        widgets, errors = {}, []
+        while True:
+            fwd = ForwardMsg()
+            fwd.ParseFromString(await self.ws.recv())
+            kind = fwd.WhichOneof("type")
+            if kind == "delta" and fwd.delta.WhichOneof("type") == "new_element":
+                element_kind = fwd.delta.new_element.WhichOneof("type")
+                element = getattr(fwd.delta.new_element, element_kind)
+                if element_kind == "exception":
+                    errors.append(f"{element.type}: {element.message}")
+                elif getattr(element, "id", ""):
+                    widgets[getattr(element, "label", "") or element.id] = (element_kind, element)
+            elif kind == "script_finished" and fwd.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                break
+        self.records.append({"Action": action, "Latency (s)": time.perf_counter() - started,
+                             "Errors": len(errors), "Error": errors[0] if errors else None})
+
+        # Like the frontend, only keep state for widgets that were rendered this run
+        self.widgets = widgets
+        ids = {element.id for _, element in widgets.values()}
+        self.states = {wid: state for wid, state in self.states.items() if wid in ids}
+
+    def _state(self, element):
+        state = self.states.get(element.id)
+        if state is None:
+            state = BackMsg().rerun_script.widget_states.widgets.add()
+            state.id = element.id
+            self.states[element.id] = state
+        return state
+
+    def _menu(self):
+        return next((e for k, e in self.widgets.values() if k == "component_instance"), None)
+
+    async def navigate(self, page=None):
+        menu = self._menu()
+        page = page or self.rng.choice(self.page_titles)
+        if menu is not None:
+            self._state(menu).json_value = json.dumps(page)
+        await self.rerun("navigate")
+
+    async def move_slider(self):
+        sliders = [e for k, e in self.widgets.values() if k == "slider" and not e.form_id]
+        if not sliders:
+            return await self.navigate()
+        slider = self.rng.choice(sliders)
+        steps = int(round((slider.max - slider.min) / slider.step)) if slider.step else 10
+        value = slider.min + self.rng.randint(0, max(steps, 1)) * (slider.step or 1)
+        self._state(slider).double_array_value.data[:] = [value]
+        await self.rerun("slider")
+
+    async def submit_feedback(self):
+        await self.navigate("Feedback")
+        fields = {k: e for k, (kind, e) in self.widgets.items() if getattr(e, "form_id", "") == "feedback_form"}
+        submit = next((e for k, e in fields.items() if k == "Submit Feedback"), None)
+        if submit is None:
+            return
+        for label, element in fields.items():
+            if label.startswith("Full Name"):
+                self._state(element).string_value = f"Load Tester {self.rng.randint(1, 10 ** 6)}"
+            elif label.startswith("Your Comments"):
+                self._state(element).string_value = self.rng.choice(SAMPLE_COMMENTS)
+            elif "helpful" in label:
+                self._state(element).double_array_value.data[:] = [self.rng.randint(1, 5)]
+        trigger = BackMsg().rerun_script.widget_states.widgets.add()
+        trigger.id = submit.id
+        trigger.trigger_value = True
+        await self.rerun("feedback", triggers=[trigger])
+
+    async def act(self):
+        action = self.rng.choices(list(ACTION_WEIGHTS), weights=list(ACTION_WEIGHTS.values()))[0]
+        if action == "navigate":
+            await self.navigate()
+        elif action == "slider":
+            await self.move_slider()
+        else:
+            await self.submit_feedback()
+
+
+async def _run_session(url, page_titles, duration, think_time, seed):
+    rng = random.Random(seed)
+    async with Session(url, page_titles, rng) as session:
+        await session.rerun("initial load")
+        deadline = time.monotonic() + duration
+        while time.monotonic() < deadline:
+            await asyncio.sleep(rng.expovariate(1 / think_time) if think_time else 0)
+            await session.act()
+        return session.records
+
+
+async def run_level(url, page_titles, sessions, duration, think_time, seed=0):
+    """Run ``sessions`` concurrent sessions for ``duration`` seconds and return per-rerun records."""
+    started = time.perf_counter()
+    results = await asyncio.gather(
+        *(_run_session(url, page_titles, duration, think_time, seed + i) for i in range(sessions)),
+        return_exceptions=True,
+    )
+    elapsed = time.perf_counter() - started
+    records = []
+    for result in results:
+        if isinstance(result, Exception):
+            records.append({"Action": "session failed", "Latency (s)": np.nan, "Errors": 1, "Error": repr(result)})
+        else:
+            records.extend(result)
+    return pd.DataFrame(records), elapsed
+
+
+def summarize(records, elapsed, sessions):
+    """One row of throughput, latency percentiles and error counts for a concurrency level."""
+    latency = records["Latency (s)"].dropna()
+    return {
+        "Sessions": sessions,
+        "Reruns": len(latency),
+        "Throughput (reruns/s)": len(latency) / elapsed if elapsed else 0.0,
+        "p50 (s)": latency.quantile(0.5),
+        "p95 (s)": latency.quantile(0.95),
+        "p99 (s)": latency.quantile(0.99),
+        "Max (s)": latency.max(),
+        "Errors": int(records["Errors"].sum()),
+    }
+
+
+def run_load_test(session_levels, duration=60, think_time=2.0, port=None):
+    """Run each concurrency level against a fresh local server.
+
+    Returns ``(summary, per_action, resources)`` DataFrames.
+    """
+    page_titles = read_page_titles()
+    port = port or _free_port()
+    workdir = tempfile.mkdtemp(prefix="llm_guide_loadtest_")
+    server = start_server(port, workdir)
+    monitor = ResourceMonitor(server.pid)
+    monitor.start()
+    url = f"ws://127.0.0.1:{port}/_stcore/stream"
+    summary, per_action = [], []
+    try:
+        for sessions in session_levels:
+            monitor.label = sessions
+            records, elapsed = asyncio.run(run_level(url, page_titles, sessions, duration, think_time))
+            summary.append(summarize(records, elapsed, sessions))
+            by_action = records.groupby("Action")["Latency (s)"].describe(percentiles=[0.5, 0.95, 0.99])
+            per_action.append(by_action.assign(Sessions=sessions).reset_index())
+            for error in records["Error"].dropna().unique()[:5]:
+                print(f"     error: {error}", flush=True)
+            print(f"{sessions:>4} sessions: p95 {summary[-1]['p95 (s)']:.3f}s, "
+                  f"{summary[-1]['Throughput (reruns/s)']:.1f} reruns/s", flush=True)
+    finally:
+        monitor.stop()
+        server.terminate()
+        server.wait(timeout=10)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    resources = pd.DataFrame(monitor.samples, columns=["Elapsed (s)", "Sessions", "RSS (MB)", "CPU %"])
+    summary = pd.DataFrame(summary).set_index("Sessions")
+    if not resources.empty:
+        usage = resources.groupby("Sessions").agg(**{"Peak RSS (MB)": ("RSS (MB)", "max"),
+                                                     "Mean CPU %": ("CPU %", "mean")})
+        summary = summary.join(usage)
+    return summary, pd.concat(per_action, ignore_index=True), resources
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sessions", default="1,5,10", help="Comma-separated concurrency levels (default: 1,5,10)")
+    parser.add_argument("--duration", type=float, default=60, help="Seconds to run each level (default: 60)")
+    parser.add_argument("--think-time", type=float, default=2.0,
+                        help="Mean seconds a user pauses between actions; 0 for back-to-back reruns (default: 2)")
+    parser.add_argument("--port", type=int, help="Port for the test server (default: a free port)")
+    parser.add_argument("--out", help="Directory to write summary.csv, actions.csv and resources.csv")
+    args = parser.parse_args()
+
+    levels = [int(n) for n in args.sessions.split(",") if n.strip()]
+    summary, per_action, resources = run_load_test(levels, args.duration, args.think_time, args.port)
+    with pd.option_context("display.width", 160, "display.max_columns", 20, "display.float_format", "{:.3f}".format):
+        print("\n" + summary.to_string())
+        print("\nLatency by action:\n" + per_action.to_string(index=False))
+    if args.out:
+        os.makedirs(args.out, exist_ok=True)
+        summary.to_csv(os.path.join(args.out, "summary.csv"))
+        per_action.to_csv(os.path.join(args.out, "actions.csv"), index=False)
+        resources.to_csv(os.path.join(args.out, "resources.csv"), index=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Redact personal data from feedback before it is shown or exported.
+
+Masking runs on whole columns with pandas string methods and precompiled
+patterns:
+
+* ``Name``: reduced to initials ("Jane Doe" -> "J. D.").
+* ``Email``: local part hidden, domain kept ("jane@x.com" -> "j***@x.com").
+* ``Feedback``: emails, phone numbers, the submitter's own name and
+  self-introductions ("my name is ...") replaced with placeholders.
+
+``PiiMasker`` caches masked rows by a hash of their raw values, so a page
+view only masks rows it has not seen before.
+"""
+import re
+import threading
+from functools import lru_cache
+
+import pandas as pd
+
+MASKED_COLUMNS = ["Name", "Email", "Feedback"]
+MAX_CACHED_ROWS = 100_000
+MIN_PHONE_DIGITS = 9
+
+EMAIL_RE = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
+EMAIL_LOCAL_RE = re.compile(r"^([A-Za-z0-9._%+-])[A-Za-z0-9._%+-]*@")
+PHONE_RE = re.compile(r"(?<![\w+])(?:\+\d{1,3}[\s.-]?)?(?:\(\d{1,4}\)[\s.-]?)?\d{2,4}(?:[\s.-]?\d{2,4}){1,4}(?!\w)")
+# Lead-ins match any case; the name itself must be capitalised so "I am happy" is left alone
+INTRO_RE = re.compile(r"\b((?i:my name is|i am|i'm|this is|name:)\s+)([A-Z][a-z]+(?:\s+[A-Z][a-z]+)?)")
+INITIALS_RE = re.compile(r"(\w)[\w'-]*")
+
+
+def _phone(match):
+    # Dates, versions and prices also look like digit groups; real numbers are longer
+    text = match.group(0)
+    return "[phone]" if sum(c.isdigit() for c in text) >= MIN_PHONE_DIGITS else text
+
+
+@lru_cache(maxsize=4096)
+def _name_pattern(name):
+    parts = [re.escape(p) for p in re.findall(r"[^\W\d_]{2,}", name)]
+    return re.compile(r"\b(?:" + "|".join(parts) + r")\b", re.IGNORECASE) if parts else None
+
+
+def _replace_where(text, mask, pattern, repl):
+    # A cheap substring test first, so the full pattern only runs on rows that could match
+    text = text.copy()
+    text[mask] = text[mask].str.replace(pattern, repl, regex=True)
+    return text
+
+
+def mask_text(text):
+    """Emails, phone numbers and self-introductions in free text."""
+    text = _replace_where(text, text.str.contains("@", regex=False), EMAIL_RE, "[email]")
+    text = _replace_where(text, text.str.contains(r"\d{2}", regex=True), PHONE_RE, _phone)
+    return text.str.replace(INTRO_RE, r"\1[name]", regex=True)
+
+
+def mask_frame(frame):
+    """Masked copy of whichever of ``MASKED_COLUMNS`` are in ``frame``."""
+    out = frame.copy()
+    if "Feedback" in out:
+        feedback = mask_text(out["Feedback"].fillna("").astype(str))
+        if "Name" in out:
+            # One compiled pattern per distinct submitter, applied to all of their comments at once
+            for name, rows in out.groupby(out["Name"].fillna("").astype(str)).groups.items():
+                pattern = _name_pattern(name.strip())
+                if pattern is not None:
+                    feedback.loc[rows] = feedback.loc[rows].str.replace(pattern, "[name]", regex=True)
+        out["Feedback"] = feedback
+    if "Email" in out:
+        out["Email"] = out["Email"].fillna("").astype(str).str.strip().str.replace(EMAIL_LOCAL_RE, r"\1***@",
+                                                                                  regex=True)
+    if "Name" in out:
+        out["Name"] = out["Name"].fillna("").astype(str).str.strip().str.replace(INITIALS_RE, r"\1.", regex=True)
+    return out
+
+
+class PiiMasker:
+    """``mask_frame`` with a per-row cache keyed by a hash of the raw values."""
+
+    def __init__(self, max_rows=MAX_CACHED_ROWS):
+        self.max_rows = max_rows
+        self._cache = {}  # (columns, row hash) -> masked values
+        self._lock = threading.Lock()
+
+    def mask(self, frame, keep=None):
+        """Masked copy of ``frame``, reduced to the ``keep`` columns (all by default) after masking.
+
+        Read ``Name`` even when it is not exported and pass the wanted columns
+        as ``keep``, so submitters' own names are still found in ``Feedback``.
+        """
+        columns = tuple(c for c in MASKED_COLUMNS if c in frame)
+        if frame.empty or not columns:
+            return frame[keep].copy() if keep is not None else frame.copy()
+        hashes = pd.util.hash_pandas_object(frame[list(columns)].astype("string"), index=False).to_numpy()
+        keys = [(columns, h) for h in hashes]
+        with self._lock:
+            found = {key: self._cache[key] for key in keys if key in self._cache}
+        fresh = [i for i, key in enumerate(keys) if key not in found]
+        if fresh:
+            masked = mask_frame(frame.iloc[fresh][list(columns)])
+            found.update(zip((keys[i] for i in fresh), masked.itertuples(index=False, name=None)))
+            with self._lock:
+                if len(self._cache) + len(fresh) > self.max_rows:
+                    self._cache.clear()
+                self._cache.update((keys[i], found[keys[i]]) for i in fresh)
+        rows = [found[key] for key in keys]
+        out = frame.copy()
+        out[list(columns)] = pd.DataFrame(rows, index=frame.index, columns=list(columns))
+        return out[keep] if keep is not None else out
+
+    def cached_rows(self):
+        return len(self._cache)
@@ -0,0 +1,218 @@
+"""Rule-based prompt compression with before/after token counts.
+
+Each pass targets one source of waste called out in "Optimization
+Strategies": redundant whitespace, repeated boilerplate lines, duplicated
+few-shot examples and wordy instruction phrasing.
+
+Only instruction text is rewritten. Fenced code, few-shot examples, ``>``
+quoted lines and quoted strings are user content and pass through byte for
+byte.
+"""
+import re
+from collections import Counter
+
+import pandas as pd
+
+import token_costs
+
+# Wordy phrasing -> shorter equivalent (matched case-insensitively). Lead-ins are only
+# dropped when what follows still reads as an instruction on its own.
+VERBOSE_PHRASES = [
+    (r"\b(could|can|would) you (please |kindly )+", ""),
+    (r"\bi would like you to\b", ""),
+    (r"\bi want you to\b", ""),
+    (r"\bplease (make sure|ensure) (that )?", "ensure "),
+    (r"\bmake sure (that )?", "ensure "),
+    (r"\bit is (very |really )?important (that you|to note that)\b", ""),
+    (r"\bplease note that\b", ""),
+    (r"\bin order to\b", "to"),
+    (r"\bdue to the fact that\b", "because"),
+    (r"\bat this point in time\b", "now"),
+    (r"\bfor the purpose of\b", "for"),
+    (r"\bin the event that\b", "if"),
+    (r"\ba (large|great) number of\b", "many"),
+    (r"\bwith (regard|respect) to\b", "about"),
+    (r"\bin a (clear and concise|concise and clear) (manner|way)\b", "concisely"),
+    (r"\bas an ai language model,?", ""),
+    # Only a thank-you that is a whole sentence; "thank you for ..." is left alone
+    (r"(?:^|(?<=[.!?] ))(thank you|thanks)( (so|very) much)?( in advance)?[.!]+(?=\s|$)", ""),
+]
+# Deletions also take the spaces after them, and capture the next letter for re-capitalising
+_VERBOSE = [(re.compile(p + (r"[ \t]*(?P<next>[a-z]?)" if not r else r"(?P<next>)"), re.I | re.M), r)
+            for p, r in VERBOSE_PHRASES]
+# Quoted strings and inline code inside an instruction line are user content
+_QUOTED = re.compile(r'("[^"\n]*"|\u201c[^\u201d\n]*\u201d|`[^`\n]*`)')
+_INNER_SPACE = re.compile(r"(?<=\S)[ \t]{2,}")
+
+# A header that always opens a new few-shot example
+_EXAMPLE_HEADER = re.compile(r"^\s*(#+\s*)?example\s*\d*\s*:", re.I)
+# The first turn of an example; opens one unless it follows a header that has no turn yet
+_EXAMPLE_TURN = re.compile(r"^\s*(q|question|input|user|en)\s*:", re.I)
+# Any "Label:" line (Output:, A:, Assistant:, FR: ...) continues the current example
+_LABELLED = re.compile(r"^\s*[A-Za-z][\w ]{0,20}:")
+_FENCE = re.compile(r"^\s*(```|~~~)")
+_QUOTE_LINE = re.compile(r"^\s*>")
+
+
+def _normalize_key(text):
+    return re.sub(r"\W+", " ", text.lower()).strip()
+
+
+def _outside_quotes(text, rewrite):
+    parts = _QUOTED.split(text)
+    parts[::2] = [rewrite(part) for part in parts[::2]]
+    return "".join(parts)
+
+
+def collapse_whitespace(text):
+    """Collapse space runs and repeated blank lines in instruction text.
+
+    Leading indentation is kept. Code fences, examples and quoted lines are
+    returned exactly as written.
+    """
+    kept = []
+    for kind, lines in _blocks(text):
+        for line in lines:
+            if kind == "instruction":
+                line = _outside_quotes(line, lambda part: _INNER_SPACE.sub(" ", part)).rstrip()
+                if not line and kept and not kept[-1]:
+                    continue
+            kept.append(line)
+    return "\n".join(kept).strip("\n")
+
+
+def _shorten(match, replacement):
+    follow = match.group("next")
+    before = match.string[:match.start()].rstrip(" \t")
+    # A lead-in that opened a sentence hands its capital letter on
+    if match.group(0)[:1].isupper() and (not before or before[-1] in ".!?\n"):
+        if replacement:
+            replacement = replacement[0].upper() + replacement[1:]
+        else:
+            follow = follow.upper()
+    return replacement + follow
+
+
+def _shorten_part(text):
+    for pattern, replacement in _VERBOSE:
+        text = pattern.sub(lambda m, r=replacement: _shorten(m, r), text)
+    return _INNER_SPACE.sub(" ", text)
+
+
+def shorten_phrasing(text):
+    """Replace wordy phrasing in instruction text; code, examples and quoted strings are untouched."""
+    kept = []
+    for kind, lines in _blocks(text):
+        if kind == "instruction":
+            lines = _outside_quotes("\n".join(lines), _shorten_part).split("\n")
+        kept.extend(lines)
+    return "\n".join(kept)
+
+
+def _blocks(text):
+    """Split text into ``(kind, lines)`` blocks.
+
+    ``kind`` is ``"code"`` for a fenced code block, ``"quote"`` for ``>``
+    quoted lines, ``"example"`` for a few-shot example and
+    ``"instruction"`` for everything else. An example starts at an
+    ``Example N:`` header, or at a first-turn line (``Input:``, ``Q:`` ...)
+    that is not the first turn under a header. It runs until a blank line
+    or the next example. An unlabelled line that also appears elsewhere in
+    the prompt is boilerplate, so it ends the example instead of joining it.
+    """
+    counts = Counter(_normalize_key(line) for line in text.split("\n"))
+    blocks, awaiting_turn, fence = [], False, None
+    for line in text.split("\n"):
+        if fence:
+            blocks[-1][1].append(line)
+            if line.strip().startswith(fence):
+                fence = None
+            continue
+        marker = _FENCE.match(line)
+        if marker or _QUOTE_LINE.match(line):
+            kind = "code" if marker else "quote"
+            fence = marker.group(1) if marker else None
+            if kind == "code" or not blocks or blocks[-1][0] != "quote":
+                blocks.append((kind, []))
+            blocks[-1][1].append(line)
+            awaiting_turn = False
+            continue
+        is_header = bool(_EXAMPLE_HEADER.match(line))
+        is_turn = bool(_EXAMPLE_TURN.match(line))
+        in_example = blocks and blocks[-1][0] == "example" and line.strip()
+        if in_example and not (is_header or is_turn or _LABELLED.match(line)):
+            # Unlabelled lines continue a multi-line answer unless they repeat elsewhere
+            in_example = counts[_normalize_key(line)] < 2
+        if is_header or (is_turn and not awaiting_turn):
+            blocks.append(("example", []))
+            awaiting_turn = is_header
+        elif not blocks or (blocks[-1][0] != "instruction" and not in_example):
+            blocks.append(("instruction", []))
+            awaiting_turn = False
+        elif is_turn:
+            awaiting_turn = False
+        blocks[-1][1].append(line)
+    return blocks
+
+
+def drop_repeated_lines(text):
+    """Remove instruction lines that repeat an earlier line (ignoring case and punctuation).
+
+    Examples, code and quoted lines are left alone; ``dedupe_examples`` handles examples.
+    """
+    seen, kept = set(), []
+    for kind, lines in _blocks(text):
+        for line in lines:
+            key = _normalize_key(line)
+            if kind == "instruction" and key and key in seen:
+                continue
+            if kind in ("instruction", "example"):
+                seen.add(key)
+            kept.append(line)
+    return "\n".join(kept)
+
+
+def dedupe_examples(text, max_examples=None):
+    """Drop duplicated few-shot examples and optionally keep only the first ``max_examples``."""
+    seen, kept, examples = set(), [], 0
+    for kind, lines in _blocks(text):
+        if kind == "example":
+            # Compare bodies, so "Example 1:" and "Example 2:" with the same content count as duplicates
+            body = lines[1:] if _EXAMPLE_HEADER.match(lines[0]) else lines
+            key = _normalize_key(" ".join(body))
+            if key in seen or (max_examples is not None and examples >= max_examples):
+                continue
+            seen.add(key)
+            examples += 1
+        kept.extend(lines)
+    return "\n".join(kept)
+
+
+def compress_prompt(prompt, max_examples=None):
+    """Compress one prompt and report token counts before and after."""
+    original = str(prompt or "")
+    text = collapse_whitespace(original)
+    text = dedupe_examples(text, max_examples=max_examples)
+    text = drop_repeated_lines(text)
+    text = collapse_whitespace(shorten_phrasing(text))
+    before, after = token_costs.count_tokens_many([original, text])
+    return {
+        "Original": original,
+        "Compressed": text,
+        "Tokens before": before,
+        "Tokens after": after,
+        "Tokens saved": before - after,
+    }
+
+
+def compress_prompts(prompts, max_examples=None):
+    """Compress a batch of prompts into a report DataFrame."""
+    rows = [compress_prompt(p, max_examples=max_examples) for p in prompts]
+    report = pd.DataFrame(rows, columns=["Original", "Compressed", "Tokens before", "Tokens after", "Tokens saved"])
+    report["Saved %"] = (report["Tokens saved"] / report["Tokens before"].clip(lower=1) * 100).round(1)
+    return report
+
+
+def monthly_savings(tokens_saved, requests_per_day, model):
+    """Projected monthly savings for ``tokens_saved`` fewer input tokens on every request."""
+    return token_costs.monthly_cost(tokens_saved, requests_per_day, token_costs.model_price(model))
@@ -0,0 +1,96 @@
+"""Rule-based prompt linter built on the guide's prompt engineering advice.
+
+Each rule mirrors a point from "Prompt Engineering Best Practices" or
+"Common Pitfalls". ``lint_prompt`` scores a single prompt; ``lint_prompts``
+spreads a whole prompt library across a process pool.
+"""
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+# Below this many prompts the pool start-up costs more than it saves
+PARALLEL_THRESHOLD = 2000
+
+_ROLE = re.compile(r"\b(you are|you're|act as|acting as|your role|as an? [a-z]+ (expert|specialist|assistant|"
+                   r"marketer|recruiter|writer|engineer|manager|analyst|consultant|copywriter))\b", re.I)
+_DELIMITER = re.compile(r'("""|\'\'\'|```|^-{3,}|^#{2,}\s|<[a-z_]+>|\[[A-Z_ ]+\]|^\s*(text|input|email|content):)',
+                        re.I | re.M)
+_FORMAT = re.compile(r"\b(\d+|one|two|three|four|five|six|seven|eight|nine|ten)[- ](bullet|bullets|sentence|sentences|"
+                     r"words?|lines?|paragraphs?|points?|items?|tweets?|options?|ideas?)\b|\b(json|csv|table|markdown|"
+                     r"bullet(ed)? list|numbered list|format|tone|under \d+ (words|characters)|word limit|headline)\b",
+                     re.I)
+_VAGUE = re.compile(r"\b(something|stuff|things?|anything|whatever|etc\.?|some kind of|a bit|nice|good|better|"
+                    r"interesting|about (our|my|the) (product|app|company|startup))\b", re.I)
+_CONTEXT = re.compile(r"\b(for (our|my|a|an|the)|audience|customers?|users?|readers?|background|context|because|"
+                      r"targeting|aimed at|who|our (product|app|company|startup|brand))\b", re.I)
+_TASK = re.compile(r"\b(write|summari[sz]e|translate|list|explain|describe|generate|create|draft|rewrite|analy[sz]e|"
+                   r"compare|classify|extract|suggest|review|design|plan|calculate|answer)\b", re.I)
+
+RULES = {
+    "Role": (20, "Set a role, e.g. \"You are a SaaS marketer.\""),
+    "Delimiters": (15, "Separate instructions from content with \"\"\" or --- so the model knows what is input."),
+    "Output format": (20, "Define the output: number of bullets or sentences, length, tone or structure."),
+    "Clarity": (20, "Replace vague words (\"something\", \"stuff\", \"about our product\") with specifics."),
+    "Focused": (15, "Don't cram several tasks into one prompt; split them or run them step by step."),
+    "Context": (10, "Give background: who the audience is, what the product does, why you need it."),
+}
+
+REPORT_COLUMNS = ["Prompt", "Score", "Words"] + list(RULES) + ["Suggestions"]
+
+
+def lint_prompt(prompt):
+    """Score one prompt out of 100 and explain which rules it misses."""
+    text = str(prompt or "").strip()
+    words = len(text.split())
+    tasks = {m.lower() for m in _TASK.findall(text)}
+    vague = sorted({m[0].lower() if isinstance(m, tuple) else m.lower() for m in _VAGUE.findall(text)})
+
+    checks = {
+        "Role": bool(_ROLE.search(text)),
+        # Short one-liners have nothing to delimit
+        "Delimiters": words < 40 or bool(_DELIMITER.search(text)),
+        "Output format": bool(_FORMAT.search(text)),
+        "Clarity": words >= 6 and not vague,
+        "Focused": len(tasks) <= 3 and text.count("?") <= 2,
+        "Context": words >= 12 and bool(_CONTEXT.search(text)),
+    }
+
+    suggestions = []
+    for rule, passed in checks.items():
+        if passed:
+            continue
+        hint = RULES[rule][1]
+        if rule == "Clarity" and vague:
+            hint += f" Found: {', '.join(vague)}."
+        elif rule == "Clarity":
+            hint = "The prompt is very short; say what you want, for whom and in what form."
+        elif rule == "Focused":
+            hint += f" Found {len(tasks)} different tasks: {', '.join(sorted(tasks))}."
+        suggestions.append(f"{rule}: {hint}")
+
+    return {
+        "Prompt": text,
+        "Score": sum(RULES[rule][0] for rule, passed in checks.items() if passed),
+        "Words": words,
+        **checks,
+        "Suggestions": "\n".join(suggestions),
+    }
+
+
+def _lint_chunk(prompts):
+    return [lint_prompt(p) for p in prompts]
+
+
+def lint_prompts(prompts, workers=None, chunk_size=500):
+    """Lint many prompts, fanning out over a process pool for large libraries."""
+    prompts = [str(p) for p in prompts]
+    if len(prompts) < PARALLEL_THRESHOLD:
+        rows = _lint_chunk(prompts)
+    else:
+        chunks = [prompts[i:i + chunk_size] for i in range(0, len(prompts), chunk_size)]
+        workers = workers or min(len(chunks), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            rows = [row for chunk in pool.map(_lint_chunk, chunks) for row in chunk]
+    return pd.DataFrame(rows, columns=REPORT_COLUMNS)
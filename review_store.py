@@ -0,0 +1,166 @@
+"""Indexed SQLite store for Ethical Review Template submissions."""
+import csv
+import io
+import json
+import sqlite3
+import tempfile
+import threading
+from datetime import datetime
+
+REVIEWS_DB_PATH = "ethical_reviews.db"
+
+REVIEW_FIELDS = [
+    "submitted_at", "feature_name", "purpose", "risks",
+    "bias_tested", "human_review", "disclosure", "risk_level",
+]
+
+RISK_LEVELS = ["Low", "Medium", "High"]
+# Exports larger than this are spooled to a temp file on disk while they are written
+SPOOL_MAX_BYTES = 8 * 1024 * 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS reviews (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    submitted_at TEXT NOT NULL,
+    feature_name TEXT NOT NULL,
+    feature_key TEXT NOT NULL,
+    purpose TEXT,
+    risks TEXT,
+    bias_tested TEXT,
+    human_review TEXT,
+    disclosure TEXT,
+    risk_level TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_reviews_feature ON reviews (feature_key, submitted_at);
+CREATE INDEX IF NOT EXISTS idx_reviews_risk ON reviews (risk_level, submitted_at);
+CREATE INDEX IF NOT EXISTS idx_reviews_submitted ON reviews (submitted_at);
+"""
+
+_lock = threading.Lock()
+_initialised = set()
+
+
+def _connect(path):
+    conn = sqlite3.connect(path, timeout=10)
+    conn.row_factory = sqlite3.Row
+    if path not in _initialised:
+        with _lock:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            _initialised.add(path)
+    return conn
+
+
+def save_review(review, path=REVIEWS_DB_PATH):
+    """Insert one review and return its id."""
+    row = {field: review.get(field) for field in REVIEW_FIELDS}
+    row["submitted_at"] = row["submitted_at"] or datetime.now().isoformat(timespec="seconds")
+    row["feature_name"] = (row["feature_name"] or "").strip()
+    row["feature_key"] = row["feature_name"].lower()
+    conn = _connect(path)
+    try:
+        with conn:
+            cur = conn.execute(
+                f"INSERT INTO reviews ({', '.join(row)}) VALUES ({', '.join('?' * len(row))})",
+                list(row.values()),
+            )
+        return cur.lastrowid
+    finally:
+        conn.close()
+
+
+def _where(feature=None, risk_levels=None, start=None, end=None):
+    clauses, params = [], []
+    if feature:
+        # Prefix match keeps the feature_key index usable
+        clauses.append("feature_key >= ? AND feature_key < ?")
+        key = feature.strip().lower()
+        params += [key, key + "\uffff"]
+    if risk_levels:
+        clauses.append(f"risk_level IN ({', '.join('?' * len(risk_levels))})")
+        params += list(risk_levels)
+    if start:
+        clauses.append("submitted_at >= ?")
+        params.append(start.isoformat())
+    if end:
+        # End date is inclusive: every timestamp on that day sorts below this bound
+        clauses.append("submitted_at < ?")
+        params.append(f"{end.isoformat()}\uffff")
+    return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+
+def count_reviews(path=REVIEWS_DB_PATH, **filters):
+    """Count the reviews matching ``feature``, ``risk_levels``, ``start`` and ``end``."""
+    where, params = _where(**filters)
+    conn = _connect(path)
+    try:
+        return conn.execute(f"SELECT COUNT(*) FROM reviews{where}", params).fetchone()[0]
+    finally:
+        conn.close()
+
+
+def list_reviews(page=1, page_size=25, path=REVIEWS_DB_PATH, **filters):
+    """Return one page of matching reviews, newest first, as a list of dicts."""
+    where, params = _where(**filters)
+    conn = _connect(path)
+    try:
+        rows = conn.execute(
+            f"SELECT id, {', '.join(REVIEW_FIELDS)} FROM reviews{where} "
+            "ORDER BY submitted_at DESC, id DESC LIMIT ? OFFSET ?",
+            params + [page_size, (max(page, 1) - 1) * page_size],
+        ).fetchall()
+        return [dict(r) for r in rows]
+    finally:
+        conn.close()
+
+
+def iter_reviews(path=REVIEWS_DB_PATH, batch_size=500, **filters):
+    """Yield every matching review without materialising the full result set."""
+    where, params = _where(**filters)
+    conn = _connect(path)
+    try:
+        cur = conn.execute(
+            f"SELECT id, {', '.join(REVIEW_FIELDS)} FROM reviews{where} ORDER BY submitted_at, id",
+            params,
+        )
+        while True:
+            rows = cur.fetchmany(batch_size)
+            if not rows:
+                break
+            for r in rows:
+                yield dict(r)
+    finally:
+        conn.close()
+
+
+def export_jsonl(path=REVIEWS_DB_PATH, **filters):
+    """Stream matching reviews as JSON Lines, one encoded line at a time."""
+    for review in iter_reviews(path, **filters):
+        yield (json.dumps(review, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def export_csv(path=REVIEWS_DB_PATH, **filters):
+    """Stream matching reviews as CSV, header first."""
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=["id"] + REVIEW_FIELDS)
+    writer.writeheader()
+    for review in iter_reviews(path, **filters):
+        writer.writerow(review)
+        if buf.tell() > 64 * 1024:
+            yield buf.getvalue().encode("utf-8")
+            buf.seek(0)
+            buf.truncate()
+    yield buf.getvalue().encode("utf-8")
+
+
+def spool_export(chunks, max_size=SPOOL_MAX_BYTES):
+    """Write export chunks to a temp file that moves to disk past ``max_size``; returns its bytes.
+
+    Download buttons need the finished file as bytes, so this bounds the
+    copy being built rather than the result.
+    """
+    with tempfile.SpooledTemporaryFile(max_size=max_size) as f:
+        for chunk in chunks:
+            f.write(chunk)
+        f.seek(0)
+        return f.read()
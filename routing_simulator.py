@@ -0,0 +1,171 @@
+"""Replay a request log through model-tiering policies.
+
+A log is reduced to a few numeric feature columns once (``prepare_log``).
+Each policy then maps every request to a tier index with a single vectorized
+NumPy call, and cost/latency are aggregated with ``bincount``, so comparing
+policies over a million-row log takes seconds.
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+import token_costs
+
+DEFAULT_TIERS = pd.DataFrame([
+    {"Tier": "GPT-3.5", "Price per 1K tokens": token_costs.MODEL_PRICES_PER_1K["GPT-3.5"],
+     "Base latency (s)": 0.4, "Seconds per output token": 0.012},
+    {"Tier": "GPT-4", "Price per 1K tokens": token_costs.MODEL_PRICES_PER_1K["GPT-4"],
+     "Base latency (s)": 0.9, "Seconds per output token": 0.045},
+])
+
+DEFAULT_KEYWORDS = ["analy", "explain why", "step by step", "reason", "debug", "code", "legal",
+                    "contract", "strategy", "compare", "evaluate", "plan"]
+
+_QUESTION_OR_LIST = re.compile(r"\?|\n\s*(?:\d+[.)]|[-*])\s")
+# Text spellings of a flag column (matched case-insensitively); blanks count as False
+_FLAG_VALUES = {"true": True, "t": True, "yes": True, "y": True, "1": True, "1.0": True,
+                "false": False, "f": False, "no": False, "n": False, "0": False, "0.0": False, "": False}
+
+
+def _keyword_pattern(keywords):
+    return "|".join(re.escape(k.strip().lower()) for k in keywords if k.strip())
+
+
+def parse_flags(values):
+    """Booleans from a log column of bools, numbers or text such as "True"/"false"/"1"/"0".
+
+    ``astype(bool)`` would read any non-empty string, "False" and "0" included, as True.
+    """
+    if pd.api.types.is_bool_dtype(values):
+        return values.fillna(False).astype(bool)
+    if pd.api.types.is_numeric_dtype(values):
+        return values.fillna(0).astype(bool)
+    text = values.fillna("").astype(str).str.strip().str.lower()
+    flags = text.map(_FLAG_VALUES)
+    unknown = text[flags.isna()].unique()
+    if len(unknown):
+        raise ValueError(f"Can't read keyword_hit values as true/false: {', '.join(map(repr, unknown[:5]))}")
+    return flags.astype(bool)
+
+
+def prepare_log(log, keywords=DEFAULT_KEYWORDS):
+    """Reduce a raw log to the feature columns the policies route on.
+
+    Accepts ``prompt`` text and/or ``input_tokens``/``output_tokens`` columns.
+    Missing token counts are estimated at ~4 characters per token.
+    """
+    out = pd.DataFrame(index=log.index)
+    prompt = log["prompt"].fillna("").astype(str) if "prompt" in log else None
+
+    if "input_tokens" in log:
+        out["input_tokens"] = pd.to_numeric(log["input_tokens"], errors="coerce").fillna(0).astype("int32")
+    elif prompt is not None:
+        out["input_tokens"] = (prompt.str.len() // 4 + 1).astype("int32")
+    else:
+        raise ValueError("Log needs a 'prompt' or 'input_tokens' column.")
+
+    if "output_tokens" in log:
+        out["output_tokens"] = pd.to_numeric(log["output_tokens"], errors="coerce").fillna(0).astype("int32")
+    else:
+        # Without observed outputs, assume replies about half the prompt length
+        out["output_tokens"] = (out["input_tokens"] // 2 + 20).astype("int32")
+
+    if "keyword_hit" in log:
+        out["keyword_hit"] = parse_flags(log["keyword_hit"])
+    elif prompt is not None and _keyword_pattern(keywords):
+        out["keyword_hit"] = prompt.str.lower().str.contains(_keyword_pattern(keywords), regex=True)
+    else:
+        out["keyword_hit"] = False
+
+    if "complexity" in log:
+        out["complexity"] = log["complexity"].astype("float32")
+    else:
+        structure = prompt.str.count(_QUESTION_OR_LIST).to_numpy() if prompt is not None else 0
+        out["complexity"] = complexity_score(out["input_tokens"].to_numpy(), out["keyword_hit"].to_numpy(), structure)
+    return out
+
+
+def complexity_score(input_tokens, keyword_hit, structure=0):
+    """Blend length, reasoning keywords and multi-part structure into a 0-1 score."""
+    length = np.clip(np.log1p(input_tokens) / np.log1p(4000), 0, 1)
+    parts = np.clip(np.asarray(structure, dtype="float32") / 5, 0, 1)
+    return (0.5 * length + 0.3 * np.asarray(keyword_hit, dtype="float32") + 0.2 * parts).astype("float32")
+
+
+def synthetic_log(rows=100_000, seed=0):
+    """A feature-level request log with a realistic long-tailed length mix."""
+    rng = np.random.default_rng(seed)
+    input_tokens = np.clip(rng.lognormal(5.5, 0.9, rows), 10, 8000).astype("int32")
+    output_tokens = np.clip(rng.lognormal(5.0, 0.7, rows), 5, 2000).astype("int32")
+    keyword_hit = rng.random(rows) < 0.2
+    structure = rng.poisson(0.8, rows)
+    return pd.DataFrame({
+        "input_tokens": input_tokens,
+        "output_tokens": output_tokens,
+        "keyword_hit": keyword_hit,
+        "complexity": complexity_score(input_tokens, keyword_hit, structure),
+    })
+
+
+def route(features, policy, n_tiers):
+    """Return the tier index chosen for every request under ``policy``.
+
+    Policies are dicts:
+    ``{"kind": "fixed", "tier": i}``,
+    ``{"kind": "length", "thresholds": [t1, t2, ...]}`` (input tokens),
+    ``{"kind": "complexity", "thresholds": [...]}`` (0-1 score), or
+    ``{"kind": "keyword"}`` (keyword hits go to the top tier).
+    Threshold policies send values at or above the k-th threshold to tier k.
+    """
+    kind = policy["kind"]
+    if kind == "fixed":
+        tiers = np.full(len(features), policy["tier"], dtype=np.int8)
+    elif kind == "length":
+        tiers = np.digitize(features["input_tokens"].to_numpy(), policy["thresholds"])
+    elif kind == "complexity":
+        tiers = np.digitize(features["complexity"].to_numpy(), policy["thresholds"])
+    elif kind == "keyword":
+        tiers = np.where(features["keyword_hit"].to_numpy(), n_tiers - 1, 0)
+    else:
+        raise ValueError(f"Unknown policy kind: {kind}")
+    return np.clip(tiers, 0, n_tiers - 1).astype(np.int8)
+
+
+def simulate(features, policy, tiers=DEFAULT_TIERS):
+    """Cost, latency and per-tier share of one policy over the whole log."""
+    n_tiers = len(tiers)
+    idx = route(features, policy, n_tiers)
+    tokens = (features["input_tokens"].to_numpy() + features["output_tokens"].to_numpy()).astype(np.float64)
+    price = tiers["Price per 1K tokens"].to_numpy(dtype=np.float64)
+    base = tiers["Base latency (s)"].to_numpy(dtype=np.float64)
+    per_token = tiers["Seconds per output token"].to_numpy(dtype=np.float64)
+
+    cost = tokens / 1000 * price[idx]
+    latency = base[idx] + features["output_tokens"].to_numpy() * per_token[idx]
+
+    requests_per_tier = np.bincount(idx, minlength=n_tiers)
+    per_tier = pd.DataFrame({
+        "Tier": tiers["Tier"].to_numpy(),
+        "Requests": requests_per_tier,
+        "Share %": requests_per_tier / max(len(idx), 1) * 100,
+        "Cost ($)": np.bincount(idx, weights=cost, minlength=n_tiers),
+        "Mean latency (s)": np.bincount(idx, weights=latency, minlength=n_tiers) / np.maximum(requests_per_tier, 1),
+    })
+    summary = {
+        "Total cost ($)": cost.sum(),
+        "Cost per 1K requests ($)": cost.mean() * 1000 if len(cost) else 0.0,
+        "Mean latency (s)": latency.mean() if len(latency) else 0.0,
+        "p95 latency (s)": np.percentile(latency, 95) if len(latency) else 0.0,
+    }
+    return summary, per_tier
+
+
+def compare_policies(features, policies, tiers=DEFAULT_TIERS):
+    """Simulate each named policy and return one summary row per policy."""
+    rows = []
+    for name, policy in policies.items():
+        summary, per_tier = simulate(features, policy, tiers)
+        shares = {f"{t} share %": s for t, s in zip(per_tier["Tier"], per_tier["Share %"])}
+        rows.append({"Policy": name, **summary, **shares})
+    return pd.DataFrame(rows).set_index("Policy")
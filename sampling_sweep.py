@@ -0,0 +1,113 @@
+"""Temperature x top-p x seed sweeps with diversity and repetition metrics.
+
+Every grid point is submitted to the local ``InferenceWorker`` at once, so
+the worker batches them together rather than running them one by one.
+Metrics are computed on the returned token ids. All samples are padded
+into one matrix and every n-gram is packed into a single integer code, so
+the counts needed for distinct-n, repetition and self-BLEU come from a few
+numpy/pandas group-bys over the whole sweep, with no per-sample loops.
+
+* ``distinct-n``: unique n-grams / total n-grams across a setting's samples
+  (higher = more varied between samples).
+* ``repetition``: share of a sample's 2-grams that repeat within that sample.
+* ``self-BLEU``: BLEU-4 of each sample against the other samples at the
+  same setting (higher = samples look alike).
+"""
+import itertools
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_TEMPERATURES = (0.2, 0.5, 0.8, 1.0, 1.3)
+DEFAULT_TOP_PS = (0.5, 0.9, 1.0)
+DEFAULT_SEEDS = 4
+BLEU_ORDER = 4
+SETTING = ["temperature", "top_p"]
+METRICS = ["distinct-1", "distinct-2", "self-BLEU", "repetition", "mean length"]
+
+
+def sweep_requests(prompt, temperatures, top_ps, seeds, max_new_tokens):
+    return [{"prompt": prompt, "temperature": float(t), "top_p": float(p), "seed": int(s),
+             "max_new_tokens": int(max_new_tokens)}
+            for t, p, s in itertools.product(temperatures, top_ps, range(seeds))]
+
+
+def run_sweep(worker, prompt, temperatures=DEFAULT_TEMPERATURES, top_ps=DEFAULT_TOP_PS, seeds=DEFAULT_SEEDS,
+              max_new_tokens=48, timeout=300):
+    """One row per sample: the setting, seed, text and token ids."""
+    requests = sweep_requests(prompt, temperatures, top_ps, seeds, max_new_tokens)
+    results = worker.generate_many(requests, timeout=timeout)
+    return pd.DataFrame([{"temperature": r["temperature"], "top_p": r["top_p"], "seed": r["seed"],
+                          "text": out["text"], "ids": out["ids"], "tokens": out["tokens"]}
+                         for r, out in zip(requests, results)])
+
+
+def _ngram_codes(ids, n):
+    """``(samples, positions)`` int64 codes for every n-gram, and a mask of the ones inside each sample.
+
+    Codes are base-``vocab`` numbers; for very large vocabularies they wrap
+    around int64, which only risks a negligible number of collisions.
+    """
+    lengths = np.array([len(x) for x in ids], dtype=np.int64)
+    width = max(int(lengths.max(initial=0)), n)
+    inside = np.arange(width) < lengths[:, None]
+    matrix = np.zeros((len(ids), width), dtype=np.int64)
+    matrix[inside] = np.concatenate([np.asarray(x, dtype=np.int64) for x in ids] or [np.zeros(0, np.int64)])
+    base = int(matrix.max(initial=0)) + 1
+    positions = width - n + 1
+    codes = np.zeros((len(ids), positions), dtype=np.int64)
+    with np.errstate(over="ignore"):
+        for k in range(n):
+            codes = codes * base + matrix[:, k:k + positions]
+    return codes, np.arange(positions) < (lengths - n + 1)[:, None]
+
+
+def _counts(samples, n):
+    """Long table of (sample, setting, n-gram code, count in that sample)."""
+    codes, valid = _ngram_codes(samples["ids"].tolist(), n)
+    rows, cols = np.nonzero(valid)
+    grams = pd.DataFrame({"sample": rows, "code": codes[rows, cols]})
+    grams = grams.join(samples[SETTING].reset_index(drop=True), on="sample")
+    return grams.groupby(["sample", *SETTING, "code"], as_index=False).size().rename(columns={"size": "count"})
+
+
+def _self_bleu(samples):
+    """Per-sample BLEU-4 against the other samples at the same setting (add-one smoothed)."""
+    log_precision = np.zeros(len(samples))
+    for n in range(1, BLEU_ORDER + 1):
+        counts = _counts(samples, n)
+        # Clip each n-gram by its highest count in any *other* sample: the max, or the runner-up if this is the max
+        keys = [*SETTING, "code"]
+        ranked = counts.sort_values([*keys, "count"], ascending=[True] * len(keys) + [False])
+        rank = ranked.groupby(keys).cumcount()
+        top = ranked[rank == 0].set_index(keys)["count"].rename("first")
+        runner_up = ranked[rank == 1].set_index(keys)["count"].rename("second")
+        counts = counts.join(top, on=keys).join(runner_up, on=keys).fillna({"second": 0})
+        reference = np.where(counts["count"] == counts["first"], counts["second"], counts["first"])
+        counts["clipped"] = np.minimum(counts["count"], reference)
+        totals = counts.groupby("sample")[["clipped", "count"]].sum().reindex(range(len(samples)), fill_value=0)
+        smooth = 0 if n == 1 else 1
+        precision = (totals["clipped"] + smooth) / (totals["count"] + smooth).clip(lower=1)
+        log_precision += np.log(np.maximum(precision.to_numpy(), 1e-9)) / BLEU_ORDER
+
+    lengths = samples["tokens"].to_numpy(dtype=float)
+    group = samples.groupby(SETTING)["tokens"]
+    others = (group.transform("sum") - lengths) / (group.transform("size") - 1).clip(lower=1)
+    brevity = np.where(lengths < others, np.exp(1 - others / np.maximum(lengths, 1)), 1.0)
+    return pd.Series(brevity * np.exp(log_precision), index=samples.index)
+
+
+def sweep_metrics(samples):
+    """One row per (temperature, top_p) with the diversity and repetition metrics."""
+    samples = samples.reset_index(drop=True)
+    summary = samples.groupby(SETTING).agg(samples=("seed", "size"), **{"mean length": ("tokens", "mean")})
+    for n in (1, 2):
+        counts = _counts(samples, n)
+        per_setting = counts.groupby(SETTING).agg(unique=("code", "nunique"), total=("count", "sum"))
+        summary[f"distinct-{n}"] = per_setting["unique"] / per_setting["total"]
+        if n == 2:
+            repeats = (counts["count"] - 1).groupby(counts["sample"]).sum()
+            per_sample = (repeats / counts.groupby("sample")["count"].sum()).reindex(samples.index, fill_value=0)
+            summary["repetition"] = per_sample.groupby([samples[c] for c in SETTING]).mean()
+    summary["self-BLEU"] = _self_bleu(samples).groupby([samples[c] for c in SETTING]).mean()
+    return summary.fillna(0).reset_index()[[*SETTING, "samples", *METRICS]]
@@ -0,0 +1,161 @@
+"""Cheap in-memory checks that run before feedback is written to disk.
+
+* Token buckets per session and per client throttle bursts of submits.
+* Duplicate suppression keeps an exact hash of the normalized name and
+  comment (lower-cased, punctuation and extra whitespace removed) and
+  rejects a fingerprint already seen within the recent window. Any other
+  edit to the wording makes a new fingerprint.
+
+Everything is bounded (LRU-evicted buckets, a capped fingerprint window),
+so a flood of distinct sessions or comments cannot grow memory without
+limit. One guard is shared by all sessions in the server process.
+"""
+import hashlib
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+# Each session may submit a short burst, then about one entry per minute
+SESSION_BURST = 3
+SESSION_PER_MINUTE = 1
+# A client (IP) covers every tab and session behind it, so it gets more room
+CLIENT_BURST = 10
+CLIENT_PER_MINUTE = 5
+
+DUPLICATE_WINDOW_SECONDS = 24 * 3600
+MAX_RECENT_FINGERPRINTS = 10000
+MAX_TRACKED_KEYS = 50000
+
+# X-Forwarded-For is client-controlled; only trust it when this many of our own proxies append to it
+TRUSTED_PROXY_HOPS = int(os.environ.get("TRUSTED_PROXY_HOPS", "0"))
+
+
+class TokenBucket:
+    """Classic token bucket: ``capacity`` tokens, refilled at ``rate`` tokens per second."""
+
+    __slots__ = ("capacity", "rate", "tokens", "updated")
+
+    def __init__(self, capacity, rate, now):
+        self.capacity = capacity
+        self.rate = rate
+        self.tokens = float(capacity)
+        self.updated = now
+
+    def refill(self, now):
+        """Add the tokens earned since the last update; True if one is available."""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        return self.tokens >= 1
+
+    def take(self, now):
+        if self.refill(now):
+            self.tokens -= 1
+            return True
+        return False
+
+    def retry_after(self):
+        """Seconds until the next token is available."""
+        return max(0.0, (1 - self.tokens) / self.rate)
+
+
+def normalize(text):
+    """Lower-case, drop punctuation and collapse whitespace so trivial edits still match."""
+    return " ".join(re.sub(r"[^\w\s]", " ", str(text or "").lower()).split())
+
+
+def client_address(forwarded_for, peer, trusted_hops=TRUSTED_PROXY_HOPS):
+    """The client address as seen by the outermost trusted proxy, or the socket peer.
+
+    Each trusted proxy appends the address it received from, so the client is
+    ``trusted_hops`` entries from the right; anything further left was sent
+    by the client and could be anything.
+    """
+    hops = [h.strip() for h in (forwarded_for or "").split(",") if h.strip()]
+    if trusted_hops > 0 and len(hops) >= trusted_hops:
+        return hops[-trusted_hops]
+    return peer
+
+
+def fingerprint(name, comment):
+    key = f"{normalize(name)}\x1f{normalize(comment)}"
+    return hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest()
+
+
+class SubmissionGuard:
+    """Per-session/per-client rate limits plus a recent-window duplicate filter."""
+
+    def __init__(self, session_burst=SESSION_BURST, session_per_minute=SESSION_PER_MINUTE,
+                 client_burst=CLIENT_BURST, client_per_minute=CLIENT_PER_MINUTE,
+                 duplicate_window=DUPLICATE_WINDOW_SECONDS, max_recent=MAX_RECENT_FINGERPRINTS,
+                 max_keys=MAX_TRACKED_KEYS, clock=time.monotonic):
+        self.limits = {
+            "session": (session_burst, session_per_minute / 60),
+            "client": (client_burst, client_per_minute / 60),
+        }
+        self.duplicate_window = duplicate_window
+        self.max_recent = max_recent
+        self.max_keys = max_keys
+        self.clock = clock
+        self._buckets = OrderedDict()
+        self._recent = OrderedDict()  # fingerprint -> time first accepted, oldest first
+        self._lock = threading.Lock()
+
+    def _bucket(self, scope, key, now):
+        bucket = self._buckets.get((scope, key))
+        if bucket is None:
+            bucket = self._buckets[(scope, key)] = TokenBucket(*self.limits[scope], now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end((scope, key))
+        return bucket
+
+    def allow(self, session_id, client_id=None):
+        """Spend one token from each of the session and client buckets, only if all have one.
+
+        Returns ``(allowed, retry_after_seconds)``. A rejected call spends
+        nothing from any bucket, so a throttled client does not drain its
+        sessions (or the reverse), and the caller can retry after the wait.
+        """
+        now = self.clock()
+        with self._lock:
+            buckets = [self._bucket("session", session_id, now)]
+            if client_id:
+                buckets.append(self._bucket("client", client_id, now))
+            # Check every bucket first, then spend from all of them or none
+            ready = [b.refill(now) for b in buckets]
+            if all(ready):
+                for b in buckets:
+                    b.tokens -= 1
+                return True, 0.0
+            return False, max(b.retry_after() for b, ok in zip(buckets, ready) if not ok)
+
+    def is_duplicate(self, name, comment):
+        """True if the same normalized name and comment were accepted within the window.
+
+        New fingerprints are recorded, so call this only once per submission.
+        Rating-only submissions (no comment) are never duplicates: the name
+        alone would match different people who share it.
+        """
+        if not normalize(comment):
+            return False
+        fp = fingerprint(name, comment)
+        now = self.clock()
+        with self._lock:
+            # Expire from the old end; the dict is in insertion (= time) order
+            while self._recent:
+                seen_at = next(iter(self._recent.values()))
+                if now - seen_at <= self.duplicate_window and len(self._recent) < self.max_recent:
+                    break
+                self._recent.popitem(last=False)
+            if fp in self._recent:
+                return True
+            self._recent[fp] = now
+            return False
+
+    def forget(self, name, comment):
+        """Drop a recorded fingerprint, e.g. when the write it guarded failed."""
+        with self._lock:
+            self._recent.pop(fingerprint(name, comment), None)
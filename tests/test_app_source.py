@@ -0,0 +1,11 @@
+import app_source
+
+
+def test_page_titles_are_read_without_running_the_app():
+    titles = app_source.read_page_titles()
+    assert titles[0] == "Home" and "Feedback" in titles
+
+
+def test_static_files_are_copied(tmp_path):
+    app_source.copy_static_files(tmp_path)
+    assert {p.name for p in tmp_path.iterdir()} == set(app_source.STATIC_FILES)
@@ -0,0 +1,36 @@
+import bias_scanner
+
+
+def terms(text):
+    return [term for _, _, _, term in bias_scanner.scan_text(text)]
+
+
+def test_biased_phrasings_are_flagged():
+    assert terms("Our chairman wants a young and dynamic rockstar for more manpower.") == [
+        "chairman", "young and dynamic", "rockstar", "manpower"]
+    assert terms("A rock-star engineer") == ["rock star"]
+
+
+def test_ordinary_words_are_not_flagged():
+    for text in ["He said she would send her notes.", "The old release is on master.",
+                 "An articulate, elite team of young and senior engineers.", "Exotic options pricing"]:
+        assert terms(text) == []
+
+
+def test_pronouns_are_counted_separately():
+    counts = bias_scanner.pronoun_counts(["He thinks his code is fine.", "SHE agrees", "They left", None])
+    assert counts.to_dict() == {"he/him": 2, "she/her": 1, "they/them": 1}
+
+
+def test_batch_scan_maps_matches_back_to_rows():
+    texts = ["fine text", "a culture fit\nwith manpower", "", "Hey you guys"]
+    matches, counts = bias_scanner.scan_batch(texts)
+    assert matches["row"].tolist() == [1, 1, 3]
+    assert counts["Total"].tolist() == [0, 2, 0, 1]
+    assert counts.loc[1, "Exclusionary"] == 1 and counts.loc[1, "Gendered"] == 1
+
+
+def test_highlight_escapes_html():
+    text = "<b>chairman</b>"
+    html = bias_scanner.highlight_html(text, bias_scanner.scan_text(text))
+    assert html.startswith("&lt;b&gt;<mark") and "chairman</mark>" in html
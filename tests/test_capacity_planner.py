@@ -0,0 +1,33 @@
+import pytest
+
+import capacity_planner
+
+
+def test_simulation_window_shrinks_to_cap_arrivals():
+    result = capacity_planner.simulate_peak(5000, 1.0, 6000, 100, max_arrivals=20_000)
+    assert result["Simulated seconds"] == pytest.approx(4.0)
+    assert result["Requests"] == pytest.approx(20_000, rel=0.05)
+
+
+def test_light_load_keeps_the_full_window():
+    result = capacity_planner.simulate_peak(2, 1.0, 10, 100)
+    assert result["Simulated seconds"] == 600
+    assert result["Throttled %"] == 0
+
+
+def test_rate_limits_throttle_requests():
+    # 10 req/s against a 60 RPM limit
+    result = capacity_planner.simulate_peak(10, 0.5, 50, 100, rpm_limit=60, duration=60)
+    assert result["Throttled %"] > 50
+    assert result["Backlog at end"] > 0
+
+
+def test_required_concurrency_meets_the_targets():
+    servers = capacity_planner.required_concurrency(20, 2.0, max_utilisation=0.8, max_p95_wait=1.0)
+    assert servers >= 50
+    assert capacity_planner.analytic_metrics(20, 2.0, servers)["Utilisation"] <= 0.8
+
+
+def test_binding_rate_limit():
+    assert capacity_planner.rate_limit_capacity(1000, 3500, 90000) == (1.5, "TPM")
+    assert capacity_planner.rate_limit_capacity(10, 60, 0) == (1.0, "RPM")
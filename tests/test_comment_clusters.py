@@ -0,0 +1,64 @@
+import pandas as pd
+
+import comment_clusters
+
+COMMENTS = [
+    "The pricing page is confusing", "Pricing tiers are confusing to compare", "Too expensive pricing",
+    "Love the prompt engineering section", "Prompt engineering examples were great", "More prompt examples please",
+    "Add a section on fine tuning", "Fine tuning guide would help", "Explain fine tuning costs",
+]
+
+
+def feedback(comments):
+    return pd.DataFrame({"Name": [f"user{i}" for i in range(len(comments))], "Feedback": comments})
+
+
+def test_saved_state_holds_no_comment_text(tmp_path):
+    clusterer = comment_clusters.CommentClusterer(n_clusters=3)
+    clusterer.add(COMMENTS[:2], ["a", "b"])  # fewer than k: held back
+    path = tmp_path / "clusters.pkl"
+    comment_clusters.save_clusterer(clusterer, str(path))
+    raw = path.read_bytes()
+    for word in ("pricing", "confusing", "tiers"):
+        assert word.encode() not in raw
+    assert not hasattr(clusterer, "terms")
+
+
+def test_waiting_comments_fit_once_there_are_enough():
+    clusterer = comment_clusters.CommentClusterer(n_clusters=3)
+    assert clusterer.add_feedback(feedback(COMMENTS[:2]))
+    assert not clusterer.fitted
+    clusterer.add_feedback(feedback(COMMENTS))
+    assert clusterer.fitted and clusterer.waiting is None
+    themes = clusterer.summary(COMMENTS)
+    assert themes["Comments"].sum() == len(COMMENTS)
+    assert all(themes["Top terms"])
+
+
+def test_refits_when_seen_comments_leave_the_store():
+    clusterer = comment_clusters.CommentClusterer(n_clusters=3)
+    clusterer.add_feedback(feedback(COMMENTS))
+    assert not clusterer.add_feedback(feedback(COMMENTS))  # nothing new
+    # Retention expired the first three rows
+    assert clusterer.add_feedback(feedback(COMMENTS)[3:])
+    assert clusterer.n_docs == len(COMMENTS) - 3
+    assert clusterer.add_feedback(feedback([]))
+    assert clusterer.n_docs == 0 and not clusterer.fitted
+
+
+def test_clear_resets_and_deletes_saved_state(tmp_path):
+    clusterer = comment_clusters.CommentClusterer(n_clusters=3)
+    clusterer.add_feedback(feedback(COMMENTS))
+    path = tmp_path / "clusters.pkl"
+    comment_clusters.save_clusterer(clusterer, str(path))
+    comment_clusters.clear_clusterer(clusterer, str(path))
+    assert not path.exists()
+    assert clusterer.n_docs == 0 and not clusterer.seen and clusterer.n_clusters == 3
+
+
+def test_older_saved_state_is_rebuilt(tmp_path, monkeypatch):
+    path = tmp_path / "clusters.pkl"
+    monkeypatch.setattr(comment_clusters, "STATE_VERSION", 1)
+    comment_clusters.save_clusterer(comment_clusters.CommentClusterer(n_clusters=4), str(path))
+    monkeypatch.undo()
+    assert comment_clusters.load_clusterer(str(path)).n_clusters == comment_clusters.N_CLUSTERS
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+import conversation_costs
+
+
+def _naive_context(user, reply, turns, policy, system=300, window=4, every=8, summary=300):
+    """Per-turn input tokens for one conversation, following each policy's rule literally."""
+    out = []
+    for t in range(turns):
+        exchanges = [user[i] + reply[i] for i in range(t)]
+        if policy in ("full", "cache"):
+            kept = sum(exchanges)
+        elif policy == "window":
+            kept = sum(exchanges[-window:]) if window else 0
+        else:
+            start = t // every * every
+            kept = sum(exchanges[start:]) + (summary if t >= every else 0)
+        out.append(system + kept + user[t])
+    return out
+
+
+@pytest.mark.parametrize("policy", ["full", "window", "summarize", "cache"])
+def test_vectorized_context_matches_turn_by_turn(policy):
+    user, reply, active = conversation_costs.simulate_conversations(50, mean_turns=12, max_turns=30, seed=3)
+    context, _, _ = conversation_costs.context_tokens(user, reply, active, policy)
+    for row in range(len(user)):
+        turns = int(active[row].sum())
+        assert context[row, :turns].tolist() == _naive_context(user[row], reply[row], turns, policy)
+        assert not context[row, turns:].any()
+
+
+def test_summarization_calls_are_billed_at_block_boundaries():
+    user = np.full((1, 20), 10.0)
+    reply = np.full((1, 20), 30.0)
+    active = np.ones((1, 20), dtype=bool)
+    _, extra_in, extra_out = conversation_costs.context_tokens(user, reply, active, "summarize", summary_every=8,
+                                                               summary_tokens=100)
+    assert np.nonzero(extra_out[0])[0].tolist() == [8, 16]
+    # The first summary reads 8 exchanges; the second also reads the first summary
+    assert extra_in[0, 8] == 8 * 40 and extra_in[0, 16] == 8 * 40 + 100
+
+
+def test_caching_never_costs_more_than_full_history():
+    user, reply, active = conversation_costs.simulate_conversations(200, seed=1)
+    summary, profile = conversation_costs.compare_policies(user, reply, active, price_per_1k=0.002)
+    full = summary.loc[conversation_costs.POLICY_LABELS["full"], "Cost per conversation ($)"]
+    cached = summary.loc[conversation_costs.POLICY_LABELS["cache"], "Cost per conversation ($)"]
+    assert cached < full
+    assert profile.index[0] == 1 and len(profile) <= user.shape[1]
+
+
+def test_unknown_policy_is_rejected():
+    user, reply, active = conversation_costs.simulate_conversations(2, seed=0)
+    with pytest.raises(ValueError):
+        conversation_costs.context_tokens(user, reply, active, "truncate")
@@ -0,0 +1,63 @@
+import io
+
+import pytest
+
+import doc_summarizer
+import inference_worker
+
+SENTENCES = [f"Sentence number {i} talks about pricing, latency and the model context window." for i in range(200)]
+DOCUMENT = " ".join(SENTENCES)
+
+
+class FakeWorker:
+    """Stands in for ``InferenceWorker``: byte tokens, a 512-token context, and a record of every call."""
+
+    context_length = 512
+
+    def __init__(self):
+        self.tokenizer = inference_worker.ByteTokenizer()
+        self.requests = []
+
+    def count_tokens(self, texts):
+        return [len(self.tokenizer.encode(t)) for t in texts]
+
+    def generate_many(self, requests, timeout=None):
+        self.requests.extend(requests)
+        return [{"text": "x" * r["max_new_tokens"]} for r in requests]
+
+
+def test_chunks_respect_size_and_overlap():
+    chunks = list(doc_summarizer.stream_chunks(iter(SENTENCES), chunk_tokens=100, overlap_tokens=40))
+    counts = doc_summarizer.token_costs.count_tokens_many(chunks)
+    assert max(counts) <= 100
+    # Consecutive chunks share their boundary sentence
+    assert chunks[0].split(". ")[-1] in chunks[1]
+
+
+def test_long_sentences_are_split_to_fit():
+    chunks = list(doc_summarizer.stream_chunks(iter(["word " * 500]), chunk_tokens=50, overlap_tokens=0))
+    assert len(chunks) > 1
+    assert max(doc_summarizer.token_costs.count_tokens_many(chunks)) <= 50
+
+
+def test_extractive_summary_and_stages():
+    summary, stages = doc_summarizer.summarize_document(io.StringIO(DOCUMENT), doc_summarizer.ExtractiveBackend(),
+                                                        chunk_tokens=300, overlap_tokens=30, summary_tokens=60)
+    assert summary and summary in DOCUMENT or summary.split(". ")[0] in DOCUMENT
+    assert stages["Stage"].tolist()[:2] == ["Chunk", "Map"]
+    assert stages["Stage"].iloc[-1].startswith("Reduce")
+
+
+def test_local_model_prompts_fit_its_context():
+    worker = FakeWorker()
+    backend = doc_summarizer.LocalModelBackend(worker)
+    doc_summarizer.summarize_document(io.StringIO(DOCUMENT), backend, chunk_tokens=4000, overlap_tokens=100,
+                                      summary_tokens=100)
+    lengths = worker.count_tokens([r["prompt"] for r in worker.requests])
+    assert max(n + r["max_new_tokens"] for n, r in zip(lengths, worker.requests)) <= worker.context_length
+
+
+def test_local_model_refuses_summaries_that_leave_no_room():
+    backend = doc_summarizer.LocalModelBackend(FakeWorker())
+    with pytest.raises(ValueError, match="lower the summary length"):
+        doc_summarizer.summarize_document(io.StringIO(DOCUMENT), backend, summary_tokens=300)
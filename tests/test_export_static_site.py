@@ -0,0 +1,18 @@
+import os
+
+import app_source
+import export_static_site
+
+
+def test_export_leaves_no_data_files_behind(tmp_path, monkeypatch):
+    monkeypatch.setattr(export_static_site, "read_page_titles", lambda: ["FAQs", "Feedback"])
+    monkeypatch.chdir(tmp_path)
+    before = set(os.listdir(app_source.APP_DIR))
+
+    written = export_static_site.export_site(str(tmp_path / "site"), "https://guide.example.com")
+
+    assert [os.path.relpath(p, tmp_path / "site") for p in written] == ["faqs/index.html"]
+    assert os.listdir(tmp_path) == ["site"]
+    assert set(os.listdir(app_source.APP_DIR)) - before <= {".pytest_cache", "__pycache__"}
+    page = open(written[0], encoding="utf-8").read()
+    assert "Frequently Asked Questions" in page and "https://guide.example.com/?page=Feedback" in page
@@ -0,0 +1,86 @@
+import logging
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+import feedback_store
+
+
+def entry(i, topic="LLM APIs", submitted=None):
+    return {"Submitted": submitted or datetime(2025, 1, 1, 12, 0, i % 60), "Name": f"User {i}",
+            "Email": f"u{i}@example.com", "Rating": 4, "Feedback": f"comment {i}", "Suggested topic": topic,
+            "Attachment name": None}
+
+
+def test_append_and_read_prunes_columns_and_days(tmp_path):
+    base = str(tmp_path)
+    feedback_store.append_feedback(entry(1, submitted=datetime(2025, 1, 1, 9)), base_dir=base)
+    feedback_store.append_feedback(entry(2, submitted=datetime(2025, 1, 3, 9)), base_dir=base)
+    df = feedback_store.read_feedback(columns=["Name", "Rating"], start=datetime(2025, 1, 2).date(), base_dir=base)
+    assert list(df.columns) == ["Name", "Rating"]
+    assert df["Name"].tolist() == ["User 2"]
+
+
+def test_topics_outside_the_form_options_are_kept(tmp_path):
+    base = str(tmp_path)
+    feedback_store.append_feedback(entry(1, topic="Evaluation"), base_dir=base)
+    assert feedback_store.read_feedback(base_dir=base)["Suggested topic"].tolist() == ["Evaluation"]
+
+
+def test_many_distinct_topics_fit_the_dictionary_index(tmp_path):
+    csv = tmp_path / "feedback.csv"
+    pd.DataFrame([entry(i, topic=f"Topic {i}") for i in range(300)]).to_csv(csv, index=False)
+    base = str(tmp_path / "segments")
+    assert feedback_store.import_legacy_csv(path=str(csv), base_dir=base) == 300
+    assert not csv.exists()
+    df = feedback_store.read_feedback(base_dir=base)
+    assert df["Suggested topic"].nunique() == 300
+
+
+def test_reads_do_not_import_the_legacy_csv(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    pd.DataFrame([entry(1)]).to_csv(feedback_store.LEGACY_CSV_PATH, index=False)
+    assert feedback_store.read_feedback(base_dir=str(tmp_path / "segments")).empty
+    assert (tmp_path / feedback_store.LEGACY_CSV_PATH).exists()
+
+
+def test_compaction_merges_segments_without_losing_rows(tmp_path):
+    base = str(tmp_path)
+    for i in range(10):
+        feedback_store.append_feedback(entry(i), base_dir=base)
+    result = feedback_store.run_maintenance(retention_days=100000, base_dir=base)
+    assert result["merged_segments"] == 10
+    assert feedback_store.storage_stats(base_dir=base)["Segments"].tolist() == [1]
+    assert len(feedback_store.read_feedback(base_dir=base)) == 10
+
+
+def test_retention_expires_old_partitions(tmp_path):
+    base = str(tmp_path)
+    feedback_store.append_feedback(entry(1, submitted=datetime.now() - timedelta(days=40)), base_dir=base)
+    feedback_store.append_feedback(entry(2, submitted=datetime.now()), base_dir=base)
+    assert feedback_store.run_maintenance(retention_days=30, base_dir=base)["expired_partitions"] == 1
+    assert feedback_store.read_feedback(base_dir=base)["Name"].tolist() == ["User 2"]
+
+
+def test_clear_feedback(tmp_path):
+    base = str(tmp_path / "segments")
+    assert not feedback_store.clear_feedback(base_dir=base)
+    feedback_store.append_feedback(entry(1), base_dir=base)
+    assert feedback_store.clear_feedback(base_dir=base)
+    assert feedback_store.read_feedback(base_dir=base).empty
+
+
+def test_compactor_logs_failed_passes(tmp_path, monkeypatch, caplog):
+    def fail(*args):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(feedback_store, "run_maintenance", fail)
+    compactor = feedback_store._Compactor(0.01, 30, str(tmp_path))
+    with caplog.at_level(logging.ERROR, logger="feedback_store"):
+        compactor.start()
+        time.sleep(0.1)
+        compactor.stopped.set()
+        compactor.join()
+    assert "disk full" in caplog.text
+    assert "Feedback maintenance failed" in caplog.text
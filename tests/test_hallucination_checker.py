@@ -0,0 +1,36 @@
+import hallucination_checker
+
+REFERENCE = {
+    "pricing.md": "GPT-4 costs 0.03 dollars per thousand tokens. Prompts should state the audience.",
+    "safety.md": "Models can invent citations. Always check generated references against the source.",
+}
+
+
+def test_copied_sentence_is_supported_and_unrelated_one_is_not():
+    index = hallucination_checker.build_index(REFERENCE)
+    scored = hallucination_checker.score_outputs(index, [
+        "Models can invent citations. The moon is made of green cheese."])
+    assert scored["Verdict"].tolist() == ["Supported", "Unsupported"]
+    assert scored["Source"][0] == "safety.md"
+    assert scored["Support"][0] == 1.0
+
+
+def test_changed_figure_is_reported():
+    index = hallucination_checker.build_index(REFERENCE)
+    scored = hallucination_checker.score_outputs(index, ["GPT-4 costs 0.06 dollars per thousand tokens."])
+    assert scored["Source"][0] == "pricing.md"
+    assert scored["Verdict"][0] == "Check figures"
+    assert scored["Unmatched figures"][0] == "0.06"
+
+
+def test_signatures_do_not_depend_on_chunking(monkeypatch):
+    index = hallucination_checker.ReferenceIndex()
+    sentences = hallucination_checker.split_sentences(" ".join(REFERENCE.values()))
+    whole = index.signatures_for(sentences)
+    monkeypatch.setattr(hallucination_checker, "_MAX_ROWS_PER_CHUNK", 8)
+    assert (index.signatures_for(sentences) == whole).all()
+
+
+def test_empty_outputs_give_an_empty_table():
+    index = hallucination_checker.build_index(REFERENCE)
+    assert hallucination_checker.score_outputs(index, ["", "  "]).empty
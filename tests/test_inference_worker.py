@@ -0,0 +1,36 @@
+import pytest
+
+import inference_worker
+
+
+@pytest.fixture(scope="module")
+def demo_model():
+    return inference_worker.load_model()
+
+
+def test_batched_decoding_matches_one_request_at_a_time(demo_model):
+    model, tokenizer = demo_model
+    requests = [
+        {"prompt": "The capital of France is", "temperature": 0.0, "max_new_tokens": 12},
+        {"prompt": "Hi", "temperature": 0.8, "top_p": 0.9, "seed": 3, "max_new_tokens": 6},
+        {"prompt": "A much longer prompt, so the others in the batch are left-padded.", "temperature": 1.0,
+         "seed": 5, "max_new_tokens": 9},
+    ]
+    batched = inference_worker.generate_batch(model, tokenizer, requests)
+    alone = [inference_worker.generate_batch(model, tokenizer, [r])[0] for r in requests]
+    assert [r["ids"] for r in batched] == [r["ids"] for r in alone]
+    assert all(r["tokens"] <= q["max_new_tokens"] for r, q in zip(batched, requests))
+
+
+def test_same_seed_gives_the_same_sample(demo_model):
+    model, tokenizer = demo_model
+    request = {"prompt": "Once upon a time", "temperature": 1.0, "seed": 11, "max_new_tokens": 10}
+    first, second = inference_worker.generate_batch(model, tokenizer, [request, dict(request)])
+    assert first["ids"] == second["ids"]
+
+
+def test_prompts_longer_than_the_context_are_trimmed(demo_model):
+    model, tokenizer = demo_model
+    limit = inference_worker.context_length(model)
+    result = inference_worker.generate_batch(model, tokenizer, [{"prompt": "x" * (limit * 2), "max_new_tokens": 4}])
+    assert result[0]["tokens"] <= 4
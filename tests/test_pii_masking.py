@@ -0,0 +1,33 @@
+import pandas as pd
+
+import pii_masking
+
+
+def _frame():
+    return pd.DataFrame({
+        "Name": ["Jane Doe", "Sam Lee"],
+        "Email": ["jane@example.com", "sam@example.org"],
+        "Rating": [5, 3],
+        "Feedback": ["Jane here, call +44 20 7946 0958 or jane@example.com", "I am happy with it"],
+    })
+
+
+def test_mask_frame_redacts_contact_details_and_own_name():
+    masked = pii_masking.mask_frame(_frame())
+    assert masked["Name"].tolist() == ["J. D.", "S. L."]
+    assert masked["Email"].tolist() == ["j***@example.com", "s***@example.org"]
+    assert masked["Feedback"].tolist() == ["[name] here, call [phone] or [email]", "I am happy with it"]
+
+
+def test_own_name_is_masked_when_name_column_is_not_kept():
+    masked = pii_masking.PiiMasker().mask(_frame(), keep=["Rating", "Feedback"])
+    assert list(masked.columns) == ["Rating", "Feedback"]
+    assert masked["Feedback"][0] == "[name] here, call [phone] or [email]"
+
+
+def test_masker_cache_matches_uncached_result():
+    masker = pii_masking.PiiMasker()
+    first = masker.mask(_frame())
+    assert masker.cached_rows() == 2
+    pd.testing.assert_frame_equal(masker.mask(_frame()), first)
+    pd.testing.assert_frame_equal(first, pii_masking.mask_frame(_frame()))
@@ -0,0 +1,47 @@
+import prompt_compressor
+
+
+def compressed(text, **kwargs):
+    return prompt_compressor.compress_prompt(text, **kwargs)["Compressed"]
+
+
+def test_code_fence_is_left_byte_for_byte():
+    code = "```python\ndef f(x):\n    return  x   # aligned\n\n\n\n}\n}\n```"
+    out = compressed("Could you please review this.\n" + code + "\nThanks!")
+    assert code in out
+    assert out.startswith("Review this.")
+    assert "Thanks" not in out
+
+
+def test_examples_keep_their_wording():
+    prompt = "Answer the customer.\n\nQ: Can you ship to Ireland?\nA: Yes, in order to ship we need an address."
+    assert compressed(prompt) == prompt
+
+
+def test_quoted_content_is_untouched():
+    prompt = 'Reply with "could you please   wait" exactly.\n> I would like you to call me\n> thanks!'
+    assert compressed(prompt) == prompt
+
+
+def test_no_sentence_fragments_or_stray_capitals():
+    assert compressed("Reply politely. thank you for asking!") == "Reply politely. thank you for asking!"
+    assert compressed("Ship within the EU, e.g. within France.") == "Ship within the EU, e.g. within France."
+    assert compressed("Then I would like you to list them.") == "Then list them."
+
+
+def test_indentation_is_kept_while_inner_spaces_collapse():
+    assert compressed("Steps:\n    read   the  file\n\n\n\n    answer") == "Steps:\n    read the file\n\n    answer"
+
+
+def test_duplicate_examples_and_repeated_lines_are_dropped():
+    prompt = ("Be brief.\n\nExample 1:\nInput: hi\nOutput: hello\n\nExample 2:\nInput: hi\nOutput: hello\n\n"
+              "Be brief.")
+    out = compressed(prompt)
+    assert out.count("Input: hi") == 1
+    assert out.count("Be brief.") == 1
+
+
+def test_token_counts_are_reported():
+    result = prompt_compressor.compress_prompt("Please note that the answer must be short.")
+    assert result["Compressed"] == "The answer must be short."
+    assert result["Tokens saved"] == result["Tokens before"] - result["Tokens after"] > 0
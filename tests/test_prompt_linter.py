@@ -0,0 +1,27 @@
+import prompt_linter
+
+GOOD = ('You are a support specialist. Summarize the customer email below for our billing team, because they '
+        'triage refunds, in three bullet points.\n\nEmail: """The invoice for March charged us twice for the '
+        'same seat and we would like the duplicate refunded before the next billing run starts."""')
+
+
+def test_well_formed_prompt_passes_every_rule():
+    report = prompt_linter.lint_prompt(GOOD)
+    assert report["Score"] == 100
+    assert report["Suggestions"] == ""
+
+
+def test_vague_short_prompt_explains_what_is_missing():
+    report = prompt_linter.lint_prompt("write something nice")
+    assert not report["Clarity"] and not report["Role"] and not report["Output format"]
+    assert "Found: nice, something." in report["Suggestions"]
+    assert report["Score"] < 50
+
+
+def test_parallel_lint_matches_serial(monkeypatch):
+    prompts = [GOOD, "write something nice", "", "List five risks. Explain each. Translate it. Rewrite it."] * 5
+    serial = prompt_linter.lint_prompts(prompts)
+    monkeypatch.setattr(prompt_linter, "PARALLEL_THRESHOLD", 1)
+    parallel = prompt_linter.lint_prompts(prompts, workers=2, chunk_size=3)
+    assert list(serial.columns) == prompt_linter.REPORT_COLUMNS
+    assert serial.equals(parallel)
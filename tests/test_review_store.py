@@ -0,0 +1,40 @@
+import csv
+import io
+import json
+from datetime import date
+
+import review_store
+
+
+def add_reviews(path, n, risk="Low", feature="Chatbot", day="2025-01-01"):
+    for i in range(n):
+        review_store.save_review({"feature_name": f"{feature} {i}", "risk_level": risk,
+                                  "submitted_at": f"{day}T10:{i % 60:02d}:00"}, path=path)
+
+
+def test_filters_and_pagination(tmp_path):
+    path = str(tmp_path / "reviews.db")
+    add_reviews(path, 30, risk="Low")
+    add_reviews(path, 5, risk="High", feature="Search", day="2025-02-01")
+    assert review_store.count_reviews(path) == 35
+    assert review_store.count_reviews(path, risk_levels=["High"]) == 5
+    assert review_store.count_reviews(path, feature="  chat") == 30
+    assert review_store.count_reviews(path, start=date(2025, 2, 1), end=date(2025, 2, 1)) == 5
+    pages = [review_store.list_reviews(page=p, page_size=25, path=path, risk_levels=["Low"]) for p in (1, 2)]
+    assert [len(p) for p in pages] == [25, 5]
+    assert not {r["id"] for r in pages[0]} & {r["id"] for r in pages[1]}
+
+
+def test_exports_contain_every_matching_review(tmp_path):
+    path = str(tmp_path / "reviews.db")
+    add_reviews(path, 3, risk="Medium")
+    add_reviews(path, 2, risk="High")
+    lines = review_store.spool_export(review_store.export_jsonl(path, risk_levels=["Medium"])).splitlines()
+    assert [json.loads(line)["risk_level"] for line in lines] == ["Medium"] * 3
+    rows = list(csv.DictReader(io.StringIO(review_store.spool_export(review_store.export_csv(path)).decode())))
+    assert len(rows) == 5 and set(rows[0]) == {"id", *review_store.REVIEW_FIELDS}
+
+
+def test_spooled_export_rolls_over_to_disk():
+    chunks = [b"x" * 1000 for _ in range(50)]
+    assert review_store.spool_export(iter(chunks), max_size=4096) == b"".join(chunks)
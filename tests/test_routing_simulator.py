@@ -0,0 +1,32 @@
+import pandas as pd
+import pytest
+
+import routing_simulator
+
+
+def test_text_flags_are_parsed_not_truth_tested():
+    log = pd.DataFrame({"input_tokens": [10] * 8,
+                        "keyword_hit": ["True", "False", "0", "1", "FALSE", "yes", "", None]})
+    features = routing_simulator.prepare_log(log)
+    assert features["keyword_hit"].tolist() == [True, False, False, True, False, True, False, False]
+
+
+def test_numeric_and_bool_flags():
+    assert routing_simulator.parse_flags(pd.Series([0, 1, 2, None])).tolist() == [False, True, True, False]
+    assert routing_simulator.parse_flags(pd.Series([True, False])).tolist() == [True, False]
+
+
+def test_unreadable_flags_are_reported():
+    with pytest.raises(ValueError, match="maybe"):
+        routing_simulator.parse_flags(pd.Series(["true", "maybe"]))
+
+
+def test_keyword_policy_routes_hits_to_the_top_tier():
+    log = pd.DataFrame({"prompt": ["hi there", "Explain why the contract fails", "thanks"]})
+    features = routing_simulator.prepare_log(log)
+    assert routing_simulator.route(features, {"kind": "keyword"}, 2).tolist() == [0, 1, 0]
+
+
+def test_prompt_or_token_column_is_required():
+    with pytest.raises(ValueError, match="prompt"):
+        routing_simulator.prepare_log(pd.DataFrame({"other": [1]}))
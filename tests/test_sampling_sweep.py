@@ -0,0 +1,53 @@
+import math
+from collections import Counter
+
+import pandas as pd
+import pytest
+
+import sampling_sweep
+
+
+def _samples():
+    ids = [[1, 2, 3, 4, 5, 6], [1, 2, 3, 9, 9, 9, 9], [7, 8], [5, 5, 5, 5, 5], [5, 6, 5, 6, 5, 6, 1, 2]]
+    return pd.DataFrame({"temperature": [0.5, 0.5, 0.5, 1.0, 1.0], "top_p": [1.0] * 5, "seed": range(5),
+                         "ids": ids, "tokens": [len(x) for x in ids]})
+
+
+def _grams(ids, n):
+    return Counter(tuple(ids[i:i + n]) for i in range(len(ids) - n + 1))
+
+
+def _self_bleu(ids, others):
+    log_p = 0.0
+    for n in range(1, sampling_sweep.BLEU_ORDER + 1):
+        counts = _grams(ids, n)
+        clipped = sum(min(c, max((_grams(o, n)[g] for o in others), default=0)) for g, c in counts.items())
+        smooth = 0 if n == 1 else 1
+        log_p += math.log(max((clipped + smooth) / max(sum(counts.values()) + smooth, 1), 1e-9)) / 4
+    ref = sum(len(o) for o in others) / max(len(others), 1)
+    brevity = math.exp(1 - ref / max(len(ids), 1)) if len(ids) < ref else 1.0
+    return brevity * math.exp(log_p)
+
+
+def test_metrics_match_their_definitions():
+    samples = _samples()
+    metrics = sampling_sweep.sweep_metrics(samples).set_index(sampling_sweep.SETTING)
+    for (temperature, top_p), group in samples.groupby(sampling_sweep.SETTING):
+        row = metrics.loc[(temperature, top_p)]
+        ids = group["ids"].tolist()
+        for n in (1, 2):
+            grams = Counter()
+            for x in ids:
+                grams.update(_grams(x, n))
+            assert row[f"distinct-{n}"] == pytest.approx(len(grams) / sum(grams.values()))
+        repetition = [sum(c - 1 for c in _grams(x, 2).values()) / max(len(x) - 1, 1) for x in ids]
+        assert row["repetition"] == pytest.approx(sum(repetition) / len(ids))
+        bleu = [_self_bleu(x, ids[:i] + ids[i + 1:]) for i, x in enumerate(ids)]
+        assert row["self-BLEU"] == pytest.approx(sum(bleu) / len(ids))
+        assert row["samples"] == len(ids)
+
+
+def test_sweep_requests_cover_the_grid():
+    requests = sampling_sweep.sweep_requests("Hi", [0.2, 1.0], [0.9], 3, 16)
+    assert len(requests) == 6
+    assert {(r["temperature"], r["seed"]) for r in requests} == {(t, s) for t in (0.2, 1.0) for s in range(3)}
@@ -0,0 +1,70 @@
+import submission_guard
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def guard(clock, **limits):
+    return submission_guard.SubmissionGuard(clock=clock, **limits)
+
+
+def test_rejected_submit_spends_from_no_bucket():
+    clock = Clock()
+    g = guard(clock, session_burst=5, client_burst=1)
+    assert g.allow("s1", "1.2.3.4")[0]
+    # The client bucket is empty: the session keeps its tokens
+    for _ in range(10):
+        allowed, retry_after = g.allow("s1", "1.2.3.4")
+        assert not allowed and retry_after > 0
+    assert g._buckets[("session", "s1")].tokens == 4
+
+
+def test_client_bucket_untouched_when_session_is_throttled():
+    clock = Clock()
+    g = guard(clock, session_burst=1, client_burst=3)
+    assert g.allow("s1", "1.2.3.4")[0]
+    assert not g.allow("s1", "1.2.3.4")[0]
+    assert g._buckets[("client", "1.2.3.4")].tokens == 2
+    assert g.allow("s2", "1.2.3.4")[0]
+
+
+def test_tokens_refill_over_time():
+    clock = Clock()
+    g = guard(clock, session_burst=1, session_per_minute=1)
+    assert g.allow("s1")[0]
+    allowed, retry_after = g.allow("s1")
+    assert not allowed and retry_after == 60
+    clock.now = 60
+    assert g.allow("s1")[0]
+
+
+def test_duplicates_match_only_the_exact_normalized_text():
+    g = guard(Clock())
+    assert not g.is_duplicate("Alex", "Great guide!!")
+    assert g.is_duplicate("alex", "great   guide")
+    assert not g.is_duplicate("Alex", "Great guides")
+
+
+def test_empty_comments_are_never_duplicates():
+    g = guard(Clock())
+    assert not g.is_duplicate("Alex", "")
+    assert not g.is_duplicate("Alex", "  ")
+
+
+def test_duplicates_expire_after_the_window():
+    clock = Clock()
+    g = guard(clock, duplicate_window=10)
+    assert not g.is_duplicate("Alex", "hello")
+    clock.now = 11
+    assert not g.is_duplicate("Alex", "hello")
+
+
+def test_forwarded_for_is_trusted_only_behind_configured_proxies():
+    assert submission_guard.client_address("6.6.6.6, 1.2.3.4", "10.0.0.1", trusted_hops=0) == "10.0.0.1"
+    assert submission_guard.client_address("6.6.6.6, 1.2.3.4", "10.0.0.1", trusted_hops=1) == "1.2.3.4"
+    assert submission_guard.client_address("", "10.0.0.1", trusted_hops=1) == "10.0.0.1"
@@ -0,0 +1,46 @@
+import sqlite3
+
+import pytest
+
+import usage_analytics
+
+
+def test_counts_merge_flushed_and_pending_events(tmp_path):
+    counters = usage_analytics.UsageCounters(str(tmp_path / "usage.db"), interval=3600)
+    counters.record("page", "nav", "FAQs")
+    counters.record("page", "nav", "FAQs")
+    assert counters.flush() == 1
+    counters.record("page", "nav", "FAQs")
+    counters.record("quiz", "Q1", "A")
+    counters.record("quiz", "Q1", "B")
+    counters.record("quiz", "Q1", "B")
+
+    counts = counters.counts(days=1)
+    assert usage_analytics.page_views(counts).to_dict("records") == [{"Page": "FAQs", "Views": 3}]
+    quiz = usage_analytics.quiz_answers(counts)
+    assert quiz["Answer"].tolist() == ["B", "A"]
+    assert quiz["Share %"].tolist() == [66.7, 33.3]
+
+    assert counters.flush() == 3
+    assert counters.flush() == 0
+    with sqlite3.connect(tmp_path / "usage.db") as conn:
+        assert conn.execute("SELECT SUM(count) FROM usage_counts").fetchone()[0] == 6
+
+
+def test_failed_flush_keeps_pending_events(tmp_path):
+    counters = usage_analytics.UsageCounters(str(tmp_path / "usage.db"), interval=3600)
+    counters.record("page", "nav", "FAQs")
+    with sqlite3.connect(tmp_path / "usage.db") as conn:
+        conn.execute("DROP TABLE usage_counts")
+    with pytest.raises(sqlite3.Error):
+        counters.flush()
+    with sqlite3.connect(tmp_path / "usage.db") as conn:
+        conn.executescript(usage_analytics._SCHEMA)
+    assert counters.flush() == 1
+
+
+def test_tracking_can_be_switched_off(monkeypatch):
+    monkeypatch.setenv(usage_analytics.TRACKING_ENV_VAR, "Off")
+    assert not usage_analytics.tracking_enabled()
+    monkeypatch.delenv(usage_analytics.TRACKING_ENV_VAR)
+    assert usage_analytics.tracking_enabled()
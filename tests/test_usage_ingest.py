@@ -0,0 +1,52 @@
+import gzip
+import io
+
+import pandas as pd
+import pytest
+
+import usage_ingest
+
+ROWS = [
+    {"timestamp": "2025-01-01T10:00:00Z", "model": "gpt-4-0613", "prompt_tokens": 1000, "completion_tokens": 0},
+    {"timestamp": "2025-01-01T11:00:00Z", "model": "gpt-3.5-turbo", "prompt_tokens": 500, "completion_tokens": 500},
+    {"timestamp": "2025-01-02T09:00:00Z", "model": "gpt-4o", "prompt_tokens": 1000, "completion_tokens": 0},
+    {"timestamp": "2025-01-02T09:30:00Z", "model": "gpt-4o-mini", "prompt_tokens": 1000, "completion_tokens": 0},
+    {"timestamp": "not a date", "model": "gpt-4", "prompt_tokens": 1, "completion_tokens": 1},
+]
+
+
+@pytest.mark.parametrize("model, price", [
+    ("gpt-4", 0.06), ("GPT-4", 0.06), ("gpt-4-0613", 0.06), ("gpt-3.5-turbo", 0.002),
+    ("gpt-3.5-turbo-2024-01-25", 0.002),
+])
+def test_known_models_and_snapshots_are_priced(model, price):
+    assert usage_ingest._price_per_1k(model) == price
+
+
+@pytest.mark.parametrize("model", ["gpt-4o", "gpt-4o-mini", "gpt-4-turbo", "gpt-3.5-turbo-16k", "claude-3"])
+def test_unknown_models_are_not_guessed(model):
+    assert pd.isna(usage_ingest._price_per_1k(model))
+
+
+def test_ingest_prices_from_tokens_and_reports_unpriced_models():
+    data = pd.DataFrame(ROWS).to_csv(index=False).encode()
+    summary, stats = usage_ingest.ingest(io.BytesIO(data), name="usage.csv", chunksize=2)
+    assert stats["rows"] == 5 and stats["chunks"] == 3 and stats["skipped rows"] == 1
+    assert stats["unpriced models"] == {"gpt-4o", "gpt-4o-mini"}
+    spend = summary.groupby("Model")["Spend ($)"].sum()
+    assert spend["gpt-4-0613"] == pytest.approx(0.06)
+    assert spend["gpt-3.5-turbo"] == pytest.approx(0.002)
+    assert spend["gpt-4o"] == 0
+
+
+def test_compressed_jsonl_export_is_read_by_suffix():
+    lines = "\n".join(pd.DataFrame(ROWS[:2]).to_json(orient="records", lines=True).splitlines())
+    data = gzip.compress(lines.encode())
+    summary, stats = usage_ingest.ingest(io.BytesIO(data), name="usage.jsonl.gz")
+    assert stats["rows"] == 2
+    assert summary["Input tokens"].sum() == 1500
+
+
+def test_missing_columns_are_reported():
+    with pytest.raises(ValueError, match="model"):
+        usage_ingest.resolve_columns(["timestamp", "cost"])
@@ -0,0 +1,71 @@
+"""Token counting and per-model pricing shared by the cost tools.
+
+Counts are exact when ``tiktoken`` and its ``cl100k_base`` encoding are
+available; otherwise a regex approximation of the same pre-tokenizer is used
+and ``tokens_are_exact()`` reports False so the UI can say so.
+"""
+import math
+import re
+from functools import lru_cache
+
+ENCODING_NAME = "cl100k_base"
+
+# USD per 1K tokens, matching the figures quoted in the cost section
+MODEL_PRICES_PER_1K = {
+    "GPT-3.5": 0.002,
+    "GPT-4": 0.06,
+}
+
+DAYS_PER_MONTH = 30
+
+# Mirrors the shape of the cl100k pre-tokenizer: contractions, words, short digit runs, punctuation
+_APPROX_PIECES = re.compile(r"'(?:s|t|re|ve|m|ll|d)| ?[^\W\d_]+| ?\d{1,3}| ?[^\s\w]+|\s+", re.I)
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    try:
+        import tiktoken
+        return tiktoken.get_encoding(ENCODING_NAME)
+    except Exception:
+        # Missing package or no cached encoding file (offline) -> approximate
+        return None
+
+
+def tokens_are_exact():
+    """True when counts come from the real ``cl100k_base`` tokenizer."""
+    return _encoding() is not None
+
+
+def _approx_count(text):
+    # Long words split into several BPE tokens; ~4 characters per token on average
+    return sum(max(1, math.ceil(len(piece.strip() or piece) / 4)) for piece in _APPROX_PIECES.findall(text))
+
+
+def count_tokens(text):
+    """Count the tokens in ``text``."""
+    text = text or ""
+    enc = _encoding()
+    return len(enc.encode(text, disallowed_special=())) if enc else _approx_count(text)
+
+
+def count_tokens_many(texts):
+    """Count tokens for a list of texts, batching the encoder when available."""
+    texts = [t or "" for t in texts]
+    enc = _encoding()
+    if enc:
+        return [len(ids) for ids in enc.encode_batch(texts, disallowed_special=())]
+    return [_approx_count(t) for t in texts]
+
+
+def model_price(model):
+    """Look up the per-1K price from a model name or an estimator label like "GPT-4 ($0.06 / 1K tokens)"."""
+    for name in sorted(MODEL_PRICES_PER_1K, key=len, reverse=True):
+        if model.startswith(name):
+            return MODEL_PRICES_PER_1K[name]
+    raise KeyError(f"Unknown model: {model}")
+
+
+def monthly_cost(tokens_per_request, requests_per_day, price_per_1k):
+    """Monthly spend for a steady daily volume."""
+    return tokens_per_request * requests_per_day / 1000 * price_per_1k * DAYS_PER_MONTH
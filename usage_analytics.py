@@ -0,0 +1,131 @@
+"""Low-overhead usage counters for pages, sub-topics and quiz answers.
+
+Events are counted in a per-process in-memory ``Counter`` (a dict update
+under a lock, no I/O). A background thread flushes the accumulated deltas
+to a small SQLite table on a timer with one upsert batch, so reruns never
+touch the disk. Counts are bucketed by UTC day.
+"""
+import atexit
+import os
+import sqlite3
+import threading
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+
+ANALYTICS_DB_PATH = "usage_analytics.db"
+FLUSH_INTERVAL_SECONDS = 60
+# Set to "off" for headless runs (e.g. the static site export) that are not real traffic
+TRACKING_ENV_VAR = "USAGE_ANALYTICS"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS usage_counts (
+    day TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    name TEXT NOT NULL,
+    value TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (day, kind, name, value)
+);
+"""
+
+_UPSERT = """
+INSERT INTO usage_counts (day, kind, name, value, count) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (day, kind, name, value) DO UPDATE SET count = count + excluded.count
+"""
+
+COUNT_COLUMNS = ["day", "kind", "name", "value", "count"]
+
+
+def tracking_enabled():
+    return os.environ.get(TRACKING_ENV_VAR, "on").strip().lower() not in ("off", "0", "false")
+
+
+def _today():
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+
+class UsageCounters:
+    """In-memory event counts with periodic flush to SQLite."""
+
+    def __init__(self, path=ANALYTICS_DB_PATH, interval=FLUSH_INTERVAL_SECONDS):
+        self.path = path
+        self.interval = interval
+        self._pending = Counter()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._halt = threading.Event()
+        with sqlite3.connect(self.path, timeout=10) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    def record(self, kind, name, value):
+        """Count one event, e.g. ``("quiz", question, answer)``."""
+        with self._lock:
+            self._pending[(_today(), kind, str(name), str(value))] += 1
+
+    def flush(self):
+        """Write pending deltas in one transaction; returns the number of rows upserted."""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, Counter()
+            if not pending:
+                return 0
+            try:
+                with sqlite3.connect(self.path, timeout=10) as conn:
+                    conn.executemany(_UPSERT, [key + (n,) for key, n in pending.items()])
+            except sqlite3.Error:
+                # Put the deltas back so the next flush retries them
+                with self._lock:
+                    self._pending.update(pending)
+                raise
+            return len(pending)
+
+    def start(self):
+        """Flush every ``interval`` seconds from a daemon thread, and once more at exit."""
+        def loop():
+            while not self._halt.wait(self.interval):
+                try:
+                    self.flush()
+                except sqlite3.Error:
+                    pass
+        threading.Thread(target=loop, daemon=True, name="usage-analytics-flush").start()
+        atexit.register(self.flush)
+        return self
+
+    def stop(self):
+        self._halt.set()
+        self.flush()
+
+    def counts(self, days=None):
+        """Persisted plus not-yet-flushed counts as a DataFrame, optionally for the last ``days`` days."""
+        since = (datetime.now(timezone.utc) - timedelta(days=days - 1)).strftime("%Y-%m-%d") if days else ""
+        with sqlite3.connect(self.path, timeout=10) as conn:
+            stored = pd.read_sql_query(
+                "SELECT day, kind, name, value, count FROM usage_counts WHERE day >= ?", conn, params=(since,))
+        with self._lock:
+            pending = [key + (n,) for key, n in self._pending.items() if key[0] >= since]
+        frame = pd.concat([stored, pd.DataFrame(pending, columns=COUNT_COLUMNS)], ignore_index=True)
+        return frame.groupby(COUNT_COLUMNS[:-1], as_index=False)["count"].sum()
+
+
+def page_views(counts):
+    pages = counts[counts["kind"] == "page"]
+    return (pages.groupby("value")["count"].sum().sort_values(ascending=False)
+            .rename_axis("Page").rename("Views").reset_index())
+
+
+def subtopic_views(counts):
+    subtopics = counts[counts["kind"] == "subtopic"]
+    return (subtopics.groupby(["name", "value"])["count"].sum().sort_values(ascending=False)
+            .rename_axis(["Page", "Sub-topic"]).rename("Views").reset_index())
+
+
+def quiz_answers(counts):
+    """Answer counts and share per quiz question."""
+    answers = counts[counts["kind"] == "quiz"]
+    table = (answers.groupby(["name", "value"])["count"].sum()
+             .rename_axis(["Question", "Answer"]).rename("Answers").reset_index())
+    table["Share %"] = (table["Answers"] / table.groupby("Question")["Answers"].transform("sum") * 100).round(1)
+    return table.sort_values(["Question", "Answers"], ascending=[True, False], ignore_index=True)
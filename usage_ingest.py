@@ -0,0 +1,221 @@
+"""Stream provider usage exports into a compact spend summary.
+
+Exports can run to gigabytes, so they are never loaded whole. The file is
+read in ``chunksize`` row chunks with only the needed columns and compact
+dtypes. Each chunk is reduced to per (day, model, feature) totals, and the
+partial totals are merged as they accumulate. Memory use is bounded by the
+number of distinct groups, not by the size of the log.
+
+Column names differ between providers, so each field is matched against
+a list of common aliases. If a row has no cost column, its cost is priced
+from its token counts with ``token_costs``. Only model names listed in
+``PRICED_MODELS`` (or dated snapshots of them) are priced; anything else is
+reported as unpriced rather than charged at a similar-looking model's rate.
+"""
+import argparse
+import json
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+import token_costs
+
+CHUNK_ROWS = 200_000
+# Merge partial aggregates after this many chunks to keep memory flat
+MERGE_EVERY = 20
+
+COLUMN_ALIASES = {
+    "timestamp": ["timestamp", "created", "created_at", "time", "date", "day", "start_time", "usage_date"],
+    "model": ["model", "model_name", "snapshot_id", "model_id"],
+    "input_tokens": ["input_tokens", "prompt_tokens", "n_context_tokens_total", "context_tokens"],
+    "output_tokens": ["output_tokens", "completion_tokens", "n_generated_tokens_total", "generated_tokens"],
+    "cost": ["cost", "cost_usd", "amount", "amount_usd", "spend"],
+    "feature": ["feature", "tag", "feature_tag", "project", "project_id", "api_key_name", "user"],
+    "requests": ["requests", "num_requests", "n_requests", "request_count"],
+}
+
+SUMMARY_COLUMNS = ["Day", "Model", "Feature", "Requests", "Input tokens", "Output tokens", "Spend ($)"]
+_SUMS = ["Requests", "Input tokens", "Output tokens", "Spend ($)"]
+# Provider model name -> estimator price row in ``token_costs.MODEL_PRICES_PER_1K``
+PRICED_MODELS = {
+    "gpt-3.5": "GPT-3.5",
+    "gpt-3.5-turbo": "GPT-3.5",
+    "gpt-4": "GPT-4",
+}
+# A dated snapshot of a priced model, e.g. "gpt-4-0613" or "gpt-3.5-turbo-2024-01-25"
+_SNAPSHOT_SUFFIX = re.compile(r"-\d{4}(-\d{2}-\d{2})?")
+COMPRESSION_SUFFIXES = {".gz": "gzip", ".bz2": "bz2", ".zip": "zip", ".xz": "xz", ".zst": "zstd"}
+
+
+def _format(name):
+    """``(format, compression)`` from the file name; buffers carry no suffix for pandas to infer from."""
+    base = name.lower()
+    compression = None
+    for suffix, codec in COMPRESSION_SUFFIXES.items():
+        if base.endswith(suffix):
+            base, compression = base.removesuffix(suffix), codec
+            break
+    return ("jsonl" if base.endswith((".jsonl", ".json", ".ndjson")) else "csv"), compression
+
+
+def _peek_columns(source, fmt, compression):
+    """Column names from the header (CSV) or the first record (JSONL), then rewind."""
+    if fmt == "csv":
+        columns = list(pd.read_csv(source, nrows=0, compression=compression).columns)
+    else:
+        columns = list(pd.read_json(source, lines=True, nrows=1, compression=compression).columns)
+    if hasattr(source, "seek"):
+        source.seek(0)
+    return columns
+
+
+def resolve_columns(columns):
+    """Map each logical field to the export's column name (or None)."""
+    # "Spend ($)" -> "spend", "Input tokens" -> "input_tokens", so saved summaries read back in too
+    lookup = {re.sub(r"[^a-z0-9]+", "_", str(c).lower()).strip("_"): c for c in columns}
+    mapping = {field: next((lookup[a] for a in aliases if a in lookup), None)
+               for field, aliases in COLUMN_ALIASES.items()}
+    missing = [f for f in ("timestamp", "model") if mapping[f] is None]
+    if missing:
+        raise ValueError(f"Usage export needs {' and '.join(missing)} columns; found: {', '.join(columns)}")
+    if mapping["cost"] is None and mapping["input_tokens"] is None and mapping["output_tokens"] is None:
+        raise ValueError("Usage export needs a cost column or token count columns.")
+    return mapping
+
+
+def _read_chunks(source, fmt, compression, mapping, chunksize):
+    used = [c for c in mapping.values() if c]
+    if fmt == "csv":
+        dtypes = {mapping[f]: "float32" for f in ("input_tokens", "output_tokens", "requests") if mapping[f]}
+        if mapping["cost"]:
+            dtypes[mapping["cost"]] = "float64"
+        for field in ("model", "feature"):
+            if mapping[field]:
+                dtypes[mapping[field]] = "category"
+        return pd.read_csv(source, usecols=used, dtype=dtypes, chunksize=chunksize, compression=compression)
+    # JSON readers cannot select columns up front; trim each chunk straight away
+    return (chunk.reindex(columns=used) for chunk in pd.read_json(source, lines=True, chunksize=chunksize,
+                                                                  dtype=False, compression=compression))
+
+
+def _price_per_1k(model):
+    """Price for an exact ``PRICED_MODELS`` name or the longest one this is a snapshot of; NaN if unknown.
+
+    A bare prefix is not enough: "gpt-4o" and "gpt-4-turbo" are priced
+    differently from "gpt-4", so they stay unpriced.
+    """
+    name = str(model).strip().lower()
+    for known in sorted(PRICED_MODELS, key=len, reverse=True):
+        if name == known or (name.startswith(known) and _SNAPSHOT_SUFFIX.fullmatch(name[len(known):])):
+            return token_costs.MODEL_PRICES_PER_1K[PRICED_MODELS[known]]
+    return np.nan
+
+
+def _to_days(values):
+    if pd.api.types.is_numeric_dtype(values):
+        # Epoch seconds or milliseconds
+        unit = "ms" if values.dropna().gt(1e11).any() else "s"
+        return pd.to_datetime(values, unit=unit, errors="coerce").dt.floor("D")
+    return pd.to_datetime(values, errors="coerce", utc=True, format="mixed").dt.tz_localize(None).dt.floor("D")
+
+
+def _reduce_chunk(chunk, mapping):
+    col = lambda field: chunk[mapping[field]] if mapping[field] else None  # noqa: E731
+    frame = pd.DataFrame({
+        "Day": _to_days(col("timestamp")),
+        "Model": col("model").astype("string").fillna("unknown"),
+        "Feature": col("feature").astype("string").fillna("untagged") if mapping["feature"] else "untagged",
+        "Requests": pd.to_numeric(col("requests"), errors="coerce").fillna(1) if mapping["requests"] else 1.0,
+        "Input tokens": pd.to_numeric(col("input_tokens"), errors="coerce").fillna(0) if mapping["input_tokens"] else 0.0,
+        "Output tokens": pd.to_numeric(col("output_tokens"), errors="coerce").fillna(0) if mapping["output_tokens"] else 0.0,
+    })
+    if mapping["cost"]:
+        frame["Spend ($)"] = pd.to_numeric(col("cost"), errors="coerce").fillna(0)
+        unpriced = set()
+    else:
+        # One price lookup per distinct model, then a vectorized multiply
+        prices = frame["Model"].map({m: _price_per_1k(m) for m in frame["Model"].unique()}).astype("float64")
+        frame["Spend ($)"] = (frame["Input tokens"] + frame["Output tokens"]) / 1000 * prices.fillna(0)
+        unpriced = set(frame.loc[prices.isna(), "Model"].unique())
+    bad = int(frame["Day"].isna().sum())
+    return _aggregate(frame.dropna(subset=["Day"])), bad, unpriced
+
+
+def _aggregate(frame):
+    return frame.groupby(["Day", "Model", "Feature"], as_index=False, observed=True)[_SUMS].sum()
+
+
+def ingest(source, name=None, chunksize=CHUNK_ROWS, progress=None):
+    """Aggregate a CSV or JSONL usage export (a path or file object) chunk by chunk.
+
+    Returns ``(summary, stats)``: per day/model/feature totals and a dict with
+    rows read, chunks, rows skipped for unparseable timestamps and any models
+    that had to be priced from tokens but have no known price.
+    ``progress`` is called with the running row count after each chunk.
+    """
+    fmt, compression = _format(name or str(source))
+    mapping = resolve_columns(_peek_columns(source, fmt, compression))
+    partials = []
+    stats = {"rows": 0, "chunks": 0, "skipped rows": 0, "unpriced models": set(), "columns": mapping}
+    for chunk in _read_chunks(source, fmt, compression, mapping, chunksize):
+        reduced, bad, unpriced = _reduce_chunk(chunk, mapping)
+        partials.append(reduced)
+        stats["rows"] += len(chunk)
+        stats["chunks"] += 1
+        stats["skipped rows"] += bad
+        stats["unpriced models"] |= unpriced
+        if len(partials) >= MERGE_EVERY:
+            partials = [_aggregate(pd.concat(partials, ignore_index=True))]
+        if progress:
+            progress(stats["rows"])
+    if not partials:
+        return pd.DataFrame(columns=SUMMARY_COLUMNS), stats
+    summary = _aggregate(pd.concat(partials, ignore_index=True))
+    summary["Requests"] = summary["Requests"].astype("int64")
+    return summary.sort_values(["Day", "Model", "Feature"], ignore_index=True)[SUMMARY_COLUMNS], stats
+
+
+def daily_spend(summary):
+    return summary.groupby("Day")["Spend ($)"].sum()
+
+
+def compare_to_estimate(summary, tokens_per_request, requests_per_day, price_per_1k):
+    """Estimator inputs and projection side by side with what the export shows."""
+    days = max(summary["Day"].nunique(), 1)
+    requests = summary["Requests"].sum()
+    tokens = summary["Input tokens"].sum() + summary["Output tokens"].sum()
+    actual_daily = summary["Spend ($)"].sum() / days
+    estimated_monthly = token_costs.monthly_cost(tokens_per_request, requests_per_day, price_per_1k)
+    return pd.DataFrame({
+        "Estimated": [requests_per_day, tokens_per_request, estimated_monthly / token_costs.DAYS_PER_MONTH,
+                      estimated_monthly],
+        "Actual": [requests / days, tokens / max(requests, 1), actual_daily,
+                   actual_daily * token_costs.DAYS_PER_MONTH],
+    }, index=["Requests per day", "Tokens per request", "Spend per day ($)", "Spend per month ($)"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize a provider usage export without loading it whole.")
+    parser.add_argument("export", help="CSV or JSONL usage export (optionally compressed)")
+    parser.add_argument("--out", help="Write the summary to this CSV or Parquet file")
+    parser.add_argument("--chunksize", type=int, default=CHUNK_ROWS)
+    args = parser.parse_args()
+
+    summary, stats = ingest(args.export, chunksize=args.chunksize,
+                            progress=lambda rows: print(f"\r{rows:,} rows", end="", flush=True))
+    print(f"\n{stats['rows']:,} rows in {stats['chunks']} chunks, {stats['skipped rows']:,} skipped; "
+          f"columns: {json.dumps({k: v for k, v in stats['columns'].items() if v})}")
+    if stats["unpriced models"]:
+        print(f"No price for {', '.join(sorted(stats['unpriced models']))}; their spend is counted as $0")
+    print(summary.groupby("Model")[_SUMS].sum().to_string())
+    if args.out:
+        if os.path.splitext(args.out)[1] == ".parquet":
+            summary.to_parquet(args.out, index=False)
+        else:
+            summary.to_csv(args.out, index=False)
+
+
+if __name__ == "__main__":
+    main()